@@ -30,6 +30,7 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
     "django.middleware.security.SecurityMiddleware",
+    "core.middleware.CompressionMiddleware",   # ✅ gzip/brotli for /api/ responses, cached per ETag
     "whitenoise.middleware.WhiteNoiseMiddleware",   # ✅ whitenoise for static files
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -37,6 +38,7 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "core.middleware.QueryBudgetMiddleware",   # ✅ DEBUG only — warns on N+1 regressions
 ]
 
 ROOT_URLCONF = "backend.urls"
@@ -80,16 +82,72 @@ else:
         }
     }
 
+# ✅ Cache — shared by all gunicorn workers (Redis when REDIS_URL is set, otherwise on disk)
+REDIS_URL = os.environ.get('REDIS_URL')
+
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.environ.get('CACHE_DIR', str(BASE_DIR / 'cache')),
+        }
+    }
+
+# Combined page responses are keyed on the content generation, so this only
+# bounds how long entries from superseded generations linger.
+PAGE_CACHE_TIMEOUT = int(os.environ.get('PAGE_CACHE_TIMEOUT', 60 * 60 * 24))
+
+# API response compression (core.middleware.CompressionMiddleware)
+COMPRESSION_MIN_LENGTH = int(os.environ.get('COMPRESSION_MIN_LENGTH', 200))
+COMPRESSION_CACHE_TIMEOUT = int(os.environ.get('COMPRESSION_CACHE_TIMEOUT', PAGE_CACHE_TIMEOUT))
+# Counters (core.utils.metrics) collect per process and reach the cache this often
+METRICS_FLUSH_INTERVAL = int(os.environ.get('METRICS_FLUSH_INTERVAL', 10))
+
+# Contact form ingestion: 'direct' inserts in the request; 'spool' appends to
+# a local file and `manage.py flush_contact_spool --loop` bulk inserts it.
+CONTACT_INGESTION = os.environ.get('CONTACT_INGESTION', 'direct')
+CONTACT_SPOOL_DIR = os.environ.get('CONTACT_SPOOL_DIR', str(BASE_DIR / 'spool' / 'contact'))
+CONTACT_SPOOL_BATCH_SIZE = int(os.environ.get('CONTACT_SPOOL_BATCH_SIZE', 500))
+CONTACT_SPOOL_FLUSH_INTERVAL = float(os.environ.get('CONTACT_SPOOL_FLUSH_INTERVAL', 5))
+# fsync each message: survives power loss, not only a worker or flusher crash
+CONTACT_SPOOL_FSYNC = os.environ.get('CONTACT_SPOOL_FSYNC', 'True') == 'True'
+
+# Shared throttle state: 16 bytes per slot, one slot per client
+THROTTLE_STATE_FILE = os.environ.get('THROTTLE_STATE_FILE', str(BASE_DIR / 'throttle' / 'buckets.bin'))
+THROTTLE_STATE_SLOTS = int(os.environ.get('THROTTLE_STATE_SLOTS', 65536))
+
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
         'rest_framework_simplejwt.authentication.JWTAuthentication',
     ),
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=60),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=7),
+    # Token buckets in a file shared by all workers (THROTTLE_STATE_FILE)
     'DEFAULT_THROTTLE_CLASSES': [
-        'rest_framework.throttling.UserRateThrottle',
+        'core.utils.throttling.UserTokenBucketThrottle',
     ],
+    'DEFAULT_THROTTLE_RATES': {
+        'user': None,
+        'contact': os.environ.get('CONTACT_THROTTLE_RATE', '5/min'),
+        'newsletter': os.environ.get('NEWSLETTER_THROTTLE_RATE', '5/min'),
+        'batch': os.environ.get('BATCH_THROTTLE_RATE', '30/min'),
+    },
     'DEFAULT_FILTER_BACKENDS': ['django_filters.rest_framework.DjangoFilterBackend'],
+    # orjson-backed when installed, stock JSONRenderer otherwise
+    'DEFAULT_RENDERER_CLASSES': [
+        'core.utils.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    # Opt-in keyset pagination: only used when ?cursor= or ?page_size= is sent
+    'DEFAULT_PAGINATION_CLASS': 'core.utils.pagination.KeysetPagination',
+    'PAGE_SIZE': 20,
 }
 
 AUTH_PASSWORD_VALIDATORS = [
@@ -113,6 +171,11 @@ EMAIL_HOST_USER = os.environ.get('EMAIL_HOST_USER', '')
 EMAIL_HOST_PASSWORD = os.environ.get('EMAIL_HOST_PASSWORD', '')
 DEFAULT_FROM_EMAIL = os.environ.get('DEFAULT_FROM_EMAIL', '')
 
+# Newsletter delivery (manage.py send_newsletter)
+NEWSLETTER_BATCH_SIZE = int(os.environ.get('NEWSLETTER_BATCH_SIZE', 100))
+NEWSLETTER_RATE_LIMIT = float(os.environ.get('NEWSLETTER_RATE_LIMIT', 10))   # messages/second, 0 = unlimited
+NEWSLETTER_SMTP_POOL_SIZE = int(os.environ.get('NEWSLETTER_SMTP_POOL_SIZE', 2))
+
 # ✅ Static files with whitenoise
 STATIC_URL = "static/"
 STATIC_ROOT = BASE_DIR / 'staticfiles'
@@ -120,6 +183,29 @@ STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
+MEDIA_CACHE_MAX_AGE = 365 * 24 * 60 * 60
+# Let the front proxy send media bodies: 'nginx' (X-Accel-Redirect to MEDIA_ACCEL_PREFIX,
+# an `internal` location aliased to MEDIA_ROOT) or 'sendfile' (X-Sendfile, Apache/lighttpd).
+# Empty: Django streams them, through the WSGI server's sendfile() when it has one.
+MEDIA_ACCEL = os.environ.get('MEDIA_ACCEL', '')
+MEDIA_ACCEL_PREFIX = os.environ.get('MEDIA_ACCEL_PREFIX', '/protected-media/')
+
+# Responsive image derivatives (core/utils/images.py)
+IMAGE_DERIVATIVE_WIDTHS = [320, 640, 960, 1280, 1920]
+IMAGE_DERIVATIVE_FORMATS = ['webp', 'jpeg']
+IMAGE_DERIVATIVE_QUALITY = int(os.environ.get('IMAGE_DERIVATIVE_QUALITY', 80))
+IMAGE_DERIVATIVE_WORKERS = int(os.environ.get('IMAGE_DERIVATIVE_WORKERS', 2))   # processes, 0 = render inline
+
+# On-demand transforms: /media/t/<w>x<h>/<fmt>/<path> (core/utils/transforms.py)
+IMAGE_TRANSFORM_WIDTHS = [160, 320, 480, 640, 960, 1280, 1920]
+IMAGE_TRANSFORM_HEIGHTS = IMAGE_TRANSFORM_WIDTHS   # 0 (keep the aspect ratio) is always allowed
+IMAGE_TRANSFORM_FORMATS = ['webp', 'jpeg', 'png']
+IMAGE_TRANSFORM_CACHE_DIR = os.environ.get('IMAGE_TRANSFORM_CACHE_DIR', str(BASE_DIR / 'transforms'))
+IMAGE_TRANSFORM_CACHE_MAX_BYTES = int(os.environ.get('IMAGE_TRANSFORM_CACHE_MAX_BYTES', 512 * 1024 * 1024))
+
+# Admin changelists of unbounded tables (core.utils.pagination.EstimatedCountPaginator):
+# above this many rows the PostgreSQL planner's estimate replaces COUNT(*)
+ADMIN_ESTIMATED_COUNT_THRESHOLD = int(os.environ.get('ADMIN_ESTIMATED_COUNT_THRESHOLD', 100_000))
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
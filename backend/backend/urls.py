@@ -18,11 +18,14 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
-from django.conf.urls.static import static
+
+from core.views.media import media_file, media_transform
+
+media_prefix = settings.MEDIA_URL.strip('/')
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/', include('core.urls')), 
-]
-if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
\ No newline at end of file
+    path(f'{media_prefix}/t/<int:width>x<int:height>/<str:fmt>/<path:path>', media_transform, name='media-transform'),
+    path(f'{media_prefix}/<path:path>', media_file, name='media-file'),
+]
\ No newline at end of file
@@ -2,12 +2,14 @@
 
 from django.contrib import admin
 from django.utils.html import format_html
-from django.db.models import Count
+from django.db.models import Count, Q
 from .models import (
     PersonalInfo, CoreExpertise, Skill, Tool, ProjectCategory, 
     Project, Experience, Achievement, Education, Timeline, 
-    Testimonial, ContactMessage, NewsletterSubscriber, SiteSettings
+    Testimonial, ContactMessage, NewsletterSubscriber, NewsletterCampaign, SiteSettings, Technology
 )
+from .utils.cache import bump_content_generation
+from .utils.pagination import EstimatedCountPaginator, KeysetChangeList
 
 # ==============================
 # 🌐 Admin Site Branding
@@ -17,6 +19,19 @@ admin.site.site_title = "Portfolio Admin"
 admin.site.index_title = "Welcome to Your Portfolio Dashboard"
 
 
+class LargeTableAdmin(admin.ModelAdmin):
+    """
+    For tables that grow without bound (spam, subscriptions): planner-estimated
+    counts, no second COUNT(*) for the unfiltered total, and keyset paging on
+    the ordering, which should be backed by an index
+    """
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def get_changelist(self, request, **kwargs):
+        return KeysetChangeList
+
+
 # ==============================
 # 👤 Personal Information
 # ==============================
@@ -103,9 +118,6 @@ class SkillAdmin(admin.ModelAdmin):
         )
     proficiency_display.short_description = 'Proficiency Level'
 
-    def get_queryset(self, request):
-        return super().get_queryset(request).annotate(skill_count=Count('id'))
-
 
 # ==============================
 # 🧰 Tools
@@ -130,14 +142,38 @@ class ProjectCategoryAdmin(admin.ModelAdmin):
     search_fields = ['name', 'slug']
     ordering = ['order']
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(
+            active_project_count=Count('projects', filter=Q(projects__is_active=True))
+        )
+
     def project_count(self, obj):
-        count = obj.projects.filter(is_active=True).count()
+        count = obj.active_project_count
         color = 'green' if count > 0 else 'gray'
         return format_html(
             '<span style="color: {}; font-weight: bold;">{} project(s)</span>',
             color, count
         )
     project_count.short_description = 'Active Projects'
+    project_count.admin_order_field = 'active_project_count'
+
+
+# ==============================
+# 🧩 Technologies
+# ==============================
+@admin.register(Technology)
+class TechnologyAdmin(admin.ModelAdmin):
+    list_display = ['name', 'key']
+    search_fields = ['name', 'key']
+    ordering = ['name']
+    # Technology.for_names() matches on the key: editing it would make the
+    # next save of a project or experience entry create a duplicate
+    readonly_fields = ['key']
+
+    def save_model(self, request, obj, form, change):
+        if not change:
+            obj.key = obj.name.lower()
+        super().save_model(request, obj, form, change)
 
 
 # ==============================
@@ -155,6 +191,8 @@ class ProjectAdmin(admin.ModelAdmin):
 
     list_display = ['title', 'category', 'thumbnail_small', 'featured_badge', 'order', 'is_active', 'date_added']
     list_editable = ['order', 'is_active']
+    list_select_related = ['category']
+    autocomplete_fields = ['category']
     list_filter = ['category', 'is_featured', 'is_active', 'created_at']
     search_fields = ['title', 'short_description', 'full_description', 'technologies']
     prepopulated_fields = {'slug': ('title',)}
@@ -188,18 +226,22 @@ class ProjectAdmin(admin.ModelAdmin):
 
     def mark_as_featured(self, request, queryset):
         updated = queryset.update(is_featured=True)
+        bump_content_generation(Project)
         self.message_user(request, f'{updated} project(s) marked as featured.')
 
     def remove_featured(self, request, queryset):
         updated = queryset.update(is_featured=False)
+        bump_content_generation(Project)
         self.message_user(request, f'{updated} project(s) removed from featured.')
 
     def activate_projects(self, request, queryset):
         updated = queryset.update(is_active=True)
+        bump_content_generation(Project)
         self.message_user(request, f'{updated} project(s) activated.')
 
     def deactivate_projects(self, request, queryset):
         updated = queryset.update(is_active=False)
+        bump_content_generation(Project)
         self.message_user(request, f'{updated} project(s) deactivated.')
 
 
@@ -229,6 +271,9 @@ class ExperienceAdmin(admin.ModelAdmin):
     inlines = [AchievementInline]
     date_hierarchy = 'start_date'
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(achievement_total=Count('achievements'))
+
     def date_range(self, obj):
         start = obj.start_date.strftime('%b %Y')
         end = 'Present' if obj.is_current else obj.end_date.strftime('%b %Y')
@@ -238,7 +283,9 @@ class ExperienceAdmin(admin.ModelAdmin):
         return format_html('<span style="background:#2196F3;color:white;padding:3px 8px;border-radius:4px;font-size:11px;font-weight:bold;">▶ CURRENT</span>') if obj.is_current else '—'
 
     def achievement_count(self, obj):
-        return format_html('<span style="color:#4CAF50;font-weight:bold;">{} achievements</span>', obj.achievements.count())
+        return format_html('<span style="color:#4CAF50;font-weight:bold;">{} achievements</span>', obj.achievement_total)
+    achievement_count.short_description = 'Achievements'
+    achievement_count.admin_order_field = 'achievement_total'
 
 
 # ==============================
@@ -247,6 +294,8 @@ class ExperienceAdmin(admin.ModelAdmin):
 @admin.register(Achievement)
 class AchievementAdmin(admin.ModelAdmin):
     list_display = ['experience', 'description_preview', 'order']
+    list_select_related = ['experience']
+    autocomplete_fields = ['experience']
     list_filter = ['experience']
     search_fields = ['description', 'experience__title', 'experience__company']
     ordering = ['experience', 'order']
@@ -318,13 +367,12 @@ class TestimonialAdmin(admin.ModelAdmin):
 # ✉️ Contact Messages
 # ==============================
 @admin.register(ContactMessage)
-class ContactMessageAdmin(admin.ModelAdmin):
+class ContactMessageAdmin(LargeTableAdmin):
     list_display = ['name', 'email', 'subject_preview', 'read_badge', 'date_received']
     list_filter = ['is_read', 'created_at']
     search_fields = ['name', 'email', 'subject', 'message']
     readonly_fields = ['name', 'email', 'subject', 'message', 'created_at']
     ordering = ['-created_at']
-    date_hierarchy = 'created_at'
 
     def subject_preview(self, obj):
         return obj.subject[:40] + '...' if len(obj.subject) > 40 else obj.subject
@@ -355,12 +403,11 @@ class ContactMessageAdmin(admin.ModelAdmin):
 # 📨 Newsletter Subscribers
 # ==============================
 @admin.register(NewsletterSubscriber)
-class NewsletterSubscriberAdmin(admin.ModelAdmin):
+class NewsletterSubscriberAdmin(LargeTableAdmin):
     list_display = ['email', 'status_badge', 'subscription_date']
     list_filter = ['is_active', 'subscribed_at']
     search_fields = ['email']
     ordering = ['-subscribed_at']
-    date_hierarchy = 'subscribed_at'
     readonly_fields = ['subscribed_at']
 
     def status_badge(self, obj):
@@ -382,6 +429,46 @@ class NewsletterSubscriberAdmin(admin.ModelAdmin):
         self.message_user(request, f'{updated} subscriber(s) deactivated.')
 
 
+# ==============================
+# 📬 Newsletter Campaigns
+# ==============================
+@admin.register(NewsletterCampaign)
+class NewsletterCampaignAdmin(admin.ModelAdmin):
+    fieldsets = (
+        ('✉️ Message', {'fields': ('subject', 'body_text', 'body_html')}),
+        ('📊 Delivery', {
+            'fields': ('status', 'sent_count', 'failed_count', 'last_subscriber_id', 'started_at', 'finished_at', 'last_error'),
+            'description': 'Saving or queuing a campaign sends nothing: queued campaigns go out when '
+                           '"python manage.py send_newsletter" runs (schedule it with cron or a worker).',
+        }),
+    )
+    list_display = ['subject', 'status_badge', 'sent_count', 'failed_count', 'created_date']
+    list_filter = ['status']
+    search_fields = ['subject']
+    readonly_fields = ['status', 'sent_count', 'failed_count', 'last_subscriber_id', 'started_at', 'finished_at', 'last_error']
+
+    STATUS_COLORS = {'draft': '#999', 'queued': '#2196F3', 'sending': '#FF9800', 'sent': '#4CAF50', 'failed': '#F44336'}
+
+    def status_badge(self, obj):
+        return format_html(
+            '<span style="background:{};color:white;padding:3px 8px;border-radius:4px;font-size:11px;font-weight:bold;">{}</span>',
+            self.STATUS_COLORS[obj.status], obj.get_status_display().upper(),
+        )
+
+    def created_date(self, obj):
+        return obj.created_at.strftime('%Y-%m-%d %H:%M')
+
+    actions = ['queue_campaigns']
+
+    def queue_campaigns(self, request, queryset):
+        updated = queryset.filter(status__in=['draft', 'failed']).update(status='queued')
+        self.message_user(
+            request,
+            f'{updated} campaign(s) queued. Nothing is sent until "python manage.py send_newsletter" runs.',
+        )
+    queue_campaigns.short_description = 'Queue for the send_newsletter command'
+
+
 # ==============================
 # ⚙️ Site Settings
 # ==============================
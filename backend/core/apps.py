@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "core"
+
+    def ready(self):
+        from django.db.models.signals import post_migrate
+        from core import signals
+
+        post_migrate.connect(signals.repair_search_index, sender=self)
@@ -0,0 +1,97 @@
+"""
+Compare JSON renderers on GET /api/projects/.
+Seeds the requested number of projects inside a transaction that is rolled
+back at the end, so it is safe to run against a development database.
+
+    python manage.py benchmark_renderers --rows 10000
+"""
+
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory
+
+from core.models import Project, ProjectCategory, ProjectTechnology, Technology
+from core.utils.renderers import FastJSONRenderer, orjson
+from core.views.service import ProjectViewSet
+
+
+class Command(BaseCommand):
+    help = 'Benchmark encode time and peak memory of the JSON renderers on /api/projects/'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=10000, help='Projects to seed (default 10000)')
+        parser.add_argument('--repeat', type=int, default=3, help='Timing runs per renderer, best one is kept')
+
+    def handle(self, *args, **options):
+        if orjson is None:
+            self.stdout.write(self.style.WARNING('orjson is not installed, FastJSONRenderer falls back to JSONRenderer'))
+
+        with transaction.atomic():
+            self.seed(options['rows'])
+            rows = [
+                self.measure(label, run, options['repeat'])
+                for label, run in (
+                    ('JSONRenderer', lambda: self.render_list(JSONRenderer)),
+                    ('FastJSONRenderer', lambda: self.render_list(FastJSONRenderer)),
+                    ('FastJSONRenderer ?stream=1', self.stream_list),
+                )
+            ]
+            transaction.set_rollback(True)
+
+        self.stdout.write(f"\n{'renderer':<28}{'total ms':>10}{'encode ms':>11}{'peak MB':>10}{'bytes':>12}")
+        for label, total, encode, peak, size in rows:
+            encode = f'{encode:.1f}' if encode is not None else '-'
+            self.stdout.write(f'{label:<28}{total:>10.1f}{encode:>11}{peak / 2 ** 20:>10.1f}{size:>12}')
+
+    def seed(self, count):
+        category = ProjectCategory.objects.create(name='Benchmark', slug='benchmark-renderers')
+        start = Project.objects.count()
+        projects = Project.objects.bulk_create([
+            Project(
+                title=f'Benchmark project {i}', slug=f'benchmark-renderers-{i}', category=category,
+                short_description='Short description ' * 5, full_description='Full description ' * 100,
+                technologies='Django, React, PostgreSQL', order=i,
+            )
+            for i in range(start, start + count)
+        ])
+        technologies = Technology.for_names(['Django', 'React', 'PostgreSQL']).values()
+        ProjectTechnology.objects.bulk_create([
+            ProjectTechnology(project=project, technology=technology, order=order)
+            for project in projects
+            for order, technology in enumerate(technologies)
+        ])
+        self.stdout.write(f'Seeded {count} projects ({Project.objects.filter(is_active=True).count()} active)')
+
+    def request(self, **params):
+        return APIRequestFactory().get('/api/projects/', params, HTTP_HOST='localhost')
+
+    def render_list(self, renderer_class):
+        view = ProjectViewSet.as_view({'get': 'list'}, renderer_classes=[renderer_class])
+        response = view(self.request())
+        started = time.perf_counter()
+        response.render()
+        return len(response.content), time.perf_counter() - started
+
+    def stream_list(self):
+        response = ProjectViewSet.as_view({'get': 'list'})(self.request(stream='1'))
+        return sum(len(chunk) for chunk in response.streaming_content), None
+
+    def measure(self, label, run, repeat):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            size, encode = run()
+            timings.append((time.perf_counter() - started, encode))
+        total, encode = min(timings, key=lambda timing: timing[0])
+
+        # Memory is traced in a separate run: tracemalloc skews the timings
+        tracemalloc.start()
+        run()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        return label, total * 1000, encode * 1000 if encode is not None else None, peak, size
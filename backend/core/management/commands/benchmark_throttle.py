@@ -0,0 +1,81 @@
+"""
+Per-request overhead of the throttles: DRF's history-list throttle (on the
+configured cache and on LocMem) against the shared token-bucket table.
+
+    python manage.py benchmark_throttle --requests 20000 --clients 1000
+"""
+
+import pickle
+import statistics
+import tempfile
+import time
+
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from rest_framework.throttling import AnonRateThrottle
+
+from core.utils.throttling import TokenBucketThrottle
+
+
+class Command(BaseCommand):
+    help = 'Benchmark per-request throttle overhead and per-client state size'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=20000)
+        parser.add_argument('--clients', type=int, default=1000, help='Distinct client IPs')
+        parser.add_argument('--rate', default='1000/min', help='Throttle rate for every variant')
+
+    def handle(self, *args, **options):
+        factory = APIRequestFactory()
+        requests = [
+            Request(factory.post('/api/contact/', REMOTE_ADDR=f'10.{i // 65536 % 256}.{i // 256 % 256}.{i % 256}'))
+            for i in range(options['clients'])
+        ]
+        rate = options['rate']
+
+        class HistoryThrottle(AnonRateThrottle):
+            pass
+
+        class LocMemHistoryThrottle(AnonRateThrottle):
+            cache = LocMemCache('benchmark-throttle', {})
+
+        class BucketThrottle(TokenBucketThrottle):
+            def get_cache_key(self, request, view):
+                return self.cache_format % {'scope': 'benchmark', 'ident': self.get_ident(request)}
+
+        for throttle_class in (HistoryThrottle, LocMemHistoryThrottle, BucketThrottle):
+            throttle_class.rate = rate
+
+        self.stdout.write(f"\n{'throttle':<36}{'mean µs':>10}{'p99 µs':>10}{'state/client':>14}")
+        with tempfile.TemporaryDirectory() as state_dir:
+            with override_settings(THROTTLE_STATE_FILE=f'{state_dir}/buckets.bin'):
+                for label, throttle_class in (
+                    ('AnonRateThrottle (default cache)', HistoryThrottle),
+                    ('AnonRateThrottle (LocMem)', LocMemHistoryThrottle),
+                    ('TokenBucketThrottle (shared mmap)', BucketThrottle),
+                ):
+                    self.time_throttle(label, throttle_class, requests, options['requests'])
+
+    def time_throttle(self, label, throttle_class, requests, count):
+        throttle = throttle_class()
+        throttle.allow_request(requests[0], None)  # open the cache / table
+        timings = []
+        for i in range(count):
+            request = requests[i % len(requests)]
+            started = time.perf_counter()
+            throttle_class().allow_request(request, None)
+            timings.append(time.perf_counter() - started)
+
+        if isinstance(throttle, TokenBucketThrottle):
+            state = 16
+        else:
+            history = throttle.cache.get(throttle.get_cache_key(requests[0], None), [])
+            state = len(pickle.dumps(history))
+        timings.sort()
+        self.stdout.write(
+            f'{label:<36}{statistics.mean(timings) * 1e6:>10.1f}'
+            f'{timings[int(len(timings) * 0.99)] * 1e6:>10.1f}{state:>12} B'
+        )
@@ -0,0 +1,40 @@
+"""
+Build the responsive derivatives and placeholders of images uploaded
+before the pipeline existed, or after changing IMAGE_DERIVATIVE_WIDTHS /
+_FORMATS or the manifest version.
+
+    python manage.py build_image_derivatives               # missing or outdated entries
+    python manage.py build_image_derivatives --workers 8   # in 8 processes
+    python manage.py build_image_derivatives --force       # rebuild everything
+"""
+
+from django.core.management.base import BaseCommand
+
+from core.signals import IMAGE_FIELDS
+from core.utils.images import schedule_derivatives, shutdown_pools, start_pools, wait_for_derivatives
+
+
+class Command(BaseCommand):
+    help = 'Generate WebP/JPEG derivatives and placeholders for uploaded images in the worker pool'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Rebuild derivatives that already exist')
+        parser.add_argument('--workers', type=int, default=None, help='Worker processes (default IMAGE_DERIVATIVE_WORKERS)')
+
+    def handle(self, *args, **options):
+        if options['workers']:
+            start_pools(options['workers'])
+        try:
+            for model, field_names in IMAGE_FIELDS.items():
+                instances = model._default_manager.only('pk', 'image_derivatives', *field_names)
+                for instance in instances.iterator():
+                    schedule_derivatives(instance, field_names, force=options['force'])
+            wait_for_derivatives()
+        finally:
+            shutdown_pools()
+
+        built = sum(
+            len(instance.image_derivatives)
+            for model in IMAGE_FIELDS for instance in model._default_manager.only('image_derivatives')
+        )
+        self.stdout.write(self.style.SUCCESS(f'✅ {built} images have derivatives'))
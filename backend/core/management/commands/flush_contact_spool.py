@@ -0,0 +1,31 @@
+"""
+Bulk insert the contact messages spooled by ContactMessageView
+(CONTACT_INGESTION = 'spool').
+
+    python manage.py flush_contact_spool           # one pass
+    python manage.py flush_contact_spool --loop    # every CONTACT_SPOOL_FLUSH_INTERVAL seconds
+"""
+
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.utils.spool import flush_contact_spool
+
+
+class Command(BaseCommand):
+    help = 'Flush spooled contact messages into the database'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help='Keep flushing until interrupted')
+        parser.add_argument('--batch-size', type=int, default=None, help='Rows per INSERT (default CONTACT_SPOOL_BATCH_SIZE)')
+
+    def handle(self, *args, **options):
+        while True:
+            flushed = flush_contact_spool(options['batch_size'])
+            if flushed or not options['loop']:
+                self.stdout.write(self.style.SUCCESS(f'✅ Flushed {flushed} contact messages'))
+            if not options['loop']:
+                return
+            time.sleep(settings.CONTACT_SPOOL_FLUSH_INTERVAL)
@@ -0,0 +1,24 @@
+"""
+Remove uploaded blobs (and image derivatives) that no row references any
+more, e.g. after an image was replaced in the admin.
+
+    python manage.py gc_media --dry-run
+    python manage.py gc_media --min-age 86400
+"""
+
+from django.core.management.base import BaseCommand
+
+from core.utils.storage import collect_garbage
+
+
+class Command(BaseCommand):
+    help = 'Delete content-addressed media files that nothing references'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--min-age', type=int, default=3600, help='Keep files younger than this many seconds')
+        parser.add_argument('--dry-run', action='store_true', help='Only report what would be deleted')
+
+    def handle(self, *args, **options):
+        removed, freed = collect_garbage(min_age=options['min_age'], dry_run=options['dry_run'])
+        verb = 'Would remove' if options['dry_run'] else 'Removed'
+        self.stdout.write(self.style.SUCCESS(f'✅ {verb} {removed} orphaned files ({freed / 1024:.1f} KiB)'))
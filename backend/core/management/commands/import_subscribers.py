@@ -0,0 +1,51 @@
+"""
+Import newsletter subscribers from a file with one address per line
+(or a CSV whose first column is the address).
+
+    python manage.py import_subscribers subscribers.csv
+"""
+
+import csv
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand
+from django.core.validators import validate_email
+
+from core.models import NewsletterSubscriber
+
+
+class Command(BaseCommand):
+    help = 'Bulk subscribe the email addresses listed in a file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Text or CSV file, address in the first column')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows per upsert statement')
+
+    def handle(self, *args, **options):
+        emails, invalid = [], 0
+        with open(options['path'], newline='', encoding='utf-8') as source:
+            for row in csv.reader(source):
+                email = row[0].strip() if row else ''
+                if not email or email.lower() == 'email':
+                    continue
+                try:
+                    validate_email(email)
+                except ValidationError:
+                    invalid += 1
+                    continue
+                emails.append(email)
+
+        outcomes = NewsletterSubscriber.subscribe_many(emails, batch_size=options['batch_size'])
+        counts = {outcome: 0 for outcome in (
+            NewsletterSubscriber.SUBSCRIBED, NewsletterSubscriber.REACTIVATED, NewsletterSubscriber.ALREADY_ACTIVE,
+        )}
+        for outcome in outcomes.values():
+            counts[outcome] += 1
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {counts[NewsletterSubscriber.SUBSCRIBED]} subscribed, "
+            f"{counts[NewsletterSubscriber.REACTIVATED]} reactivated, "
+            f"{counts[NewsletterSubscriber.ALREADY_ACTIVE]} already active"
+        ))
+        if invalid:
+            self.stdout.write(self.style.WARNING(f'⚠️  Skipped {invalid} invalid addresses'))
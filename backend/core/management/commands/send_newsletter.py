@@ -0,0 +1,42 @@
+"""
+Send newsletter campaigns queued from the admin.
+
+    python manage.py send_newsletter               # queued and interrupted campaigns
+    python manage.py send_newsletter 3 --rate 5    # one campaign, 5 messages/second
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.models import NewsletterCampaign
+from core.utils.newsletter import CampaignLocked, send_campaign
+
+
+class Command(BaseCommand):
+    help = 'Send queued newsletter campaigns, resuming interrupted ones from their checkpoint'
+
+    def add_arguments(self, parser):
+        parser.add_argument('campaign_ids', nargs='*', type=int, help='Campaigns to send (default: queued and interrupted)')
+        parser.add_argument('--batch-size', type=int, default=None, help='Recipients per batch (default NEWSLETTER_BATCH_SIZE)')
+        parser.add_argument('--rate', type=float, default=None, help='Messages per second, 0 for no limit (default NEWSLETTER_RATE_LIMIT)')
+        parser.add_argument('--pool-size', type=int, default=None, help='SMTP connections (default NEWSLETTER_SMTP_POOL_SIZE)')
+
+    def handle(self, *args, **options):
+        if options['campaign_ids']:
+            campaigns = NewsletterCampaign.objects.filter(pk__in=options['campaign_ids']).exclude(status='sent')
+        else:
+            campaigns = NewsletterCampaign.objects.filter(status__in=['queued', 'sending'])
+
+        for campaign in campaigns.order_by('created_at'):
+            self.stdout.write(f'📨 Sending "{campaign}" from subscriber #{campaign.last_subscriber_id + 1}')
+            try:
+                send_campaign(
+                    campaign, batch_size=options['batch_size'], rate=options['rate'], pool_size=options['pool_size'],
+                )
+            except CampaignLocked as exc:
+                self.stdout.write(self.style.WARNING(f'⚠️  {exc}'))
+                continue
+            except Exception as exc:
+                raise CommandError(f'Campaign {campaign.pk} failed after {campaign.sent_count} messages: {exc}')
+            self.stdout.write(self.style.SUCCESS(
+                f'✅ {campaign.sent_count} sent, {campaign.failed_count} refused'
+            ))
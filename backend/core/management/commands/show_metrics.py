@@ -0,0 +1,44 @@
+"""
+Print the counters kept in core.utils.metrics.
+
+    python manage.py show_metrics
+    python manage.py show_metrics --reset
+"""
+
+from django.core.management.base import BaseCommand
+
+from core.utils import metrics
+
+
+class Command(BaseCommand):
+    help = 'Show performance counters (compression ratio, cache hits, ...)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reset', action='store_true', help='Zero the counters after printing them')
+
+    def handle(self, *args, **options):
+        for group, names in metrics.METRICS.items():
+            values = metrics.read(names)
+            self.stdout.write(self.style.MIGRATE_HEADING(group))
+            for name in names:
+                self.stdout.write(f'  {name:<40}{values[name]:>14}')
+            for line in getattr(self, f'summarize_{group}', lambda values: [])(values):
+                self.stdout.write(f'  {line}')
+            if options['reset']:
+                metrics.reset(names)
+
+    def summarize_compression(self, values):
+        for encoding in ('gzip', 'br'):
+            bytes_in = values[f'compression.{encoding}.bytes_in']
+            if bytes_in:
+                ratio = values[f'compression.{encoding}.bytes_out'] / bytes_in
+                yield f'{encoding} ratio: {ratio:.1%} of original size'
+        served = values['compression.cache_hits'] + values['compression.cache_misses']
+        if served:
+            yield f"compressed body cache hit rate: {values['compression.cache_hits'] / served:.1%}"
+
+    def summarize_transforms(self, values):
+        # A coalesced request waited for another's render instead of rendering
+        served = values['transforms.hits'] + values['transforms.coalesced'] + values['transforms.misses']
+        if served:
+            yield f"transform cache hit rate: {1 - values['transforms.misses'] / served:.1%}"
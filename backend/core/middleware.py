@@ -0,0 +1,134 @@
+# core/middleware.py
+
+import gzip
+import hashlib
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.utils.cache import patch_vary_headers
+
+from core.utils import metrics
+from core.utils.query_budget import QueryCounter, get_query_budget
+
+try:
+    import brotli
+except ImportError:  # optional dependency, gzip only without it
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetMiddleware:
+    """
+    DEBUG only: log a warning, with the offending SQL, whenever a request
+    goes over the query budget declared for its route in core.urls.
+    """
+
+    def __init__(self, get_response):
+        if not settings.DEBUG:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with QueryCounter() as counter:
+            response = self.get_response(request)
+
+        match = request.resolver_match
+        budget = get_query_budget(match.url_name) if match else None
+        if budget is not None and counter.exceeds(budget):
+            logger.warning(
+                '%s %s ran %d queries in %.1fms (budget: %d queries, %dms)\n%s',
+                request.method, request.path, counter.count, counter.db_time_ms,
+                budget.queries, budget.db_time_ms,
+                '\n'.join(f'[{duration:.1f}ms] {sql}' for sql, duration in counter.queries),
+            )
+        return response
+
+
+COMPRESSED_KEY = 'core:compressed:{}:{}:{}'
+COMPRESSIBLE_TYPES = ('application/json', 'text/', 'application/javascript', 'image/svg+xml')
+
+
+def _accepted_encoding(header):
+    """'br' or 'gzip', whichever Accept-Encoding ranks higher (br on a tie)"""
+    ranks = {}
+    for part in header.split(','):
+        coding, _, params = part.strip().partition(';')
+        quality = 1.0
+        if params.strip().startswith('q='):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        ranks[coding.strip().lower()] = quality
+
+    supported = ('br', 'gzip') if brotli is not None else ('gzip',)
+    best = max(supported, key=lambda coding: ranks.get(coding, ranks.get('*', 0.0)))
+    return best if ranks.get(best, ranks.get('*', 0.0)) > 0 else None
+
+
+def _compress(content, encoding):
+    if encoding == 'br':
+        return brotli.compress(content, quality=9)
+    return gzip.compress(content, compresslevel=9, mtime=0)
+
+
+class CompressionMiddleware:
+    """
+    gzip/brotli for API responses, negotiated from Accept-Encoding. The
+    compressed bytes are cached under the response's ETag (or a hash of the
+    body), so a payload is compressed once and served from the cache after.
+    Bodies under COMPRESSION_MIN_LENGTH and streaming responses go out as is.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.min_length = getattr(settings, 'COMPRESSION_MIN_LENGTH', 200)
+        self.path_prefixes = tuple(getattr(settings, 'COMPRESSION_PATH_PREFIXES', ('/api/',)))
+        self.timeout = getattr(settings, 'COMPRESSION_CACHE_TIMEOUT', settings.PAGE_CACHE_TIMEOUT)
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if not request.path.startswith(self.path_prefixes) or not self.is_compressible(response):
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        if len(response.content) < self.min_length:
+            metrics.incr('compression.skipped')
+            return response
+        encoding = _accepted_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if encoding is None:
+            return response
+
+        content = response.content
+        etag = response.get('ETag')
+        identity = etag or hashlib.blake2b(content, digest_size=16).hexdigest()
+        key = COMPRESSED_KEY.format(encoding, len(content), hashlib.md5(identity.encode()).hexdigest())
+        compressed = cache.get(key)
+        if compressed is None:
+            compressed = _compress(content, encoding)
+            cache.set(key, compressed, self.timeout)
+            metrics.incr('compression.cache_misses')
+        else:
+            metrics.incr('compression.cache_hits')
+        metrics.incr(f'compression.{encoding}.bytes_in', len(content))
+        metrics.incr(f'compression.{encoding}.bytes_out', len(compressed))
+
+        response.content = compressed
+        response.headers['Content-Length'] = str(len(compressed))
+        response.headers['Content-Encoding'] = encoding
+        # The compressed bytes differ from the identity body the ETag names
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        return response
+
+    def is_compressible(self, response):
+        content_type = response.get('Content-Type', '')
+        return (
+            not response.streaming
+            and response.status_code == 200
+            and not response.has_header('Content-Encoding')
+            and content_type.startswith(COMPRESSIBLE_TYPES)
+        )
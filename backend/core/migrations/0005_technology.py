@@ -0,0 +1,87 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:38
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def link_technologies(apps, schema_editor):
+    Technology = apps.get_model('core', 'Technology')
+    technologies = {}
+
+    def technology(name):
+        key = name.lower()
+        if key not in technologies:
+            technologies[key], _ = Technology.objects.get_or_create(key=key, defaults={'name': name})
+        return technologies[key]
+
+    for model_name, link_name, owner in (
+        ('Project', 'ProjectTechnology', 'project'),
+        ('Experience', 'ExperienceTechnology', 'experience'),
+    ):
+        Link = apps.get_model('core', link_name)
+        links = []
+        for obj in apps.get_model('core', model_name).objects.only('technologies').iterator():
+            names = [tech.strip() for tech in obj.technologies.split(',') if tech.strip()]
+            by_key = {}
+            for name in names:
+                by_key.setdefault(name.lower(), name)
+            links.extend(
+                Link(**{owner: obj}, technology=technology(name), order=order)
+                for order, name in enumerate(by_key.values())
+            )
+        Link.objects.bulk_create(links, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_project_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Technology',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('key', models.CharField(help_text='Lowercased name used for exact filtering', max_length=100, unique=True)),
+            ],
+            options={
+                'verbose_name': 'Technology',
+                'verbose_name_plural': 'Technologies',
+                'db_table': 'core_technology',
+                'ordering': ['name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ProjectTechnology',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('order', models.IntegerField(default=0)),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='technology_links', to='core.project')),
+                ('technology', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='project_links', to='core.technology')),
+            ],
+            options={
+                'db_table': 'core_projecttechnology',
+                'ordering': ['order'],
+                'indexes': [models.Index(fields=['technology', 'project'], name='core_projtech_tech_idx')],
+                'constraints': [models.UniqueConstraint(fields=('project', 'technology'), name='core_projecttechnology_unique')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ExperienceTechnology',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('order', models.IntegerField(default=0)),
+                ('experience', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='technology_links', to='core.experience')),
+                ('technology', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='experience_links', to='core.technology')),
+            ],
+            options={
+                'db_table': 'core_experiencetechnology',
+                'ordering': ['order'],
+                'indexes': [models.Index(fields=['technology', 'experience'], name='core_exptech_tech_idx')],
+                'constraints': [models.UniqueConstraint(fields=('experience', 'technology'), name='core_experiencetechnology_unique')],
+            },
+        ),
+        migrations.RunPython(link_technologies, migrations.RunPython.noop),
+    ]
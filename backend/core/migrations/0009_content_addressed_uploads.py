@@ -0,0 +1,44 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:06
+
+import core.utils.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_image_derivatives'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='personalinfo',
+            name='resume_pdf',
+            field=models.FileField(blank=True, null=True, storage=core.utils.storage.upload_storage, upload_to='resume/'),
+        ),
+        migrations.AlterField(
+            model_name='project',
+            name='featured_image',
+            field=models.ImageField(blank=True, null=True, storage=core.utils.storage.upload_storage, upload_to='projects/featured/'),
+        ),
+        migrations.AlterField(
+            model_name='project',
+            name='thumbnail',
+            field=models.ImageField(blank=True, null=True, storage=core.utils.storage.upload_storage, upload_to='projects/thumbnails/'),
+        ),
+        migrations.AlterField(
+            model_name='sitesettings',
+            name='favicon',
+            field=models.ImageField(blank=True, null=True, storage=core.utils.storage.upload_storage, upload_to='site/'),
+        ),
+        migrations.AlterField(
+            model_name='sitesettings',
+            name='logo',
+            field=models.ImageField(blank=True, null=True, storage=core.utils.storage.upload_storage, upload_to='site/'),
+        ),
+        migrations.AlterField(
+            model_name='testimonial',
+            name='client_photo',
+            field=models.ImageField(blank=True, null=True, storage=core.utils.storage.upload_storage, upload_to='testimonials/'),
+        ),
+    ]
@@ -1,9 +1,12 @@
 # core/models.py
 
-from django.db import models
+from django.db import connections, models, router, transaction
+from django.utils import timezone
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.utils.text import slugify
 
+from core.utils.storage import upload_storage
+
 
 class PersonalInfo(models.Model):
     """Main personal information - Only one instance should exist"""
@@ -32,7 +35,7 @@ class PersonalInfo(models.Model):
     dribbble_url = models.URLField(blank=True, null=True)
     
     # Resume
-    resume_pdf = models.FileField(upload_to='resume/', blank=True, null=True)
+    resume_pdf = models.FileField(upload_to='resume/', blank=True, null=True, storage=upload_storage)
     
     # Footer
     footer_tagline = models.CharField(max_length=200)
@@ -56,6 +59,12 @@ class PersonalInfo(models.Model):
             raise ValueError('Only one PersonalInfo instance is allowed')
         return super().save(*args, **kwargs)
 
+    @classmethod
+    def get_active(cls):
+        """The active PersonalInfo, cached in process memory across requests"""
+        from core.utils.cache import get_cached_singleton
+        return get_cached_singleton(cls, is_active=True)
+
 
 class CoreExpertise(models.Model):
     """Core expertise items shown in about section"""
@@ -63,6 +72,7 @@ class CoreExpertise(models.Model):
     icon_name = models.CharField(max_length=50, help_text="Icon identifier (e.g., 'code', 'palette', 'layers')")
     order = models.IntegerField(default=0)
     is_active = models.BooleanField(default=True)
+    updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         db_table = 'core_coreexpertise'
@@ -94,6 +104,7 @@ class Skill(models.Model):
     icon_name = models.CharField(max_length=50, blank=True, help_text="Icon identifier for the skill")
     order = models.IntegerField(default=0)
     is_active = models.BooleanField(default=True)
+    updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         db_table = 'core_skill'
@@ -110,6 +121,7 @@ class Tool(models.Model):
     name = models.CharField(max_length=100)
     order = models.IntegerField(default=0)
     is_active = models.BooleanField(default=True)
+    updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         db_table = 'core_tool'
@@ -127,6 +139,7 @@ class ProjectCategory(models.Model):
     slug = models.SlugField(unique=True, blank=True)
     order = models.IntegerField(default=0)
     is_active = models.BooleanField(default=True)
+    updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         db_table = 'core_projectcategory'
@@ -143,6 +156,52 @@ class ProjectCategory(models.Model):
         super().save(*args, **kwargs)
 
 
+class Technology(models.Model):
+    """Technologies used by projects and experience entries"""
+    name = models.CharField(max_length=100)
+    key = models.CharField(max_length=100, unique=True, help_text="Lowercased name used for exact filtering")
+    
+    class Meta:
+        db_table = 'core_technology'
+        ordering = ['name']
+        verbose_name = "Technology"
+        verbose_name_plural = "Technologies"
+    
+    def __str__(self):
+        return self.name
+    
+    @staticmethod
+    def parse(value):
+        """Split a comma-separated technologies string into names"""
+        return [tech.strip() for tech in value.split(',') if tech.strip()]
+    
+    @classmethod
+    def for_names(cls, names):
+        """Return {key: Technology} for `names`, creating the missing ones"""
+        wanted = {}
+        for name in names:
+            wanted.setdefault(name.lower(), name)
+        existing = {tech.key: tech for tech in cls.objects.filter(key__in=wanted)}
+        missing = [cls(name=name, key=key) for key, name in wanted.items() if key not in existing]
+        if missing:
+            cls.objects.bulk_create(missing, ignore_conflicts=True)
+            existing = {tech.key: tech for tech in cls.objects.filter(key__in=wanted)}
+        return existing
+    
+    @classmethod
+    def sync_links(cls, links, value):
+        """Rewrite a `technology_links` related manager from a comma-separated string"""
+        keys = list(dict.fromkeys(name.lower() for name in cls.parse(value)))
+        if list(links.values_list('technology__key', flat=True)) == keys:
+            return
+        technologies = cls.for_names(cls.parse(value))
+        links.all().delete()
+        links.model.objects.bulk_create([
+            links.model(**{links.field.name: links.instance}, technology=technologies[key], order=order)
+            for order, key in enumerate(keys)
+        ])
+
+
 class Project(models.Model):
     """Portfolio projects"""
     title = models.CharField(max_length=200)
@@ -152,8 +211,10 @@ class Project(models.Model):
     full_description = models.TextField(blank=True)
     
     # Images
-    thumbnail = models.ImageField(upload_to='projects/thumbnails/', blank=True, null=True)
-    featured_image = models.ImageField(upload_to='projects/featured/', blank=True, null=True)
+    thumbnail = models.ImageField(upload_to='projects/thumbnails/', blank=True, null=True, storage=upload_storage)
+    featured_image = models.ImageField(upload_to='projects/featured/', blank=True, null=True, storage=upload_storage)
+    # Responsive sizes of the images above, built by core.utils.images
+    image_derivatives = models.JSONField(default=dict, blank=True, editable=False)
     
     # Technologies used (comma-separated for simplicity)
     technologies = models.CharField(
@@ -189,7 +250,27 @@ class Project(models.Model):
     
     def get_technologies_list(self):
         """Return technologies as a list"""
-        return [tech.strip() for tech in self.technologies.split(',') if tech.strip()]
+        return Technology.parse(self.technologies)
+
+
+class ProjectTechnology(models.Model):
+    """Normalized link between a project and the technologies it lists"""
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='technology_links')
+    technology = models.ForeignKey(Technology, on_delete=models.CASCADE, related_name='project_links')
+    order = models.IntegerField(default=0)
+    
+    class Meta:
+        db_table = 'core_projecttechnology'
+        ordering = ['order']
+        constraints = [
+            models.UniqueConstraint(fields=['project', 'technology'], name='core_projecttechnology_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['technology', 'project'], name='core_projtech_tech_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.project} - {self.technology}"
 
 
 class Experience(models.Model):
@@ -208,6 +289,7 @@ class Experience(models.Model):
     
     order = models.IntegerField(default=0)
     is_active = models.BooleanField(default=True)
+    updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         db_table = 'core_experience'
@@ -224,7 +306,27 @@ class Experience(models.Model):
     
     def get_technologies_list(self):
         """Return technologies as a list"""
-        return [tech.strip() for tech in self.technologies.split(',') if tech.strip()]
+        return Technology.parse(self.technologies)
+
+
+class ExperienceTechnology(models.Model):
+    """Normalized link between an experience entry and its technologies"""
+    experience = models.ForeignKey(Experience, on_delete=models.CASCADE, related_name='technology_links')
+    technology = models.ForeignKey(Technology, on_delete=models.CASCADE, related_name='experience_links')
+    order = models.IntegerField(default=0)
+    
+    class Meta:
+        db_table = 'core_experiencetechnology'
+        ordering = ['order']
+        constraints = [
+            models.UniqueConstraint(fields=['experience', 'technology'], name='core_experiencetechnology_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['technology', 'experience'], name='core_exptech_tech_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.experience} - {self.technology}"
 
 
 class Achievement(models.Model):
@@ -232,6 +334,7 @@ class Achievement(models.Model):
     experience = models.ForeignKey(Experience, on_delete=models.CASCADE, related_name='achievements')
     description = models.TextField()
     order = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         db_table = 'core_achievement'
@@ -252,6 +355,7 @@ class Education(models.Model):
     icon_name = models.CharField(max_length=50, default="graduation-cap", help_text="Icon identifier")
     order = models.IntegerField(default=0)
     is_active = models.BooleanField(default=True)
+    updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         db_table = 'core_education'
@@ -270,6 +374,7 @@ class Timeline(models.Model):
     description = models.TextField(blank=True)
     order = models.IntegerField(default=0)
     is_active = models.BooleanField(default=True)
+    updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         db_table = 'core_timeline'
@@ -286,7 +391,8 @@ class Testimonial(models.Model):
     client_name = models.CharField(max_length=100)
     client_position = models.CharField(max_length=200)
     client_company = models.CharField(max_length=200)
-    client_photo = models.ImageField(upload_to='testimonials/', blank=True, null=True)
+    client_photo = models.ImageField(upload_to='testimonials/', blank=True, null=True, storage=upload_storage)
+    image_derivatives = models.JSONField(default=dict, blank=True, editable=False)
     testimonial = models.TextField()
     rating = models.IntegerField(
         validators=[MinValueValidator(1), MaxValueValidator(5)],
@@ -295,6 +401,7 @@ class Testimonial(models.Model):
     order = models.IntegerField(default=0)
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         db_table = 'core_testimonial'
@@ -313,11 +420,18 @@ class ContactMessage(models.Model):
     subject = models.CharField(max_length=200)
     message = models.TextField()
     is_read = models.BooleanField(default=False)
-    created_at = models.DateTimeField(auto_now_add=True)
+    # Not auto_now_add: spooled messages keep the time they were submitted
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
+    # Set for messages ingested through the spool (see core.utils.spool)
+    spool_id = models.CharField(max_length=32, unique=True, null=True, blank=True, editable=False)
     
     class Meta:
         db_table = 'core_contactmessage'
         ordering = ['-created_at']
+        indexes = [
+            # The admin changelist's keyset (-created_at, -pk)
+            models.Index(fields=['-created_at', '-id'], name='core_contact_created_idx'),
+        ]
         verbose_name = "Contact Message"
         verbose_name_plural = "Contact Messages"
     
@@ -331,22 +445,134 @@ class NewsletterSubscriber(models.Model):
     is_active = models.BooleanField(default=True)
     subscribed_at = models.DateTimeField(auto_now_add=True)
     
+    # subscribe() outcomes
+    SUBSCRIBED = 'subscribed'
+    REACTIVATED = 'reactivated'
+    ALREADY_ACTIVE = 'already_active'
+    
     class Meta:
         db_table = 'core_newslettersubscriber'
         ordering = ['-subscribed_at']
+        indexes = [
+            # The admin changelist's keyset (-subscribed_at, -pk)
+            models.Index(fields=['-subscribed_at', '-id'], name='core_subscriber_subscribed_idx'),
+        ]
         verbose_name = "Newsletter Subscriber"
         verbose_name_plural = "Newsletter Subscribers"
     
     def __str__(self):
         return self.email
+    
+    @classmethod
+    def subscribe(cls, email):
+        """
+        Subscribe `email` in a single upsert and return SUBSCRIBED,
+        REACTIVATED or ALREADY_ACTIVE
+        """
+        return cls.subscribe_many([email])[email]
+    
+    @classmethod
+    def subscribe_many(cls, emails, batch_size=1000):
+        """
+        Upsert `emails` with one INSERT ... ON CONFLICT (email) DO UPDATE per
+        batch and return {email: outcome}. Inactive rows are reactivated and
+        keep their original subscribed_at; active rows are left untouched, so
+        the RETURNING clause only yields the rows that were written.
+        """
+        emails = list(dict.fromkeys(emails))
+        connection = connections[router.db_for_write(cls)]
+        if connection.vendor not in ('postgresql', 'sqlite') or not connection.features.can_return_rows_from_bulk_insert:
+            return {email: cls._subscribe_fallback(email) for email in emails}
+        
+        table = connection.ops.quote_name(cls._meta.db_table)
+        now = cls._meta.get_field('subscribed_at').get_db_prep_value(timezone.now(), connection)
+        outcomes = dict.fromkeys(emails, cls.ALREADY_ACTIVE)
+        with transaction.atomic(using=connection.alias, savepoint=False), connection.cursor() as cursor:
+            for start in range(0, len(emails), batch_size):
+                batch = emails[start:start + batch_size]
+                if connection.vendor == 'postgresql':
+                    # xmax is 0 only on row versions this statement inserted
+                    created, reactivating = '(xmax = 0)', None
+                else:
+                    # SQLite has no xmax and RETURNING sees only new values: read
+                    # the inactive rows first. The transaction keeps another
+                    # writer from changing them before the upsert.
+                    cursor.execute(
+                        f"SELECT email FROM {table} "
+                        f"WHERE NOT is_active AND email IN ({', '.join(['%s'] * len(batch))})",
+                        batch,
+                    )
+                    created, reactivating = 'NULL', {email for email, in cursor.fetchall()}
+                cursor.execute(
+                    f"INSERT INTO {table} (email, is_active, subscribed_at) "
+                    f"VALUES {', '.join(['(%s, %s, %s)'] * len(batch))} "
+                    f"ON CONFLICT (email) DO UPDATE SET is_active = %s "
+                    f"WHERE NOT {table}.is_active "
+                    f"RETURNING email, {created}",
+                    [value for email in batch for value in (email, True, now)] + [True],
+                )
+                for email, was_created in cursor.fetchall():
+                    if reactivating is not None:
+                        was_created = email not in reactivating
+                    outcomes[email] = cls.SUBSCRIBED if was_created else cls.REACTIVATED
+        return outcomes
+    
+    @classmethod
+    def _subscribe_fallback(cls, email):
+        subscriber, created = cls.objects.get_or_create(email=email, defaults={'is_active': True})
+        if created:
+            return cls.SUBSCRIBED
+        if subscriber.is_active:
+            return cls.ALREADY_ACTIVE
+        subscriber.is_active = True
+        subscriber.save(update_fields=['is_active'])
+        return cls.REACTIVATED
+
+
+class NewsletterCampaign(models.Model):
+    """A newsletter mailing, sent to active subscribers by `manage.py send_newsletter`"""
+    STATUS_CHOICES = [
+        ('draft', 'Draft'),
+        ('queued', 'Queued'),
+        ('sending', 'Sending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    ]
+    
+    subject = models.CharField(max_length=200)
+    body_text = models.TextField(help_text="Plain-text body (Django template: {{ site }}, {{ personal_info }})")
+    body_html = models.TextField(blank=True, help_text="Optional HTML alternative, same template context")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='draft')
+    # Checkpoint: subscribers are mailed in primary key order, every one up
+    # to this id has been handled
+    last_subscriber_id = models.BigIntegerField(default=0, editable=False)
+    sent_count = models.IntegerField(default=0, editable=False)
+    failed_count = models.IntegerField(default=0, editable=False)
+    last_error = models.TextField(blank=True, editable=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True, editable=False)
+    finished_at = models.DateTimeField(null=True, blank=True, editable=False)
+    # Lease on the send: claimed with status='sending', renewed after every
+    # batch, and up for grabs again once it goes stale (the sender died)
+    heartbeat_at = models.DateTimeField(null=True, blank=True, editable=False)
+    
+    class Meta:
+        db_table = 'core_newslettercampaign'
+        ordering = ['-created_at']
+        verbose_name = "Newsletter Campaign"
+        verbose_name_plural = "Newsletter Campaigns"
+    
+    def __str__(self):
+        return self.subject
 
 
 class SiteSettings(models.Model):
     """General site settings"""
     site_title = models.CharField(max_length=200)
     site_description = models.TextField()
-    favicon = models.ImageField(upload_to='site/', blank=True, null=True)
-    logo = models.ImageField(upload_to='site/', blank=True, null=True)
+    favicon = models.ImageField(upload_to='site/', blank=True, null=True, storage=upload_storage)
+    logo = models.ImageField(upload_to='site/', blank=True, null=True, storage=upload_storage)
+    image_derivatives = models.JSONField(default=dict, blank=True, editable=False)
     
     # SEO
     meta_keywords = models.CharField(max_length=500, blank=True)
@@ -356,6 +582,7 @@ class SiteSettings(models.Model):
     primary_color = models.CharField(max_length=7, default="#D4AF37", help_text="Hex color code")
     
     is_active = models.BooleanField(default=True)
+    updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         db_table = 'core_sitesettings'
@@ -369,4 +596,10 @@ class SiteSettings(models.Model):
         # Ensure only one instance exists
         if not self.pk and SiteSettings.objects.exists():
             raise ValueError('Only one SiteSettings instance is allowed')
-        return super().save(*args, **kwargs)
\ No newline at end of file
+        return super().save(*args, **kwargs)
+
+    @classmethod
+    def get_active(cls):
+        """The active SiteSettings, cached in process memory across requests"""
+        from core.utils.cache import get_cached_singleton
+        return get_cached_singleton(cls, is_active=True)
\ No newline at end of file
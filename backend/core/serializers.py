@@ -1,6 +1,10 @@
 # portfolio/serializers.py
 
+from abc import ABCMeta, abstractmethod
+from functools import lru_cache
+
 from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
 from .models import (
     PersonalInfo, CoreExpertise, Skill, Tool, ProjectCategory,
     Project, Experience, Achievement, Education, Timeline,
@@ -8,85 +12,177 @@ from .models import (
 )
 
 
-class PersonalInfoSerializer(serializers.ModelSerializer):
+@lru_cache(maxsize=None)
+def _declared_field_names(serializer_class):
+    return tuple(serializer_class().fields)
+
+
+def sparse_field_names(serializer_class, query_params):
+    """
+    Field names selected by ?fields=a,b or ?exclude=a,b for `serializer_class`,
+    or None when the request asks for every field. Unknown names are ignored.
+    """
+    fields = query_params.get('fields')
+    exclude = query_params.get('exclude')
+    if not fields and not exclude:
+        return None
+    names = set(_declared_field_names(serializer_class))
+    if fields:
+        names &= {name.strip() for name in fields.split(',')}
+    if exclude:
+        names -= {name.strip() for name in exclude.split(',')}
+    return frozenset(names)
+
+
+class SparseFieldsMixin:
+    """
+    Let GET requests trim the output with ?fields= / ?exclude=. Only applies
+    to the serializer a view builds through get_serializer(), never to nested
+    serializers or the combined page payloads.
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        if request is None or 'view' not in self.context or request.method not in SAFE_METHODS:
+            return
+        names = sparse_field_names(type(self), request.query_params)
+        if names is not None:
+            for name in set(self.fields) - names:
+                self.fields.pop(name)
+
+
+class ImageManifestField(serializers.Field, metaclass=ABCMeta):
+    """
+    {image field: ...} read from a model's image_derivatives manifest, for
+    the image fields in `image_fields` that have an entry
+    """
+    def __init__(self, image_fields, **kwargs):
+        self.image_fields = image_fields
+        kwargs.update(source='image_derivatives', read_only=True)
+        super().__init__(**kwargs)
+
+    def to_representation(self, manifest):
+        opts = self.parent.Meta.model._meta
+        return {
+            field_name: self.represent_entry(manifest[field_name], opts.get_field(field_name).storage)
+            for field_name in self.image_fields if manifest.get(field_name)
+        }
+
+    @abstractmethod
+    def represent_entry(self, entry, storage):
+        """The output for one image field's manifest entry"""
+
+
+class SrcsetField(ImageManifestField):
+    """{image field: {format: srcset}}, with absolute URLs like ImageField when there is a request"""
+    def represent_entry(self, entry, storage):
+        request = self.context.get('request')
+        srcset = {}
+        for fmt, files in entry['formats'].items():
+            urls = [(width, storage.url(name)) for width, name in files]
+            if request is not None:
+                urls = [(width, request.build_absolute_uri(url)) for width, url in urls]
+            srcset[fmt] = ', '.join(f'{url} {width}w' for width, url in urls)
+        return srcset
+
+
+class ImageInfoField(ImageManifestField):
+    """{image field: {width, height, color, placeholder}} to reserve layout and paint before the image loads"""
+    def represent_entry(self, entry, storage):
+        return {key: entry.get(key) for key in ('width', 'height', 'color', 'placeholder')}
+
+
+class PersonalInfoSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = PersonalInfo
         exclude = ['id', 'created_at', 'updated_at', 'is_active']
 
 
-class CoreExpertiseSerializer(serializers.ModelSerializer):
+class CoreExpertiseSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = CoreExpertise
         fields = ['id', 'title', 'icon_name', 'order']
 
 
-class SkillSerializer(serializers.ModelSerializer):
+class SkillSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     category_display = serializers.CharField(source='get_category_display', read_only=True)
     
     class Meta:
         model = Skill
         fields = ['id', 'name', 'category', 'category_display', 'proficiency', 'icon_name', 'order']
+        field_dependencies = {'category_display': ('category',)}
 
 
-class ToolSerializer(serializers.ModelSerializer):
+class ToolSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Tool
         fields = ['id', 'name', 'order']
 
 
-class ProjectCategorySerializer(serializers.ModelSerializer):
+class ProjectCategorySerializer(SparseFieldsMixin, serializers.ModelSerializer):
     project_count = serializers.SerializerMethodField()
     
     class Meta:
         model = ProjectCategory
         fields = ['id', 'name', 'slug', 'order', 'project_count']
+        field_dependencies = {'project_count': ()}
     
     def get_project_count(self, obj):
-        return obj.projects.filter(is_active=True).count()
+        # Annotated by ProjectCategoryViewSet; count per row otherwise
+        count = getattr(obj, 'active_project_count', None)
+        if count is None:
+            count = obj.projects.filter(is_active=True).count()
+        return count
 
 
-class ProjectListSerializer(serializers.ModelSerializer):
+class ProjectListSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     category_name = serializers.CharField(source='category.name', read_only=True)
     category_slug = serializers.CharField(source='category.slug', read_only=True)
     technologies_list = serializers.SerializerMethodField()
+    srcset = SrcsetField(image_fields=('thumbnail',))
+    image_info = ImageInfoField(image_fields=('thumbnail',))
     
     class Meta:
         model = Project
         fields = [
             'id', 'title', 'slug', 'category_name', 'category_slug',
-            'short_description', 'thumbnail', 'technologies_list',
+            'short_description', 'thumbnail', 'srcset', 'image_info', 'technologies_list',
             'is_featured', 'live_url', 'github_url', 'case_study_url'
         ]
+        field_dependencies = {'technologies_list': ('technology_links__technology__name',)}
     
     def get_technologies_list(self, obj):
-        return obj.get_technologies_list()
+        return [link.technology.name for link in obj.technology_links.all()]
 
 
-class ProjectDetailSerializer(serializers.ModelSerializer):
+class ProjectDetailSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     category_name = serializers.CharField(source='category.name', read_only=True)
     category_slug = serializers.CharField(source='category.slug', read_only=True)
     technologies_list = serializers.SerializerMethodField()
+    srcset = SrcsetField(image_fields=('thumbnail', 'featured_image'))
+    image_info = ImageInfoField(image_fields=('thumbnail', 'featured_image'))
     
     class Meta:
         model = Project
         fields = [
             'id', 'title', 'slug', 'category_name', 'category_slug',
             'short_description', 'full_description', 'thumbnail',
-            'featured_image', 'technologies_list', 'is_featured',
+            'featured_image', 'srcset', 'image_info', 'technologies_list', 'is_featured',
             'live_url', 'github_url', 'case_study_url', 'created_at', 'updated_at'
         ]
+        field_dependencies = {'technologies_list': ('technology_links__technology__name',)}
     
     def get_technologies_list(self, obj):
-        return obj.get_technologies_list()
+        return [link.technology.name for link in obj.technology_links.all()]
 
 
-class AchievementSerializer(serializers.ModelSerializer):
+class AchievementSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Achievement
         fields = ['id', 'description', 'order']
 
 
-class ExperienceSerializer(serializers.ModelSerializer):
+class ExperienceSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     achievements = AchievementSerializer(many=True, read_only=True)
     technologies_list = serializers.SerializerMethodField()
     is_current = serializers.BooleanField(read_only=True)
@@ -99,9 +195,14 @@ class ExperienceSerializer(serializers.ModelSerializer):
             'is_current', 'date_display', 'description',
             'technologies_list', 'achievements', 'order'
         ]
+        field_dependencies = {
+            'technologies_list': ('technology_links__technology__name',),
+            'is_current': ('end_date',),
+            'date_display': ('start_date', 'end_date'),
+        }
     
     def get_technologies_list(self, obj):
-        return obj.get_technologies_list()
+        return [link.technology.name for link in obj.technology_links.all()]
     
     def get_date_display(self, obj):
         start = obj.start_date.strftime('%b %Y')
@@ -109,43 +210,50 @@ class ExperienceSerializer(serializers.ModelSerializer):
         return f"{start} - {end}"
 
 
-class EducationSerializer(serializers.ModelSerializer):
+class EducationSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Education
         fields = ['id', 'degree', 'institution', 'year', 'description', 'icon_name', 'order']
 
 
-class TimelineSerializer(serializers.ModelSerializer):
+class TimelineSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Timeline
         fields = ['id', 'year', 'title', 'description', 'order']
 
 
-class TestimonialSerializer(serializers.ModelSerializer):
+class TestimonialSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    srcset = SrcsetField(image_fields=('client_photo',))
+    image_info = ImageInfoField(image_fields=('client_photo',))
+    
     class Meta:
         model = Testimonial
         fields = [
             'id', 'client_name', 'client_position', 'client_company',
-            'client_photo', 'testimonial', 'rating', 'order'
+            'client_photo', 'srcset', 'image_info', 'testimonial', 'rating', 'order'
         ]
 
 
-class ContactMessageSerializer(serializers.ModelSerializer):
+class ContactMessageSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = ContactMessage
         fields = ['name', 'email', 'subject', 'message']
 
 
-class NewsletterSubscriberSerializer(serializers.ModelSerializer):
+class NewsletterSubscriberSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = NewsletterSubscriber
         fields = ['email']
+        # Existing addresses are handled by NewsletterSubscriber.subscribe()
+        extra_kwargs = {'email': {'validators': []}}
 
 
-class SiteSettingsSerializer(serializers.ModelSerializer):
+class SiteSettingsSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    srcset = SrcsetField(image_fields=('logo', 'favicon'))
+    
     class Meta:
         model = SiteSettings
-        exclude = ['id', 'is_active']
+        exclude = ['id', 'is_active', 'updated_at', 'image_derivatives']
 
 
 # Combined serializer for homepage data
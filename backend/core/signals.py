@@ -0,0 +1,66 @@
+# core/signals.py
+
+from django.db import connections
+from django.db.migrations.recorder import MigrationRecorder
+from django.db.models.signals import post_save, post_delete
+
+from core.models import (
+    PersonalInfo, CoreExpertise, Skill, Tool, ProjectCategory,
+    Project, Experience, Achievement, Education, Timeline,
+    Testimonial, SiteSettings, Technology, ProjectTechnology, ExperienceTechnology
+)
+from core.utils.cache import bump_content_generation
+from core.utils.images import schedule_derivatives
+from core.utils.search import install_search_index
+
+# Models whose rows end up in API responses. ContactMessage and
+# NewsletterSubscriber are write-only inboxes and never invalidate pages.
+CONTENT_MODELS = (
+    PersonalInfo, CoreExpertise, Skill, Tool, ProjectCategory,
+    Project, Experience, Achievement, Education, Timeline,
+    Testimonial, SiteSettings, Technology, ProjectTechnology, ExperienceTechnology,
+)
+
+
+def content_changed(sender, **kwargs):
+    bump_content_generation(sender)
+
+
+for model in CONTENT_MODELS:
+    uid = f'core.content_changed.{model._meta.model_name}'
+    post_save.connect(content_changed, sender=model, dispatch_uid=uid)
+    post_delete.connect(content_changed, sender=model, dispatch_uid=uid)
+
+
+def repair_search_index(sender, using, **kwargs):
+    # SQLite drops triggers when a migration rebuilds core_project
+    connection = connections[using]
+    if ('core', '0004_project_search_index') in MigrationRecorder(connection).applied_migrations():
+        install_search_index(connection)
+
+
+def technologies_changed(sender, instance, raw=False, **kwargs):
+    # Keep the normalized Technology links in step with the edited string
+    if not raw:
+        Technology.sync_links(instance.technology_links, instance.technologies)
+
+
+post_save.connect(technologies_changed, sender=Project, dispatch_uid='core.technologies_changed.project')
+post_save.connect(technologies_changed, sender=Experience, dispatch_uid='core.technologies_changed.experience')
+
+
+# Image fields that get responsive derivatives, per model
+IMAGE_FIELDS = {
+    Project: ('thumbnail', 'featured_image'),
+    Testimonial: ('client_photo',),
+    SiteSettings: ('logo', 'favicon'),
+}
+
+
+def images_changed(sender, instance, raw=False, **kwargs):
+    if not raw:
+        schedule_derivatives(instance, IMAGE_FIELDS[sender])
+
+
+for model in IMAGE_FIELDS:
+    post_save.connect(images_changed, sender=model, dispatch_uid=f'core.images_changed.{model._meta.model_name}')
@@ -1,3 +1,1246 @@
-from django.test import TestCase
+import base64
+import gzip
+import io
+import json
+import multiprocessing
+import os
+import socket
+import tempfile
+import threading
+import time
+import unittest
+from datetime import date, timedelta
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import get_resolver, reverse
+from django.utils import timezone
+
+from core.models import (
+    PersonalInfo, CoreExpertise, Skill, Tool, ProjectCategory,
+    Project, Experience, Achievement, Education, Timeline,
+    Testimonial, SiteSettings, Technology, ProjectTechnology, ExperienceTechnology, ContactMessage,
+    NewsletterSubscriber, NewsletterCampaign
+)
+from core.serializers import ImageManifestField, ProjectCategorySerializer, ProjectListSerializer
+from core.signals import repair_search_index
+from core.urls import QUERY_BUDGETS
+from core.utils import batch, images, metrics, query_planner, search, transforms
+from core.utils.cache import clear_cached_singletons
+from core.utils.newsletter import CAMPAIGN_LOCK_TIMEOUT, CampaignLocked, claim_campaign, send_campaign
+from core.utils.pagination import EstimatedCountPaginator
+from core.utils.spool import SPOOL_FILE, flush_contact_spool
+from core.utils.storage import collect_garbage, is_content_addressed, upload_storage
+from core.utils.throttling import ScopedAnonThrottle, get_bucket_table
+from core.utils.query_budget import QueryBudget, QueryCounter
+
+from PIL import Image
+
+try:
+    from aiosmtpd.controller import Controller
+except ImportError:  # optional: only needed for the SMTP delivery test
+    Controller = None
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+UNTHROTTLED = {
+    **settings.REST_FRAMEWORK, 'DEFAULT_THROTTLE_RATES': {'user': None, 'contact': None, 'newsletter': None, 'batch': None},
+}
+
+
+def seed_rows(count):
+    """Top every content table up to `count` active rows"""
+    # bulk_create sends no signals: drop the model stamps it leaves stale
+    cache.clear()
+    if not PersonalInfo.objects.exists():
+        PersonalInfo.objects.create(
+            name='Test', title='Developer', tagline='Tagline', hero_description='Hero',
+            about_heading='About', about_description='About', about_detail='Detail',
+            email='test@example.com', phone='000', location='Earth', availability_status='Available',
+            years_experience=1, projects_completed=1, awards_won=1, happy_clients=1,
+            footer_tagline='Footer', copyright_text='Copyright',
+        )
+    if not SiteSettings.objects.exists():
+        SiteSettings.objects.create(site_title='Test', site_description='Test')
+
+    def top_up(model, make):
+        start = model.objects.count()
+        model.objects.bulk_create([make(i) for i in range(start, count)])
+
+    categories = [key for key, _ in Skill.CATEGORY_CHOICES]
+    top_up(CoreExpertise, lambda i: CoreExpertise(title=f'Expertise {i}', icon_name='code', order=i))
+    top_up(Skill, lambda i: Skill(name=f'Skill {i}', category=categories[i % len(categories)], proficiency=3, order=i))
+    top_up(Tool, lambda i: Tool(name=f'Tool {i}', order=i))
+    top_up(ProjectCategory, lambda i: ProjectCategory(name=f'Category {i}', slug=f'category-{i}', order=i))
+    project_categories = list(ProjectCategory.objects.all())
+    top_up(Project, lambda i: Project(
+        title=f'Project {i}', slug=f'project-{i}', category=project_categories[i % len(project_categories)],
+        short_description='Short', full_description='Full ' * 50, technologies='Django, React',
+        is_featured=i % 2 == 0, order=i,
+    ))
+    top_up(Experience, lambda i: Experience(
+        title=f'Role {i}', company='Company', start_date=date(2020, 1, 1), description='Description',
+        technologies='Python, Django', order=i,
+    ))
+    experiences = list(Experience.objects.order_by('pk'))
+    projects = list(Project.objects.order_by('pk'))
+    technologies = list(Technology.for_names(['Django', 'React']).values())
+    top_up(ProjectTechnology, lambda i: ProjectTechnology(project=projects[i], technology=technologies[i % 2]))
+    top_up(ExperienceTechnology, lambda i: ExperienceTechnology(experience=experiences[i], technology=technologies[i % 2]))
+    top_up(Achievement, lambda i: Achievement(experience=experiences[i % len(experiences)], description='Done', order=i))
+    top_up(Education, lambda i: Education(degree=f'Degree {i}', institution='University', year=2000 + i % 20, order=i))
+    top_up(Timeline, lambda i: Timeline(year=2000 + i % 20, title=f'Milestone {i}', order=i))
+    top_up(Testimonial, lambda i: Testimonial(
+        client_name=f'Client {i}', client_position='CTO', client_company='Company', testimonial='Great', order=i,
+    ))
+
+
+DETAIL_MODELS = {
+    'personal-info-detail': PersonalInfo, 'core-expertise-detail': CoreExpertise, 'skills-detail': Skill,
+    'tools-detail': Tool, 'project-categories-detail': ProjectCategory, 'experience-detail': Experience,
+    'education-detail': Education, 'timeline-detail': Timeline, 'testimonials-detail': Testimonial,
+}
+WRITE_ROUTES = {'contact', 'newsletter-subscribe', 'batch'}
+
+
+def api_routes():
+    """(url_name, path) for every GET route in core.urls, detail routes included"""
+    routes = []
+    for url_name in QUERY_BUDGETS:
+        if url_name in WRITE_ROUTES:
+            continue
+        kwargs = {}
+        if url_name == 'projects-detail':
+            kwargs = {'slug': Project.objects.order_by('pk').values_list('slug', flat=True).first()}
+        elif url_name in DETAIL_MODELS:
+            kwargs = {'pk': DETAIL_MODELS[url_name].objects.order_by('pk').values_list('pk', flat=True).first()}
+        routes.append((url_name, reverse(url_name, kwargs=kwargs)))
+    return routes
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class ConditionalGetTests(TestCase):
+    """Read endpoints answer If-None-Match / If-Modified-Since from the model stamps"""
+
+    PATHS = ('/api/site-settings/', '/api/projects/', '/api/skills/', '/api/homepage/')
+
+    def setUp(self):
+        seed_rows(2)
+
+    def get(self, path, **headers):
+        return self.client.get(path, HTTP_HOST='localhost', **headers)
+
+    def test_unchanged_content_is_not_modified(self):
+        for path in self.PATHS:
+            response = self.get(path)
+            self.assertEqual(response.status_code, 200, path)
+            with QueryCounter() as counter:
+                revalidated = self.get(path, HTTP_IF_NONE_MATCH=response['ETag'])
+            self.assertEqual(revalidated.status_code, 304, path)
+            self.assertEqual(counter.count, 0, path)
+            self.assertEqual(self.get(path, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']).status_code, 304, path)
+
+    def test_edit_changes_the_validators(self):
+        response = self.get('/api/site-settings/')
+        site_settings = SiteSettings.objects.get()
+        site_settings.site_title = 'Renamed'
+        with self.captureOnCommitCallbacks(execute=True):
+            site_settings.save()
+
+        fresh = self.get('/api/site-settings/', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(fresh.status_code, 200)
+        self.assertNotEqual(fresh['ETag'], response['ETag'])
+        self.assertEqual(fresh.json()['site_title'], 'Renamed')
+
+    def test_site_settings_payload_keeps_its_fields(self):
+        payload = self.get('/api/site-settings/').json()
+        for field in ('id', 'is_active', 'updated_at', 'image_derivatives'):
+            self.assertNotIn(field, payload)
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class QueryBudgetTests(TestCase):
+    """
+    Every route stays within its declared query count, whatever the row
+    count. DB time varies with the machine, so it is only checked through
+    the DEBUG middleware's report.
+    """
+
+    def measure(self, path):
+        cache.clear()
+        clear_cached_singletons()
+        with QueryCounter() as counter:
+            response = self.client.get(path, HTTP_HOST='localhost')
+        self.assertEqual(response.status_code, 200, path)
+        return counter
+
+    def test_every_route_declares_a_budget(self):
+        names = {name for name in get_resolver('core.urls').reverse_dict if isinstance(name, str)}
+        self.assertEqual(names - set(QUERY_BUDGETS), set())
+
+    def test_query_counts_do_not_grow_with_rows(self):
+        counts = {}
+        for rows in (10, 100, 1000):
+            seed_rows(rows)
+            for url_name, path in api_routes():
+                counter = self.measure(path)
+                budget = QUERY_BUDGETS[url_name]
+                self.assertLessEqual(
+                    counter.count, budget.queries,
+                    f'{path} ran {counter.count} queries with {rows} rows (budget {budget.queries})',
+                )
+                counts.setdefault(url_name, set()).add(counter.count)
+
+        grew = {url_name: sorted(seen) for url_name, seen in counts.items() if len(seen) > 1}
+        self.assertEqual(grew, {})
+
+    @override_settings(DEBUG=True)
+    def test_time_over_budget_is_reported(self):
+        seed_rows(10)
+        # Within the query count, but any time at all is over a 0ms budget
+        slow = QueryBudget(QUERY_BUDGETS['tools-list'].queries, 0)
+        with mock.patch.dict(QUERY_BUDGETS, {'tools-list': slow}):
+            with self.assertLogs('core.middleware', 'WARNING') as logs:
+                counter = self.measure('/api/tools/')
+        self.assertLessEqual(counter.count, slow.queries)
+        self.assertTrue(counter.exceeds(slow))
+        self.assertIn('budget: ', logs.output[0])
+        self.assertIn('/api/tools/', logs.output[0])
+
+    def test_cached_pages_run_no_queries(self):
+        seed_rows(10)
+        for path in ('/api/homepage/', '/api/about/', '/api/skills-page/', '/api/experience-page/'):
+            self.client.get(path, HTTP_HOST='localhost')
+            with QueryCounter() as counter:
+                self.client.get(path, HTTP_HOST='localhost')
+            self.assertEqual(counter.count, 0, path)
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class ProjectSearchTests(TestCase):
+    """?search= is full-text, ranked, and its SQLite index follows every write"""
+
+    def setUp(self):
+        seed_rows(1)
+
+    def create_project(self, slug, **fields):
+        defaults = {'title': slug, 'short_description': 'Short', 'full_description': 'Full', 'technologies': ''}
+        return Project.objects.create(slug=slug, category=ProjectCategory.objects.first(), **{**defaults, **fields})
+
+    def search(self, terms):
+        response = self.client.get(f'/api/projects/?search={terms}', HTTP_HOST='localhost')
+        return [project['slug'] for project in response.json()]
+
+    def test_title_matches_rank_first(self):
+        self.create_project('mentioned', full_description='Built a small gateway for payments')
+        self.create_project('described', short_description='Payments dashboard')
+        self.create_project('titled', title='Payments gateway')
+        self.assertEqual(self.search('payments'), ['titled', 'described', 'mentioned'])
+        self.assertEqual(self.search('gateway'), ['titled', 'mentioned'])
+        self.assertEqual(self.search('paym'), ['titled', 'described', 'mentioned'])
+
+    def test_index_follows_insert_update_and_delete(self):
+        project = self.create_project('shop', title='Bookshop storefront')
+        self.assertEqual(self.search('storefront'), ['shop'])
+        project.title = 'Bakery checkout'
+        project.save()
+        self.assertEqual(self.search('storefront'), [])
+        self.assertEqual(self.search('bakery'), ['shop'])
+        project.delete()
+        self.assertEqual(self.search('bakery'), [])
+
+    @unittest.skipUnless(connection.vendor == 'sqlite', 'SQLite FTS5 triggers')
+    def test_repair_reindexes_after_table_rebuild(self):
+        # What a migration that rebuilds core_project leaves behind
+        with connection.cursor() as cursor:
+            for statement in search.SQLITE_UNINSTALL[:3]:
+                cursor.execute(statement)
+        self.create_project('orphan', title='Telescope controller')
+        self.assertEqual(self.search('telescope'), [])
+
+        repair_search_index(sender=None, using='default')
+        self.assertEqual(self.search('telescope'), ['orphan'])
+        self.create_project('later', title='Telescope mount')
+        self.assertEqual(sorted(self.search('telescope')), ['later', 'orphan'])
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class KeysetPaginationTests(TestCase):
+    """?page_size= / ?cursor= page any list by keyset; without them lists are unpaginated"""
+
+    def setUp(self):
+        # Ties on `order` are broken by the pk
+        Tool.objects.bulk_create([Tool(name=f'Tool {i}', order=order) for i, order in enumerate([1, 0, 1, 0, 1])])
+        self.expected = list(Tool.objects.order_by('order', 'pk').values_list('name', flat=True))
+
+    def get(self, url):
+        response = self.client.get(url, HTTP_HOST='localhost')
+        self.assertEqual(response.status_code, 200, url)
+        return response.json()
+
+    def test_next_and_previous_links_walk_every_row_once(self):
+        pages = [self.get('/api/tools/?page_size=2')]
+        self.assertIsNone(pages[0]['previous'])
+        while pages[-1]['next']:
+            pages.append(self.get(pages[-1]['next']))
+        self.assertEqual([len(page['results']) for page in pages], [2, 2, 1])
+        self.assertEqual([tool['name'] for page in pages for tool in page['results']], self.expected)
+        self.assertIsNone(pages[-1]['next'])
+
+        back = self.get(pages[-1]['previous'])
+        self.assertEqual(back['results'], pages[1]['results'])
+        first = self.get(back['previous'])
+        self.assertEqual(first['results'], pages[0]['results'])
+        self.assertIsNone(first['previous'])
+
+    def test_rows_added_between_pages_are_not_repeated(self):
+        page = self.get('/api/tools/?page_size=2')
+        Tool.objects.create(name='Early', order=-1)
+        rest = self.get(page['next'])
+        self.assertEqual([tool['name'] for tool in rest['results']], self.expected[2:4])
+
+    def test_invalid_or_tampered_cursor_is_not_found(self):
+        forged = base64.urlsafe_b64encode(b'{"v":["x","y"],"r":false}').decode()
+        short = base64.urlsafe_b64encode(b'{"v":[1],"r":false}').decode()
+        for cursor in ('garbage', forged, short, 'e30='):
+            response = self.client.get(f'/api/tools/?cursor={cursor}', HTTP_HOST='localhost')
+            self.assertEqual(response.status_code, 404, cursor)
+
+    def test_lists_stay_unpaginated_without_parameters(self):
+        tools = self.get('/api/tools/')
+        self.assertIsInstance(tools, list)
+        self.assertEqual([tool['name'] for tool in tools], self.expected)
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class SparseFieldsTests(TestCase):
+    """?fields= / ?exclude= trim the payload and the columns loaded"""
+
+    def setUp(self):
+        seed_rows(3)
+
+    def test_fields_trim_payload_and_columns(self):
+        with QueryCounter() as counter:
+            response = self.client.get('/api/projects/?fields=title,slug', HTTP_HOST='localhost')
+        self.assertEqual(set(response.json()[0]), {'title', 'slug'})
+        select = next(sql for sql, _ in counter.queries if 'FROM "core_project"' in sql and 'MAX(' not in sql)
+        self.assertNotIn('full_description', select)
+
+    def test_plan_cache_is_bounded(self):
+        names = sorted(ProjectListSerializer().fields)[:10]
+        for mask in range(1, 2 ** len(names)):
+            subset = [name for bit, name in enumerate(names) if mask >> bit & 1]
+            query_planner.plan_queryset(Project.objects.all(), ProjectListSerializer, subset)
+        self.assertLessEqual(query_planner._plan_for.cache_info().currsize, query_planner.PLAN_CACHE_SIZE)
+
+    def test_exclude_drops_fields(self):
+        response = self.client.get('/api/experience/?exclude=achievements,description', HTTP_HOST='localhost')
+        row = response.json()[0]
+        self.assertNotIn('achievements', row)
+        self.assertIn('title', row)
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class StreamingListTests(TestCase):
+    """?stream=1 returns the same list as the buffered response"""
+
+    def test_stream_matches_list(self):
+        seed_rows(5)
+        for path in ('/api/projects/', '/api/experience/', '/api/skills/'):
+            buffered = self.client.get(path, HTTP_HOST='localhost')
+            streamed = self.client.get(f'{path}?stream=1', HTTP_HOST='localhost')
+            self.assertTrue(streamed.streaming, path)
+            self.assertEqual(json.loads(streamed.getvalue()), buffered.json(), path)
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class ProjectCountTests(TestCase):
+    """project_count counts active projects, annotated or not"""
+
+    def setUp(self):
+        self.web = ProjectCategory.objects.create(name='Web', slug='web', order=1)
+        self.mobile = ProjectCategory.objects.create(name='Mobile', slug='mobile', order=2)
+        ProjectCategory.objects.create(name='Empty', slug='empty', order=3)
+        for slug, category, is_active in [
+            ('a', self.web, True), ('b', self.web, True), ('c', self.web, False),
+            ('d', self.mobile, True), ('e', self.mobile, False),
+        ]:
+            Project.objects.create(
+                title=slug, slug=slug, category=category, short_description='Short',
+                technologies='Django', is_active=is_active,
+            )
+
+    def counts(self, payload):
+        return {row['slug']: row['project_count'] for row in payload}
+
+    def test_viewset_uses_annotation(self):
+        with QueryCounter() as counter:
+            response = self.client.get(reverse('project-categories-list'), HTTP_HOST='localhost')
+        self.assertEqual(self.counts(response.json()), {'web': 2, 'mobile': 1, 'empty': 0})
+        # .count() per row would show up as SELECT COUNT(*) AS "__count"
+        self.assertFalse(any('__count' in sql for sql, _ in counter.queries))
+
+    def test_unannotated_queryset_counts_per_row(self):
+        categories = ProjectCategory.objects.order_by('order')
+        with self.assertNumQueries(1 + categories.count()):
+            data = ProjectCategorySerializer(categories, many=True).data
+        self.assertEqual(self.counts(data), {'web': 2, 'mobile': 1, 'empty': 0})
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class SkillsByCategoryTests(TestCase):
+    """Skills grouped in one query keep choice order, then `order` within a group"""
+
+    def setUp(self):
+        for name, category, order in [
+            ('Figma', 'design', 2), ('Django', 'backend', 3), ('React', 'frontend', 2),
+            ('Sketch', 'design', 1), ('Go', 'backend', 1), ('Vue', 'frontend', 1),
+        ]:
+            Skill.objects.create(name=name, category=category, proficiency=3, order=order)
+        Skill.objects.create(name='Hidden', category='tools', proficiency=3, order=0, is_active=False)
+
+    def grouped(self, payload):
+        return {key: (group['name'], [skill['name'] for skill in group['skills']]) for key, group in payload.items()}
+
+    def test_by_category_lists_every_category(self):
+        response = self.client.get(reverse('skills-by-category'), HTTP_HOST='localhost')
+        payload = response.json()
+        self.assertEqual(list(payload), [key for key, _ in Skill.CATEGORY_CHOICES])
+        self.assertEqual(self.grouped(payload), {
+            'frontend': ('Frontend', ['Vue', 'React']),
+            'backend': ('Backend', ['Go', 'Django']),
+            'design': ('Design', ['Sketch', 'Figma']),
+            'mobile': ('Mobile', []),
+            'uiux': ('UI/UX', []),
+            'tools': ('Tools', []),
+        })
+
+    def test_skills_page_leaves_out_empty_categories(self):
+        response = self.client.get(reverse('skills-page-data'), HTTP_HOST='localhost')
+        payload = response.json()['skills_by_category']
+        self.assertEqual(list(payload), ['frontend', 'backend', 'design'])
+        self.assertEqual(self.grouped(payload), {
+            'frontend': ('Frontend', ['Vue', 'React']),
+            'backend': ('Backend', ['Go', 'Django']),
+            'design': ('Design', ['Sketch', 'Figma']),
+        })
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class CompressionTests(TestCase):
+    """API responses are compressed once and then served from the cache"""
+
+    def setUp(self):
+        seed_rows(5)
+        cache.clear()
+        metrics.reset(metrics.METRICS['compression'])
+
+    def test_gzip_is_negotiated_and_cached(self):
+        plain = self.client.get('/api/homepage/', HTTP_HOST='localhost')
+        for _ in range(2):
+            response = self.client.get('/api/homepage/', HTTP_HOST='localhost', HTTP_ACCEPT_ENCODING='gzip, br;q=0')
+            self.assertEqual(response['Content-Encoding'], 'gzip')
+            self.assertIn('Accept-Encoding', response['Vary'])
+            self.assertTrue(response['ETag'].startswith('W/'))
+            self.assertEqual(gzip.decompress(response.content), plain.content)
+        counters = metrics.read(['compression.cache_hits', 'compression.cache_misses'])
+        self.assertEqual(counters, {'compression.cache_hits': 1, 'compression.cache_misses': 1})
+
+    @override_settings(METRICS_FLUSH_INTERVAL=60)
+    def test_counters_reach_the_cache_in_batches(self):
+        metrics.flush()
+        with mock.patch.object(cache, 'incr', wraps=cache.incr) as cache_incr:
+            for _ in range(5):
+                self.client.get('/api/homepage/', HTTP_HOST='localhost', HTTP_ACCEPT_ENCODING='gzip')
+            self.assertEqual(cache_incr.call_count, 0)
+            counters = metrics.read(['compression.cache_hits', 'compression.cache_misses'])
+        self.assertEqual(counters, {'compression.cache_hits': 4, 'compression.cache_misses': 1})
+        self.assertLessEqual(cache_incr.call_count, 4)   # one per counter touched
+
+    def test_tiny_and_unaccepted_bodies_are_not_compressed(self):
+        tiny = self.client.get('/api/personal-info/?fields=name', HTTP_HOST='localhost', HTTP_ACCEPT_ENCODING='gzip')
+        refused = self.client.get('/api/homepage/', HTTP_HOST='localhost', HTTP_ACCEPT_ENCODING='gzip;q=0')
+        self.assertFalse(tiny.has_header('Content-Encoding'))
+        self.assertFalse(refused.has_header('Content-Encoding'))
+
+
+@override_settings(CACHES=LOCMEM_CACHE, REST_FRAMEWORK=UNTHROTTLED)
+class BatchTests(TestCase):
+    """/api/batch/ matches the individual responses and shares lookups"""
+
+    def setUp(self):
+        seed_rows(3)
+
+    def post_batch(self, paths):
+        return self.client.post(
+            '/api/batch/', {'requests': paths}, content_type='application/json', HTTP_HOST='localhost',
+        )
+
+    def test_sub_responses_match_individual_requests(self):
+        paths = ['/projects/', '/core-expertise/', '/project-categories/', '/projects/', '/missing/']
+        responses = self.post_batch(paths).json()['responses']
+        self.assertEqual([item['path'] for item in responses], paths)
+        for item in responses[:3]:
+            self.assertEqual(item['body'], self.client.get(f"/api{item['path']}", HTTP_HOST='localhost').json())
+        self.assertEqual(responses[4]['status'], 404)
+
+    def test_personal_info_is_read_once(self):
+        cache.clear()
+        with QueryCounter() as counter:
+            self.post_batch(['/personal-info/', '/homepage/', '/about/'])
+        reads = [sql for sql, _ in counter.queries if sql.startswith('SELECT "core_personalinfo"')]
+        self.assertEqual(len(reads), 1)
+
+    def test_snapshot_inside_an_outer_transaction_keeps_its_isolation(self):
+        # TestCase wraps each test in a transaction, as ATOMIC_REQUESTS would a request
+        PersonalInfo.objects.exists()
+        with mock.patch.object(connection, 'vendor', 'postgresql'), CaptureQueriesContext(connection) as queries:
+            with batch._snapshot():
+                pass
+        self.assertFalse([query for query in queries if 'SET TRANSACTION' in query['sql']])
+
+    def test_invalid_body_is_rejected(self):
+        self.assertEqual(self.post_batch('projects').status_code, 400)
+        self.assertEqual(self.post_batch(['/projects/'] * 21).status_code, 400)
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class SingletonCacheTests(TestCase):
+    """PersonalInfo/SiteSettings come from process memory until they change"""
+
+    def setUp(self):
+        seed_rows(1)
+        clear_cached_singletons()
+
+    def test_repeat_reads_skip_the_database(self):
+        PersonalInfo.get_active()
+        SiteSettings.get_active()
+        with QueryCounter() as counter:
+            PersonalInfo.get_active()
+            SiteSettings.get_active()
+        self.assertEqual(counter.count, 0)
+
+    def test_save_invalidates(self):
+        info = PersonalInfo.get_active()
+        fresh = PersonalInfo.objects.get(pk=info.pk)
+        fresh.name = 'Renamed'
+        with self.captureOnCommitCallbacks(execute=True):
+            fresh.save()
+        self.assertEqual(PersonalInfo.get_active().name, 'Renamed')
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class TechnologyTests(TestCase):
+    """Technologies are matched exactly, and edits to them reach cached pages and validators"""
+
+    def setUp(self):
+        seed_rows(2)
+
+    def create_project(self, slug, technologies):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Project.objects.create(
+                title=slug, slug=slug, category=ProjectCategory.objects.first(),
+                short_description='Short', full_description='Full', technologies=technologies,
+            )
+
+    def project_slugs(self, tech):
+        response = self.client.get(f'/api/projects/?tech={tech}', HTTP_HOST='localhost')
+        return sorted(project['slug'] for project in response.json())
+
+    def test_matching_is_exact_and_case_insensitive(self):
+        self.create_project('web', 'JavaScript, React')
+        self.create_project('backend', 'Java, Spring')
+        self.create_project('both', 'java, React')
+        self.assertEqual(self.project_slugs('java'), ['backend', 'both'])
+        self.assertEqual(self.project_slugs('JAVA'), ['backend', 'both'])
+        self.assertEqual(self.project_slugs('javascript'), ['web'])
+        self.assertEqual(self.project_slugs('jav'), [])
+
+    def test_every_listed_technology_must_match(self):
+        self.create_project('web', 'JavaScript, React')
+        self.create_project('both', 'Java, React')
+        self.assertEqual(self.project_slugs('java,react'), ['both'])
+        self.assertEqual(self.project_slugs('React, JavaScript'), ['web'])
+        self.assertEqual(self.project_slugs('java,javascript'), [])
+
+        experience = Experience.objects.first()
+        experience.technologies = 'Java, Kotlin'
+        experience.save()
+        response = self.client.get('/api/experience/?tech=kotlin,java', HTTP_HOST='localhost')
+        self.assertEqual([row['id'] for row in response.json()], [experience.pk])
+
+    def test_editing_the_string_resyncs_links(self):
+        project = self.create_project('web', 'JavaScript, React')
+        project.technologies = 'TypeScript, React'
+        with self.captureOnCommitCallbacks(execute=True):
+            project.save()
+        self.assertEqual(self.project_slugs('javascript'), [])
+        self.assertEqual(self.project_slugs('typescript'), ['web'])
+        self.assertEqual(
+            list(project.technology_links.values_list('technology__name', flat=True)), ['TypeScript', 'React'],
+        )
+
+    def test_renaming_a_technology_invalidates_pages(self):
+        for path in ('/api/projects/', '/api/experience/', '/api/homepage/', '/api/experience-page/'):
+            self.client.get(path, HTTP_HOST='localhost')
+        etag = self.client.get('/api/projects/', HTTP_HOST='localhost')['ETag']
+
+        technology = Technology.objects.get(key='django')
+        technology.name = 'Django REST'
+        with self.captureOnCommitCallbacks(execute=True):
+            technology.save()
+
+        response = self.client.get('/api/projects/', HTTP_HOST='localhost', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('Django REST', response.json()[0]['technologies_list'])
+        for path in ('/api/homepage/', '/api/experience-page/'):
+            self.assertIn('Django REST', self.client.get(path, HTTP_HOST='localhost').content.decode(), path)
+
+    def test_admin_derives_the_key(self):
+        self.client.force_login(get_user_model().objects.create_superuser('admin', 'admin@example.com', 'pw'))
+        self.client.post(reverse('admin:core_technology_add'), {'name': 'TypeScript', 'key': 'other'})
+        self.assertEqual(Technology.objects.get(name='TypeScript').key, 'typescript')
+
+
+@override_settings(REST_FRAMEWORK=UNTHROTTLED)
+class ContactSpoolTests(TestCase):
+    """Spooled contact messages all reach the database exactly once"""
+
+    def setUp(self):
+        spool_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(spool_dir.cleanup)
+        self.spool_dir = Path(spool_dir.name)
+        override = override_settings(CONTACT_INGESTION='spool', CONTACT_SPOOL_DIR=spool_dir.name, CONTACT_SPOOL_FSYNC=False)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def submit(self, count):
+        for i in range(count):
+            response = self.client.post('/api/contact/', {
+                'name': f'Sender {i}', 'email': f'sender{i}@example.com', 'subject': 'Hello', 'message': 'Hi',
+            }, HTTP_HOST='localhost')
+            self.assertEqual(response.status_code, 201)
+
+    def test_submission_is_spooled_then_flushed(self):
+        self.submit(3)
+        self.assertEqual(ContactMessage.objects.count(), 0)
+        self.assertEqual(flush_contact_spool(), 3)
+        self.assertEqual(ContactMessage.objects.count(), 3)
+        self.assertEqual(list(self.spool_dir.glob('*.jsonl')), [])
+
+    def test_no_message_lost_when_flusher_dies(self):
+        self.submit(5)
+        real_bulk_create = ContactMessage.objects.bulk_create
+        calls = []
+
+        def dies_after_first_batch(*args, **kwargs):
+            calls.append(1)
+            if len(calls) > 1:
+                raise SystemExit('worker killed')
+            return real_bulk_create(*args, **kwargs)
+
+        # The flusher dies after its first batch, with the spool claimed
+        with mock.patch.object(ContactMessage.objects, 'bulk_create', side_effect=dies_after_first_batch):
+            with self.assertRaises(SystemExit):
+                flush_contact_spool(batch_size=2)
+        self.assertEqual(ContactMessage.objects.count(), 2)
+
+        # A worker killed mid-append leaves a partial line behind
+        with open(self.spool_dir / SPOOL_FILE, 'ab') as spool:
+            spool.write(b'{"spool_id": "trunc')
+        self.submit(2)
+
+        # The restarted flusher picks up the claimed file and the new spool
+        flush_contact_spool(batch_size=2)
+        self.assertEqual(ContactMessage.objects.count(), 7)
+        self.assertEqual(ContactMessage.objects.values('spool_id').distinct().count(), 7)
+
+
+@override_settings(REST_FRAMEWORK=UNTHROTTLED)
+class NewsletterSubscribeTests(TestCase):
+    """Subscribing is one upsert that reports what it did"""
+
+    def test_outcomes(self):
+        N = NewsletterSubscriber
+        self.assertEqual(N.subscribe('reader@example.com'), N.SUBSCRIBED)
+        self.assertEqual(N.subscribe('reader@example.com'), N.ALREADY_ACTIVE)
+        N.objects.update(is_active=False)
+        with QueryCounter() as counter:
+            self.assertEqual(N.subscribe('reader@example.com'), N.REACTIVATED)
+        # SQLite reads the inactive rows before the upsert
+        self.assertEqual(counter.count, 1 if connection.vendor == 'postgresql' else 2)
+        self.assertTrue(N.objects.get().is_active)
+
+    def test_reactivation_in_the_same_instant_is_not_a_signup(self):
+        N = NewsletterSubscriber
+        subscriber = N.objects.create(email='reader@example.com', is_active=False)
+        with mock.patch('django.utils.timezone.now', return_value=subscriber.subscribed_at):
+            self.assertEqual(N.subscribe('reader@example.com'), N.REACTIVATED)
+
+    def test_bulk_upsert(self):
+        N = NewsletterSubscriber
+        N.objects.create(email='active@example.com')
+        N.objects.create(email='gone@example.com', is_active=False)
+        outcomes = N.subscribe_many(
+            ['active@example.com', 'gone@example.com', 'new@example.com', 'new@example.com'], batch_size=2,
+        )
+        self.assertEqual(outcomes, {
+            'active@example.com': N.ALREADY_ACTIVE, 'gone@example.com': N.REACTIVATED, 'new@example.com': N.SUBSCRIBED,
+        })
+        self.assertEqual(N.objects.filter(is_active=True).count(), 3)
+
+    def test_view_reports_existing_subscription(self):
+        first = self.client.post('/api/newsletter/subscribe/', {'email': 'reader@example.com'}, HTTP_HOST='localhost')
+        again = self.client.post('/api/newsletter/subscribe/', {'email': 'reader@example.com'}, HTTP_HOST='localhost')
+        self.assertEqual(first.status_code, 201)
+        self.assertEqual(again.status_code, 400)
+        self.assertFalse(again.json()['success'])
+
+
+class _SMTPInbox:
+    """aiosmtpd handler recording recipients and the connections they came over"""
+
+    def __init__(self):
+        self.recipients = []
+        self.sessions = set()
+
+    async def handle_DATA(self, server, session, envelope):
+        self.recipients.extend(envelope.rcpt_tos)
+        self.sessions.add(id(session))
+        return '250 OK'
+
+
+@override_settings(
+    CACHES=LOCMEM_CACHE, EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+    DEFAULT_FROM_EMAIL='news@example.com',
+)
+class NewsletterCampaignTests(TestCase):
+    """Campaigns reach every active subscriber once, even across restarts"""
+
+    def setUp(self):
+        cache.clear()
+        SiteSettings.objects.create(site_title='Portfolio', site_description='Test')
+        NewsletterSubscriber.objects.bulk_create([
+            NewsletterSubscriber(email=f'reader{i}@example.com', is_active=i % 5 != 0) for i in range(25)
+        ])
+        self.active = sorted(NewsletterSubscriber.objects.filter(is_active=True).values_list('email', flat=True))
+        self.campaign = NewsletterCampaign.objects.create(
+            subject='News from {{ site.site_title }}', body_text='Hello & welcome', status='queued',
+        )
+
+    def test_sends_each_active_subscriber_once(self):
+        send_campaign(self.campaign, batch_size=4, rate=0, pool_size=2)
+        self.assertEqual(sorted(message.to[0] for message in mail.outbox), self.active)
+        self.assertEqual(mail.outbox[0].subject, 'News from Portfolio')
+        self.assertEqual(mail.outbox[0].body, 'Hello & welcome')
+        self.campaign.refresh_from_db()
+        self.assertEqual((self.campaign.status, self.campaign.sent_count), ('sent', 20))
+
+    def test_interrupted_send_resumes_from_checkpoint(self):
+        from core.utils import newsletter
+        real_send_batch = newsletter._send_batch
+        batches = []
+
+        def killed_on_third_batch(*args):
+            batches.append(1)
+            if len(batches) == 3:
+                raise KeyboardInterrupt
+            return real_send_batch(*args)
+
+        with mock.patch.object(newsletter, '_send_batch', side_effect=killed_on_third_batch):
+            with self.assertRaises(KeyboardInterrupt):
+                send_campaign(self.campaign, batch_size=4, rate=0, pool_size=1)
+        self.campaign.refresh_from_db()
+        self.assertEqual((self.campaign.status, self.campaign.sent_count), ('queued', 8))
+
+        send_campaign(self.campaign, batch_size=4, rate=0, pool_size=1)
+        self.assertEqual(sorted(message.to[0] for message in mail.outbox), self.active)
+
+    def test_only_one_sender_claims_a_campaign(self):
+        claim_campaign(NewsletterCampaign.objects.get(pk=self.campaign.pk))
+        with self.assertRaises(CampaignLocked):
+            send_campaign(self.campaign, batch_size=4, rate=0, pool_size=1)
+        self.assertEqual(mail.outbox, [])
+
+    def test_stale_lease_is_taken_over(self):
+        # The previous sender died after checkpointing the first ten subscribers
+        checkpoint = NewsletterSubscriber.objects.order_by('pk').values_list('pk', flat=True)[9]
+        NewsletterCampaign.objects.filter(pk=self.campaign.pk).update(
+            status='sending', last_subscriber_id=checkpoint,
+            heartbeat_at=timezone.now() - timedelta(seconds=CAMPAIGN_LOCK_TIMEOUT + 1),
+        )
+        send_campaign(self.campaign, batch_size=4, rate=0, pool_size=1)
+        remaining = NewsletterSubscriber.objects.filter(is_active=True, pk__gt=checkpoint).values_list('email', flat=True)
+        self.assertEqual(sorted(message.to[0] for message in mail.outbox), sorted(remaining))
+        self.assertEqual(self.campaign.status, 'sent')
+
+    @unittest.skipIf(Controller is None, 'aiosmtpd is not installed')
+    def test_delivery_over_pooled_smtp_connections(self):
+        with socket.socket() as probe:
+            probe.bind(('127.0.0.1', 0))
+            port = probe.getsockname()[1]
+        inbox = _SMTPInbox()
+        controller = Controller(inbox, hostname='127.0.0.1', port=port)
+        controller.start()
+        self.addCleanup(controller.stop)
+
+        with override_settings(
+            EMAIL_BACKEND='django.core.mail.backends.smtp.EmailBackend', EMAIL_HOST='127.0.0.1', EMAIL_PORT=port,
+            EMAIL_USE_TLS=False, EMAIL_HOST_USER='', EMAIL_HOST_PASSWORD='',
+        ):
+            send_campaign(self.campaign, batch_size=4, rate=0, pool_size=2)
+
+        self.assertEqual(sorted(inbox.recipients), self.active)
+        # Five batches, but never more connections than the pool holds
+        self.assertLessEqual(len(inbox.sessions), 2)
+
+
+def _take_tokens(attempts):
+    # Runs in a forked worker: 20 tokens per hour shared by every process
+    table = get_bucket_table()
+    return sum(table.take('throttle_test_shared', time.time(), 3600 / 20, 3600) == 0 for _ in range(attempts))
+
+
+class ThrottleTests(TestCase):
+    """Token buckets hold across workers and limit anonymous writes per IP"""
+
+    def setUp(self):
+        state_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(state_dir.cleanup)
+        override = override_settings(
+            THROTTLE_STATE_FILE=f'{state_dir.name}/buckets.bin',
+            REST_FRAMEWORK={
+                **settings.REST_FRAMEWORK, 'DEFAULT_THROTTLE_RATES': {'user': None, 'contact': '3/min', 'batch': '2/min'},
+            },
+        )
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def test_burst_then_throttled_per_ip(self):
+        codes = [self.client.post('/api/contact/', {}, HTTP_HOST='localhost').status_code for _ in range(4)]
+        self.assertEqual(codes, [400, 400, 400, 429])
+        other_ip = self.client.post('/api/contact/', {}, HTTP_HOST='localhost', REMOTE_ADDR='10.0.0.2')
+        self.assertEqual(other_ip.status_code, 400)
+
+    def test_batch_is_throttled(self):
+        codes = [
+            self.client.post('/api/batch/', {}, content_type='application/json', HTTP_HOST='localhost').status_code
+            for _ in range(3)
+        ]
+        self.assertEqual(codes, [400, 400, 429])
+
+    def test_scoped_throttle_without_a_scope_allows(self):
+        throttle = ScopedAnonThrottle()
+        self.assertEqual((throttle.rate, throttle.num_requests, throttle.duration), (None, None, None))
+        self.assertTrue(throttle.allow_request(mock.Mock(), object()))
+        self.assertIsNone(throttle.rate)
+
+    def test_limit_is_shared_across_processes(self):
+        with multiprocessing.get_context('fork').Pool(4) as pool:
+            allowed = sum(pool.map(_take_tokens, [25] * 4))
+        self.assertEqual(allowed, 20)
+
+
+def photo_upload(name, size):
+    """A JPEG as a camera would upload it: rotated by its EXIF orientation, with a camera model"""
+    exif = Image.Exif()
+    exif[0x0112] = 6   # Orientation: rotate 90° clockwise to display
+    exif[0x0110] = 'Test Camera'
+    out = io.BytesIO()
+    Image.new('RGB', size, (200, 80, 40)).save(out, 'JPEG', exif=exif)
+    return SimpleUploadedFile(name, out.getvalue(), content_type='image/jpeg')
+
+
+@override_settings(CACHES=LOCMEM_CACHE, IMAGE_DERIVATIVE_WORKERS=0)
+class ImageDerivativeTests(TestCase):
+    """Uploads get stripped WebP/JPEG sizes listed in the API's srcset"""
+
+    def setUp(self):
+        media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(media_root.cleanup)
+        override = override_settings(MEDIA_ROOT=media_root.name)
+        override.enable()
+        self.addCleanup(override.disable)
+        seed_rows(1)
+
+    def test_upload_builds_derivatives(self):
+        project = Project.objects.get()
+        project.thumbnail = photo_upload('shot.jpg', (1400, 1000))
+        with self.captureOnCommitCallbacks(execute=True):
+            project.save()
+
+        entry = Project.objects.get().image_derivatives['thumbnail']
+        # Rotated upright by the EXIF orientation before resizing
+        self.assertEqual((entry['width'], entry['height']), (1000, 1400))
+        self.assertEqual([width for width, _ in entry['formats']['webp']], [320, 640, 960, 1000])
+        with project.thumbnail.storage.open(entry['formats']['jpeg'][0][1]) as file, Image.open(file) as image:
+            self.assertEqual(image.size, (320, 448))
+            self.assertEqual(dict(image.getexif()), {})
+
+        response = self.client.get('/api/projects/', HTTP_HOST='localhost')
+        srcset = response.json()[0]['srcset']['thumbnail']
+        self.assertRegex(srcset['webp'], r'/media/cas/[0-9a-f]{2}/[0-9a-f]{32}/shot-640w\.webp 640w')
+        self.assertTrue(srcset['jpeg'].startswith('http://localhost/media/'))
+
+    def test_manifest_field_needs_a_representation(self):
+        with self.assertRaises(TypeError):
+            ImageManifestField(image_fields=('thumbnail',))
+
+    def test_wide_upload_lists_each_width_once(self):
+        project = Project.objects.get()
+        project.thumbnail = photo_upload('wide.jpg', (1200, 3000))
+        with self.captureOnCommitCallbacks(execute=True):
+            project.save()
+
+        entry = Project.objects.get().image_derivatives['thumbnail']
+        self.assertEqual(entry['width'], 3000)
+        self.assertEqual([width for width, _ in entry['formats']['webp']], [320, 640, 960, 1280, 1920])
+        srcset = self.client.get('/api/projects/', HTTP_HOST='localhost').json()[0]['srcset']['thumbnail']
+        self.assertEqual(srcset['webp'].count(' 1920w'), 1)
+
+    def test_replaced_image_is_collected_as_garbage(self):
+        testimonial = Testimonial.objects.get()
+        testimonial.client_photo = photo_upload('first.jpg', (400, 400))
+        with self.captureOnCommitCallbacks(execute=True):
+            testimonial.save()
+        old = Testimonial.objects.get().image_derivatives['client_photo']
+        old_files = [testimonial.client_photo.name] + [name for _, name in old['formats']['webp']]
+
+        testimonial.refresh_from_db()
+        testimonial.client_photo = photo_upload('second.jpg', (400, 300))
+        with self.captureOnCommitCallbacks(execute=True):
+            testimonial.save()
+        current = Testimonial.objects.get().image_derivatives['client_photo']
+        self.assertEqual(current['source'], testimonial.client_photo.name)
+
+        storage = testimonial.client_photo.storage
+        self.assertEqual(collect_garbage(min_age=3600), (0, 0))   # too recent to tell from an upload in flight
+        removed, _ = collect_garbage(min_age=0)
+        self.assertEqual(removed, len(old_files) + len(old['formats']['jpeg']))
+        self.assertFalse(any(storage.exists(name) for name in old_files))
+        self.assertTrue(all(storage.exists(name) for _, name in current['formats']['jpeg']))
+        self.assertTrue(storage.exists(testimonial.client_photo.name))
+
+    def test_identical_uploads_are_stored_once(self):
+        first, second = Project.objects.create(
+            title='Copy', category=ProjectCategory.objects.get(), short_description='Short', technologies='Django',
+        ), Project.objects.get(slug='project-0')
+        for project, name in ((first, 'one.jpg'), (second, 'two.jpg')):
+            project.thumbnail = photo_upload(name, (64, 64))
+            project.save()
+        self.assertEqual(first.thumbnail.name, second.thumbnail.name)
+        self.assertTrue(is_content_addressed(first.thumbnail.name))
+        self.assertEqual(len(list(Path(settings.MEDIA_ROOT).rglob('*.jpg'))), 1)
+
+    def test_placeholder_and_dimensions_in_api(self):
+        testimonial = Testimonial.objects.get()
+        testimonial.client_photo = photo_upload('face.jpg', (400, 300))
+        with self.captureOnCommitCallbacks(execute=True):
+            testimonial.save()
+
+        info = self.client.get('/api/testimonials/', HTTP_HOST='localhost').json()[0]['image_info']['client_photo']
+        self.assertEqual((info['width'], info['height']), (300, 400))
+        self.assertTrue(info['placeholder'].startswith('data:image/webp;base64,'))
+        self.assertLess(len(info['placeholder']), 400)
+        red, green, blue = (int(info['color'][i:i + 2], 16) for i in (1, 3, 5))
+        self.assertLess(abs(red - 200) + abs(green - 80) + abs(blue - 40), 20)
+
+    def test_backfill_rebuilds_outdated_entries(self):
+        project = Project.objects.get()
+        project.thumbnail = photo_upload('shot.jpg', (600, 400))
+        with self.captureOnCommitCallbacks(execute=True):
+            project.save()
+        # As written before placeholders existed
+        entry = {**Project.objects.get().image_derivatives['thumbnail'], 'version': 1}
+        del entry['placeholder'], entry['color']
+        Project.objects.update(image_derivatives={'thumbnail': entry})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('build_image_derivatives', stdout=io.StringIO())
+        entry = Project.objects.get().image_derivatives['thumbnail']
+        self.assertEqual(entry['version'], images.MANIFEST_VERSION)
+        self.assertIn('placeholder', entry)
+
+    @override_settings(IMAGE_DERIVATIVE_WORKERS=1)
+    def test_renders_in_worker_process(self):
+        self.addCleanup(images.shutdown_pools)
+        rendered = images._render(photo_upload('shot.jpg', (200, 100)).read())
+        self.assertEqual(rendered['variants']['webp'][0][0], 100)
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class MediaTransformTests(TestCase):
+    """/media/t/ renders each allowed transform once and keeps the cache bounded"""
+
+    def setUp(self):
+        for name in ('media', 'transforms'):
+            directory = tempfile.TemporaryDirectory()
+            self.addCleanup(directory.cleanup)
+            setattr(self, name, Path(directory.name))
+        override = override_settings(MEDIA_ROOT=str(self.media), IMAGE_TRANSFORM_CACHE_DIR=str(self.transforms))
+        override.enable()
+        self.addCleanup(override.disable)
+        cache.clear()
+        metrics.reset(metrics.METRICS['transforms'])
+        (self.media / 'projects').mkdir()
+        Image.effect_noise((1200, 800), 60).convert('RGB').save(self.media / 'projects' / 'shot.png')
+
+    def test_renders_once_then_serves_from_cache(self):
+        for _ in range(2):
+            response = self.client.get('/media/t/320x0/webp/projects/shot.png')
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response['Content-Type'], 'image/webp')
+        with Image.open(io.BytesIO(b''.join(response.streaming_content))) as image:
+            self.assertEqual(image.size, (320, 213))
+
+        cropped = self.client.get('/media/t/320x320/jpeg/projects/shot.png')
+        with Image.open(io.BytesIO(b''.join(cropped.streaming_content))) as image:
+            self.assertEqual(image.size, (320, 320))
+        self.assertEqual(self.client.get(
+            '/media/t/320x320/jpeg/projects/shot.png', HTTP_IF_NONE_MATCH=cropped['ETag'],
+        ).status_code, 304)
+
+        counts = metrics.read(metrics.METRICS['transforms'])
+        self.assertEqual((counts['transforms.misses'], counts['transforms.hits']), (2, 2))
+
+    def test_validators_survive_lru_touches(self):
+        url = '/media/t/320x0/webp/projects/shot.png'
+        first = self.client.get(url)
+        self.assertNotIn('Last-Modified', first)
+        target = transforms.get_transform('projects/shot.png', 320, 0, 'webp')
+        stale = time.time() - transforms.TOUCH_INTERVAL - 10
+        os.utime(target, (stale, stale))
+
+        # This hit refreshes the mtime; the ETag must not change with it
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag']).status_code, 304)
+        self.assertGreater(target.stat().st_mtime, stale)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag']).status_code, 304)
+
+    def test_path_spellings_share_one_entry(self):
+        for path in ('projects/shot.png', 'projects/./shot.png', 'projects/././shot.png', 'a/../projects/shot.png'):
+            self.assertEqual(self.client.get(f'/media/t/320x0/webp/{path}').status_code, 200, path)
+        counts = metrics.read(metrics.METRICS['transforms'])
+        self.assertEqual((counts['transforms.misses'], counts['transforms.hits']), (1, 3))
+        self.assertEqual(len(list(self.transforms.glob('*/*.webp'))), 1)
+
+    def test_rejects_sizes_and_formats_off_the_allow_list(self):
+        self.assertEqual(self.client.get('/media/t/321x0/webp/projects/shot.png').status_code, 400)
+        self.assertEqual(self.client.get('/media/t/320x0/gif/projects/shot.png').status_code, 400)
+        self.assertEqual(self.client.get('/media/t/320x0/webp/projects/missing.png').status_code, 404)
+        self.assertEqual(self.client.get('/media/t/320x0/webp/../manage.py').status_code, 404)
+        self.assertEqual(list(self.transforms.rglob('*.webp')), [])
+
+    def test_concurrent_misses_render_once(self):
+        renders = []
+        real_render = transforms.render_transform
+
+        def slow_render(*args):
+            renders.append(1)
+            time.sleep(0.2)
+            return real_render(*args)
+
+        with mock.patch.object(transforms, 'render_transform', side_effect=slow_render):
+            threads = [
+                threading.Thread(target=transforms.get_transform, args=('projects/shot.png', 640, 0, 'webp'))
+                for _ in range(4)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.assertEqual(len(renders), 1)
+        self.assertEqual(metrics.read(['transforms.coalesced'])['transforms.coalesced'], 3)
+
+    def test_evicts_least_recently_used(self):
+        first = transforms.get_transform('projects/shot.png', 160, 0, 'png')
+        second = transforms.get_transform('projects/shot.png', 480, 0, 'png')
+        os.utime(first, (time.time() - 300,) * 2)
+        os.utime(second, (time.time() - 200,) * 2)
+        transforms.get_transform('projects/shot.png', 160, 0, 'png')   # hit: first is now the newest
+
+        with override_settings(IMAGE_TRANSFORM_CACHE_MAX_BYTES=first.stat().st_size + second.stat().st_size):
+            third = transforms.get_transform('projects/shot.png', 320, 0, 'png')
+        self.assertTrue(first.exists())
+        self.assertFalse(second.exists())
+        self.assertTrue(third.exists())
+
+
+    def test_misses_under_the_limit_skip_the_walk(self):
+        real_evict = transforms.evict
+        with mock.patch.object(transforms, 'evict', side_effect=real_evict) as evict:
+            for width in (160, 320, 480):
+                transforms.get_transform('projects/shot.png', width, 0, 'webp')
+        # Only the first miss, with no running total yet, walks the cache
+        self.assertEqual(evict.call_count, 1)
+        sizes = sum(path.stat().st_size for path in self.transforms.glob('*/*.webp'))
+        self.assertEqual(int((self.transforms / transforms.SIZE_FILE).read_text()), sizes)
+
+        with override_settings(IMAGE_TRANSFORM_CACHE_MAX_BYTES=sizes):
+            transforms.get_transform('projects/shot.png', 640, 0, 'webp')
+        remaining = sum(path.stat().st_size for path in self.transforms.glob('*/*.webp'))
+        self.assertLessEqual(remaining, sizes)
+        self.assertEqual(int((self.transforms / transforms.SIZE_FILE).read_text()), remaining)
+
+class MediaFileTests(TestCase):
+    """/media/ serves ranges and validators itself, or hands off to the proxy"""
+
+    def setUp(self):
+        media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(media_root.cleanup)
+        override = override_settings(MEDIA_ROOT=media_root.name, MEDIA_ACCEL='')
+        override.enable()
+        self.addCleanup(override.disable)
+        self.body = bytes(range(256)) * 40
+        self.name = upload_storage().save('resume/cv.pdf', ContentFile(self.body))
+
+    def get(self, **headers):
+        return self.client.get(f'/media/{self.name}', **headers)
+
+    def test_full_file_with_validators(self):
+        response = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), self.body)
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertTrue(response['Content-Disposition'].endswith('filename="cv.pdf"'))
+        self.assertFalse(response['ETag'].startswith('W/'))
+        self.assertEqual(self.get(HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+
+    def test_byte_ranges(self):
+        response = self.get(HTTP_RANGE='bytes=100-199')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], f'bytes 100-199/{len(self.body)}')
+        self.assertEqual(response['Content-Length'], '100')
+        self.assertEqual(b''.join(response.streaming_content), self.body[100:200])
+
+        response = self.get(HTTP_RANGE='bytes=-10')
+        self.assertEqual(b''.join(response.streaming_content), self.body[-10:])
+        self.assertEqual(self.get(HTTP_RANGE=f'bytes={len(self.body)}-').status_code, 416)
+        # A stale If-Range gets the whole (changed) file instead of a range of it
+        self.assertEqual(self.get(HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE='"stale"').status_code, 200)
+
+    def test_hands_off_to_nginx(self):
+        with override_settings(MEDIA_ACCEL='nginx', MEDIA_ACCEL_PREFIX='/protected-media/'):
+            response = self.get(HTTP_RANGE='bytes=0-9')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['X-Accel-Redirect'], f'/protected-media/{self.name}')
+        self.assertEqual(response.content, b'')
+
+    def test_legacy_names_are_revalidated(self):
+        legacy = Path(settings.MEDIA_ROOT) / 'resume' / 'old.pdf'
+        legacy.parent.mkdir()
+        legacy.write_bytes(self.body)
+        response = self.client.get('/media/resume/old.pdf')
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('immutable', response['Cache-Control'])
+
+    def test_stays_inside_media_root(self):
+        self.assertEqual(self.client.get('/media/../manage.py').status_code, 404)
+        self.assertEqual(self.client.get('/media/cas/').status_code, 404)
+
+
+def seed_admin_rows(count):
+    """seed_rows() plus the write-only tables, `count` rows each"""
+    seed_rows(count)
+    for model, make in (
+        (ContactMessage, lambda i: ContactMessage(
+            name=f'Sender {i}', email=f'sender{i}@example.com', subject='Hello', message='Hi',
+        )),
+        (NewsletterSubscriber, lambda i: NewsletterSubscriber(email=f'reader{i}@example.com')),
+        (NewsletterCampaign, lambda i: NewsletterCampaign(subject=f'Issue {i}', body_text='Hi')),
+    ):
+        model.objects.bulk_create([make(i) for i in range(model.objects.count(), count)])
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class AdminChangelistQueryTests(TestCase):
+    """Every core changelist runs the same number of queries at 5 rows and at 1,000"""
+
+    def setUp(self):
+        self.client.force_login(get_user_model().objects.create_superuser('admin', 'admin@example.com', 'pw'))
+
+    def measure(self):
+        counts = {}
+        for model in admin.site._registry:
+            if model._meta.app_label != 'core':
+                continue
+            url = reverse(f'admin:core_{model._meta.model_name}_changelist')
+            with QueryCounter() as counter:
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200, url)
+            counts[model._meta.model_name] = counter.count
+        return counts
+
+    def test_query_count_does_not_grow_with_rows(self):
+        seed_admin_rows(5)
+        few = self.measure()
+        seed_admin_rows(1000)
+        many = self.measure()
+        self.assertEqual(many, few)
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class AdminKeysetPagingTests(TestCase):
+    """Large-table changelists page by keyset on (-created_at, -pk), without OFFSET"""
+
+    def setUp(self):
+        self.client.force_login(get_user_model().objects.create_superuser('admin', 'admin@example.com', 'pw'))
+        now = timezone.now()
+        # Pairs of rows share a timestamp, so pages must break ties on the pk
+        ContactMessage.objects.bulk_create([
+            ContactMessage(
+                name=f'Sender {i}', email=f'sender{i}@example.com', subject='Hello', message='Hi',
+                created_at=now - timedelta(seconds=i // 2),
+            )
+            for i in range(250)
+        ])
+        self.expected = list(ContactMessage.objects.order_by('-created_at', '-pk').values_list('pk', flat=True))
+        self.url = reverse('admin:core_contactmessage_changelist')
+
+    def get_page(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse([query for query in queries if 'OFFSET' in query['sql'].upper()])
+        return response.context['cl']
+
+    def test_next_and_previous_links_cover_every_row_once(self):
+        pages = [self.get_page(self.url)]
+        while pages[-1].next_url:
+            pages.append(self.get_page(self.url + pages[-1].next_url))
+        self.assertEqual(len(pages), 3)
+        self.assertEqual([row.pk for cl in pages for row in cl.result_list], self.expected)
+        self.assertEqual(pages[0].result_count, 250)
+        self.assertIsNone(pages[0].previous_url)
+        self.assertIsNotNone(pages[-1].first_url)
+
+        back = self.get_page(self.url + pages[-1].previous_url)
+        self.assertEqual([row.pk for row in back.result_list], [row.pk for row in pages[1].result_list])
+        self.assertIn('Next', self.client.get(self.url).content.decode())
+
+    def test_filter_links_drop_the_cursor(self):
+        cl = self.get_page(self.url)
+        second = self.get_page(self.url + cl.next_url)
+        self.assertNotIn('cursor', second.get_query_string({'is_read__exact': '0'}))
+
+    def test_invalid_cursor_resets_the_list(self):
+        response = self.client.get(self.url + '?cursor=garbage')
+        self.assertEqual(response.status_code, 302)
+        self.assertIn('e=1', response['Location'])
+
+    def test_counts_exactly_without_a_planner_estimate(self):
+        # SQLite has no pg_class: the paginator falls back to COUNT(*)
+        paginator = EstimatedCountPaginator(ContactMessage.objects.all(), 100)
+        self.assertEqual(paginator.count, 250)
+        self.assertFalse(paginator.estimated)
@@ -12,8 +12,9 @@ from core.views.service import (
     ExperienceViewSet, EducationViewSet, TimelineViewSet,
     TestimonialViewSet, ContactMessageView, NewsletterSubscribeView,
     SiteSettingsView, homepage_data, about_page_data,
-    skills_page_data, experience_page_data
+    skills_page_data, experience_page_data, BatchView
 )
+from core.utils.query_budget import QueryBudget
 
 # Create router
 router = DefaultRouter()
@@ -42,10 +43,54 @@ urlpatterns = [
     path('about/', about_page_data, name='about-data'),
     path('skills-page/', skills_page_data, name='skills-page-data'),
     path('experience-page/', experience_page_data, name='experience-page-data'),
+
+    # Several GET requests in one round trip
+    path('batch/', BatchView.as_view(), name='batch'),
 ]
 
 
 
 if settings.DEBUG is True:
     urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
\ No newline at end of file
+    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+
+# Maximum SQL queries and total DB time (ms) per route on a cold cache.
+# Enforced by core.tests and, in DEBUG, by core.middleware.QueryBudgetMiddleware.
+QUERY_BUDGETS = {
+    'api-root': QueryBudget(0, 0),
+
+    'personal-info-list': QueryBudget(2, 25),
+    'personal-info-detail': QueryBudget(2, 25),
+    'core-expertise-list': QueryBudget(2, 50),
+    'core-expertise-detail': QueryBudget(2, 25),
+    'skills-list': QueryBudget(2, 50),
+    'skills-detail': QueryBudget(2, 25),
+    'skills-by-category': QueryBudget(2, 50),
+    'tools-list': QueryBudget(2, 50),
+    'tools-detail': QueryBudget(2, 25),
+    'project-categories-list': QueryBudget(3, 50),
+    'project-categories-detail': QueryBudget(3, 25),
+    'projects-list': QueryBudget(6, 50),
+    'projects-detail': QueryBudget(6, 25),
+    'projects-featured': QueryBudget(6, 50),
+    'experience-list': QueryBudget(7, 50),
+    'experience-detail': QueryBudget(7, 25),
+    'education-list': QueryBudget(2, 50),
+    'education-detail': QueryBudget(2, 25),
+    'timeline-list': QueryBudget(2, 50),
+    'timeline-detail': QueryBudget(2, 25),
+    'testimonials-list': QueryBudget(2, 50),
+    'testimonials-detail': QueryBudget(2, 25),
+
+    'contact': QueryBudget(1, 25),
+    'newsletter-subscribe': QueryBudget(1, 25),
+    'site-settings': QueryBudget(2, 25),
+
+    'homepage-data': QueryBudget(12, 100),
+    'about-data': QueryBudget(6, 100),
+    'skills-page-data': QueryBudget(4, 100),
+    'experience-page-data': QueryBudget(11, 100),
+
+    # Sum of its sub-requests; shared lookups run once per batch
+    'batch': QueryBudget(30, 250),
+}
@@ -0,0 +1,95 @@
+# core/utils/batch.py
+
+import json
+from contextlib import contextmanager
+from contextvars import ContextVar
+from urllib.parse import urlsplit
+
+from django.db import connection, transaction
+from django.http import HttpRequest, QueryDict
+from django.urls import Resolver404, resolve, reverse
+
+_shared_lookups = ContextVar('core_batch_shared_lookups', default=None)
+
+# Conditional and body headers of the batch request don't apply to its parts
+_SUB_REQUEST_SKIP_META = {
+    'CONTENT_TYPE', 'CONTENT_LENGTH', 'HTTP_IF_NONE_MATCH', 'HTTP_IF_MODIFIED_SINCE',
+    'HTTP_IF_MATCH', 'HTTP_IF_UNMODIFIED_SINCE', 'HTTP_ACCEPT_ENCODING',
+}
+
+
+def shared_lookup(key, load):
+    """
+    Return load(), computed once per batch when called from inside one, so
+    sub-requests reading the same row (e.g. the PersonalInfo singleton)
+    share a single query. Outside a batch this is just load().
+    """
+    lookups = _shared_lookups.get()
+    if lookups is None:
+        return load()
+    if key not in lookups:
+        lookups[key] = load()
+    return lookups[key]
+
+
+@contextmanager
+def _snapshot():
+    # One transaction for the whole batch, so every part reads the same
+    # snapshot. Postgres defaults to READ COMMITTED (a snapshot per
+    # statement) and has to be asked for one per transaction. Inside an
+    # outer transaction (ATOMIC_REQUESTS, tests) atomic() is only a
+    # savepoint and SET TRANSACTION would fail once the outer one has run a
+    # query, so the parts keep that transaction's isolation level.
+    outer = connection.in_atomic_block
+    with transaction.atomic():
+        if connection.vendor == 'postgresql' and not outer:
+            with connection.cursor() as cursor:
+                cursor.execute('SET TRANSACTION ISOLATION LEVEL REPEATABLE READ READ ONLY')
+        token = _shared_lookups.set({})
+        try:
+            yield
+        finally:
+            _shared_lookups.reset(token)
+
+
+def run_batch(request, paths):
+    """
+    Run GET `paths` (relative to the API root, query strings allowed)
+    in-process and return [{'path', 'status', 'body'}] in the same order.
+    Repeated paths are only run once.
+    """
+    results = {}
+    with _snapshot():
+        for path in dict.fromkeys(paths):
+            status, body = _run_sub_request(request, path)
+            results[path] = {'path': path, 'status': status, 'body': body}
+    return [results[path] for path in paths]
+
+
+def _run_sub_request(request, path):
+    url = urlsplit(path)
+    api_root = reverse('api-root')
+    full_path = url.path if url.path.startswith(api_root) else api_root + url.path.lstrip('/')
+    try:
+        match = resolve(full_path)
+    except Resolver404:
+        return 404, {'detail': 'Not found.'}
+    if match.url_name == 'batch':
+        return 400, {'detail': 'Batches cannot be nested.'}
+
+    sub_request = HttpRequest()
+    sub_request.method = 'GET'
+    sub_request.path = sub_request.path_info = full_path
+    sub_request.META = {key: value for key, value in request.META.items() if key not in _SUB_REQUEST_SKIP_META}
+    sub_request.META.update(
+        REQUEST_METHOD='GET', PATH_INFO=full_path, QUERY_STRING=url.query, HTTP_ACCEPT='application/json',
+    )
+    sub_request.GET = QueryDict(url.query)
+    sub_request.resolver_match = match
+    if hasattr(request, 'user'):
+        sub_request.user = request.user
+
+    response = match.func(sub_request, *match.args, **match.kwargs)
+    if hasattr(response, 'data'):
+        return response.status_code, response.data
+    return response.status_code, json.loads(response.getvalue() or 'null')
@@ -0,0 +1,134 @@
+# core/utils/cache.py
+
+import time
+import uuid
+from datetime import datetime, timezone as dt_timezone
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Max
+from django.utils import timezone
+from rest_framework.response import Response
+
+from core.utils.batch import shared_lookup
+
+GENERATION_KEY = 'core:content-generation'
+MODEL_STAMP_KEY = 'core:model-stamp:{}'
+
+
+def _seed_generation():
+    # Seeded from the clock so a cold or evicted counter never reuses a
+    # generation that still has page entries cached under it.
+    return time.time_ns() // 1000
+
+
+def get_content_generation():
+    """Return the current global content generation number"""
+    generation = cache.get(GENERATION_KEY)
+    if generation is None:
+        cache.add(GENERATION_KEY, _seed_generation(), timeout=None)
+        generation = cache.get(GENERATION_KEY)
+    return generation
+
+
+def get_model_stamp(model):
+    """
+    Return a (version, last_modified) pair for a model's table. Kept in the
+    cache by the change signals; a cold cache is seeded from the table with
+    a single MAX(updated_at)/COUNT(*) query (MAX(pk) for tables without an
+    updated_at, such as the technology links).
+    """
+    key = MODEL_STAMP_KEY.format(model._meta.label_lower)
+    return shared_lookup(key, lambda: _load_model_stamp(model, key))
+
+
+def _load_model_stamp(model, key):
+    stamp = cache.get(key)
+    if stamp is None:
+        epoch = datetime.fromtimestamp(0, tz=dt_timezone.utc)
+        if any(field.name == 'updated_at' for field in model._meta.concrete_fields):
+            aggregate = model._default_manager.aggregate(last_modified=Max('updated_at'), rows=Count('pk'))
+            last_modified = aggregate['last_modified'] or epoch
+            stamp = (f"{last_modified.timestamp()}-{aggregate['rows']}", last_modified)
+        else:
+            aggregate = model._default_manager.aggregate(last_pk=Max('pk'), rows=Count('pk'))
+            stamp = (f"pk{aggregate['last_pk']}-{aggregate['rows']}", epoch)
+        cache.add(key, stamp, timeout=None)
+    return stamp
+
+
+# Process memory: {(model label, filters): (stamp version, instance or None)}
+_singletons = {}
+
+
+def get_cached_singleton(model, **filters):
+    """
+    Return the one `model` row matching `filters`, held in process memory.
+    Every call checks the model's stamp version in the shared cache (one
+    cache read); saves and deletes in any worker bump it, so the next call
+    reloads the row. Raises model.DoesNotExist like .get(). The instance is
+    shared between requests: treat it as read-only.
+    """
+    version = get_model_stamp(model)[0]
+    key = (model._meta.label_lower, tuple(sorted(filters.items())))
+    cached = _singletons.get(key)
+    if cached is None or cached[0] != version:
+        # Loaded after reading the version: a concurrent write leaves a
+        # stale version behind, which only costs one extra reload.
+        instance = model._default_manager.filter(**filters).first()
+        cached = _singletons[key] = (version, instance)
+    if cached[1] is None:
+        raise model.DoesNotExist(f'No active {model._meta.object_name}')
+    return cached[1]
+
+
+def clear_cached_singletons():
+    _singletons.clear()
+
+
+def _bump_content_generation(models):
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:
+        cache.set(GENERATION_KEY, _seed_generation(), timeout=None)
+
+    now = timezone.now()
+    cache.set_many(
+        {MODEL_STAMP_KEY.format(model._meta.label_lower): (uuid.uuid4().hex, now) for model in models},
+        timeout=None,
+    )
+
+
+def bump_content_generation(*models):
+    """
+    Invalidate every cached page, and the validators of the given models,
+    once the current transaction commits.
+    """
+    transaction.on_commit(lambda: _bump_content_generation(models))
+
+
+def page_cache_key(request, view_name, generation):
+    return 'core:page:{}:{}:{}://{}{}'.format(
+        generation, view_name, request.scheme, request.get_host(), request.get_full_path()
+    )
+
+
+def cache_page_data(view_func):
+    """
+    Cache the response data of a combined page view under the current
+    content generation. Place it below @api_view so it wraps the plain view.
+    """
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        key = page_cache_key(request, view_func.__name__, get_content_generation())
+        data = cache.get(key)
+        if data is not None:
+            return Response(data)
+
+        response = view_func(request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(key, response.data, timeout=settings.PAGE_CACHE_TIMEOUT)
+        return response
+    return wrapper
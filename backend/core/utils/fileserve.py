@@ -0,0 +1,142 @@
+# core/utils/fileserve.py
+
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class RangeNotSatisfiable(ValueError):
+    pass
+
+
+def parse_range(header, size):
+    """
+    (first, last) byte positions, inclusive, for a single-range Range
+    header, or None to send the whole file (no header, several ranges or
+    a malformed one, which RFC 9110 lets a server ignore)
+    """
+    match = RANGE_RE.match(header.strip()) if header else None
+    if match is None or match.groups() == ('', ''):
+        return None
+    first, last = match.groups()
+    if not first:
+        if int(last) == 0:
+            raise RangeNotSatisfiable(header)
+        return max(0, size - int(last)), size - 1
+    if last and int(last) < int(first):
+        return None
+    if int(first) >= size:
+        raise RangeNotSatisfiable(header)
+    return int(first), min(int(last), size - 1) if last else size - 1
+
+
+class FileRange:
+    """
+    The bytes first..last of an unbuffered file. Exposes fileno() and sets
+    the OS file position to `first`, so a WSGI server's file_wrapper (e.g.
+    gunicorn's) can os.sendfile() exactly Content-Length bytes from there;
+    otherwise read() streams the range through Python.
+    """
+
+    def __init__(self, file, first, last):
+        self.file = file
+        self.remaining = last - first + 1
+        file.seek(first)
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def close(self):
+        self.file.close()
+
+
+def file_etag(stat):
+    """Strong validator from the inode's mtime and size, like nginx's"""
+    return f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+
+
+def serve_file(request, path, content_type=None, max_age=0, immutable=False, accel_name=None, etag=None):
+    """
+    Respond with the file at `path` (absolute), honouring If-None-Match /
+    If-Modified-Since (304) and single byte ranges (206 / 416).
+
+    With MEDIA_ACCEL = 'nginx' and an `accel_name` (the path under
+    MEDIA_ROOT) the body is left to nginx via X-Accel-Redirect; with
+    'sendfile' (Apache mod_xsendfile, lighttpd) via X-Sendfile. Raises
+    FileNotFoundError (IsADirectoryError) if there is no such file.
+
+    Pass `etag` for files whose mtime doesn't track their content (e.g.
+    cache entries touched for LRU): it replaces the mtime-based ETag, and
+    no Last-Modified is sent.
+    """
+    file = open(path, 'rb', buffering=0)
+    try:
+        stat = os.fstat(file.fileno())
+        content_type = content_type or mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        if etag is None:
+            headers = {'ETag': file_etag(stat), 'Last-Modified': http_date(stat.st_mtime)}
+            last_modified = int(stat.st_mtime)
+        else:
+            headers = {'ETag': etag}
+            last_modified = None
+        headers['Accept-Ranges'] = 'bytes'
+        cache_control = {'public': True, 'max_age': max_age}
+        if immutable:
+            cache_control['immutable'] = True
+
+        response = get_conditional_response(request, etag=headers['ETag'], last_modified=last_modified)
+        if response is not None:
+            file.close()
+        elif accel_name is not None and settings.MEDIA_ACCEL:
+            file.close()
+            response = HttpResponse(content_type=content_type)
+            if settings.MEDIA_ACCEL == 'nginx':
+                response['X-Accel-Redirect'] = settings.MEDIA_ACCEL_PREFIX + quote(accel_name)
+            else:
+                response['X-Sendfile'] = str(path)
+        else:
+            response = _file_response(request, file, stat.st_size, headers['ETag'], content_type)
+    except BaseException:
+        file.close()
+        raise
+
+    for name, value in headers.items():
+        response.headers.setdefault(name, value)
+    if response.status_code in (200, 206, 304):
+        patch_cache_control(response, **cache_control)
+    return response
+
+
+def _file_response(request, file, size, etag, content_type):
+    byte_range = None
+    if_range = request.headers.get('If-Range')
+    if request.method == 'GET' and (if_range is None or if_range == etag):
+        try:
+            byte_range = parse_range(request.headers.get('Range'), size)
+        except RangeNotSatisfiable:
+            file.close()
+            return HttpResponse(status=416, headers={'Content-Range': f'bytes */{size}'})
+
+    filename = os.path.basename(file.name)
+    if byte_range is None:
+        return FileResponse(file, content_type=content_type, filename=filename)
+    first, last = byte_range
+    response = FileResponse(FileRange(file, first, last), status=206, content_type=content_type, filename=filename)
+    response['Content-Length'] = last - first + 1
+    response['Content-Range'] = f'bytes {first}-{last}/{size}'
+    return response
@@ -0,0 +1,16 @@
+# core/utils/filters.py
+
+from core.models import Technology
+
+
+def filter_by_technologies(queryset, value):
+    """
+    Keep the rows linked to every technology named in the comma-separated
+    `value`. Matching is exact (case-insensitive) on the indexed key, so
+    "java" does not match "JavaScript".
+    """
+    if not value:
+        return queryset
+    for key in dict.fromkeys(name.lower() for name in Technology.parse(value)):
+        queryset = queryset.filter(technology_links__technology__key=key)
+    return queryset
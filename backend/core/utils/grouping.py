@@ -0,0 +1,19 @@
+# core/utils/grouping.py
+
+
+def group_by_choices(queryset, field, include_empty=True):
+    """
+    Group the rows of `queryset` by a choices field using a single query.
+    Returns {key: {'name': label, 'items': [...]}} in declared choice order,
+    with each group keeping the queryset's ordering.
+    """
+    choices = queryset.model._meta.get_field(field).choices
+    groups = {key: {'name': label, 'items': []} for key, label in choices}
+
+    for obj in queryset:
+        key = getattr(obj, field)
+        groups.setdefault(key, {'name': key, 'items': []})['items'].append(obj)
+
+    if not include_empty:
+        groups = {key: group for key, group in groups.items() if group['items']}
+    return groups
@@ -0,0 +1,245 @@
+# core/utils/images.py
+
+import base64
+import io
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import PurePosixPath
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import connection, transaction
+
+logger = logging.getLogger(__name__)
+
+FORMAT_EXTENSIONS = {'webp': 'webp', 'jpeg': 'jpg'}
+# Bump when render_derivatives() output changes: older entries get rebuilt.
+# The placeholder, dominant colour and dimensions live in the same entry, so
+# changing any of them (e.g. PLACEHOLDER_SIZE) also re-renders and re-stores
+# every derivative of every image; budget a full build_image_derivatives run.
+MANIFEST_VERSION = 3
+PLACEHOLDER_SIZE = 16
+
+
+def derivative_widths(width, widths):
+    """The configured widths narrower than the original, plus the original (capped at the largest)"""
+    narrower = [w for w in sorted(widths) if w < width]
+    largest = min(width, max(widths))
+    return narrower if largest in narrower else narrower + [largest]
+
+
+def open_stripped(data):
+    """
+    Decode `data` into an RGB(A) image with its EXIF orientation applied
+    to the pixels and every piece of metadata (EXIF, XMP, ICC, ...) dropped
+    """
+    from PIL import Image, ImageOps
+
+    with Image.open(io.BytesIO(data)) as source:
+        image = ImageOps.exif_transpose(source)
+        if image.mode not in ('RGB', 'RGBA'):
+            image = image.convert('RGBA' if 'transparency' in image.info or image.mode in ('LA', 'PA') else 'RGB')
+    image.info = {}
+    return image
+
+
+def flatten(image):
+    """`image` without alpha, composited onto white"""
+    from PIL import Image
+
+    if image.mode != 'RGBA':
+        return image
+    flat = Image.new('RGB', image.size, (255, 255, 255))
+    flat.paste(image, mask=image.getchannel('A'))
+    return flat
+
+
+def encode(image, fmt, quality):
+    """`image` as `fmt` bytes, flattened onto white for formats without alpha"""
+    if fmt == 'jpeg':
+        image = flatten(image)
+    out = io.BytesIO()
+    image.save(out, fmt.upper(), quality=quality, optimize=fmt in ('jpeg', 'png'), progressive=fmt == 'jpeg')
+    return out.getvalue()
+
+
+def placeholder(image):
+    """
+    (data URI of a blurred copy at most PLACEHOLDER_SIZE px across, dominant
+    colour as #rrggbb) for painting before the image itself arrives
+    """
+    from PIL import ImageFilter
+
+    small = image.copy()
+    small.thumbnail((PLACEHOLDER_SIZE, PLACEHOLDER_SIZE))
+    blurred = small.filter(ImageFilter.GaussianBlur(1))
+    uri = 'data:image/webp;base64,' + base64.b64encode(encode(blurred, 'webp', 40)).decode()
+
+    # Most common of a few quantized colours, so a small bright area doesn't tint it like an average would
+    palette = flatten(small).quantize(colors=4)
+    _, index = max(palette.getcolors())
+    red, green, blue = palette.getpalette()[index * 3:index * 3 + 3]
+    return uri, f'#{red:02x}{green:02x}{blue:02x}'
+
+
+def render_derivatives(data, widths, formats, quality):
+    """
+    Resize the image in `data` to each of `widths` and encode it in each of
+    `formats`. Runs in a worker process, so it only takes and returns plain
+    values: {'width', 'height', 'placeholder', 'color',
+    'variants': {format: [(width, bytes), ...]}}.
+    """
+    from PIL import Image
+
+    image = open_stripped(data)
+    placeholder_uri, color = placeholder(image)
+    variants = {fmt: [] for fmt in formats}
+    for width in derivative_widths(image.width, widths):
+        height = max(1, round(image.height * width / image.width))
+        resized = image.resize((width, height), Image.Resampling.LANCZOS) if width != image.width else image
+        for fmt in formats:
+            variants[fmt].append((width, encode(resized, fmt, quality)))
+    return {
+        'width': image.width, 'height': image.height, 'placeholder': placeholder_uri, 'color': color,
+        'variants': variants,
+    }
+
+
+_process_pool = None
+_store_pool = None
+_pending = set()
+
+
+def _get_pools(workers=None):
+    global _process_pool, _store_pool
+    if _process_pool is None:
+        workers = workers or settings.IMAGE_DERIVATIVE_WORKERS
+        # spawn: forking a process that holds DB connections and threads is unsafe
+        _process_pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+        _store_pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='derivatives')
+    return _process_pool, _store_pool
+
+
+def start_pools(workers):
+    """Start the worker pools with `workers` each, e.g. for a backfill, even if IMAGE_DERIVATIVE_WORKERS is 0"""
+    _get_pools(workers)
+
+
+def shutdown_pools():
+    global _process_pool, _store_pool
+    if _process_pool is not None:
+        _store_pool.shutdown()
+        _process_pool.shutdown()
+        _process_pool = _store_pool = None
+
+
+def _inline():
+    return _process_pool is None and not settings.IMAGE_DERIVATIVE_WORKERS
+
+
+def _render(data):
+    args = (data, settings.IMAGE_DERIVATIVE_WIDTHS, settings.IMAGE_DERIVATIVE_FORMATS, settings.IMAGE_DERIVATIVE_QUALITY)
+    if _inline():
+        return render_derivatives(*args)
+    global _process_pool
+    try:
+        return _get_pools()[0].submit(render_derivatives, *args).result()
+    except BrokenProcessPool:
+        # A worker died (out of memory on a huge upload?); start a fresh pool next time
+        _process_pool = None
+        raise
+
+
+def _derivative_name(source, width, fmt):
+    # Only a hint: the content-addressed storage files it under its hash
+    return f'{PurePosixPath(source).stem}-{width}w.{FORMAT_EXTENSIONS[fmt]}'
+
+
+def _build(model, pk, sources):
+    """Render and store the derivatives of `sources` ({field: file name}) and record them"""
+    from core.utils.cache import bump_content_generation
+
+    entries = {}
+    for field_name, source in sources.items():
+        if not source:
+            entries[field_name] = None
+            continue
+        storage = model._meta.get_field(field_name).storage
+        try:
+            with storage.open(source, 'rb') as file:
+                rendered = _render(file.read())
+        except Exception:
+            logger.exception('Could not render derivatives of %s', source)
+            continue
+        formats = {}
+        for fmt, variants in rendered['variants'].items():
+            formats[fmt] = []
+            for width, data in variants:
+                formats[fmt].append([width, storage.save(_derivative_name(source, width, fmt), ContentFile(data))])
+        entries[field_name] = {
+            'version': MANIFEST_VERSION, 'source': source, 'width': rendered['width'], 'height': rendered['height'],
+            'placeholder': rendered['placeholder'], 'color': rendered['color'], 'formats': formats,
+        }
+
+    with transaction.atomic():
+        row = model._default_manager.select_for_update().filter(pk=pk).first()
+        if row is None:
+            return
+        manifest = dict(row.image_derivatives)
+        for field_name, entry in entries.items():
+            if (getattr(row, field_name).name or '') != sources[field_name]:
+                continue  # replaced again meanwhile; that save scheduled its own build
+            # Old derivatives may be shared with other rows: gc_media removes them once unreferenced
+            manifest.pop(field_name, None)
+            if entry:
+                manifest[field_name] = entry
+        model._default_manager.filter(pk=pk).update(image_derivatives=manifest)
+        bump_content_generation(model)
+
+
+def _build_in_thread(model, pk, sources):
+    try:
+        _build(model, pk, sources)
+    finally:
+        connection.close()
+
+
+def schedule_derivatives(instance, field_names, force=False):
+    """
+    Build responsive derivatives and placeholders for the image fields of
+    `instance` whose file differs from the one recorded in its
+    image_derivatives manifest, or whose entry predates MANIFEST_VERSION
+    (all of them with `force`), once the current transaction commits.
+    Rendering happens in a pool of IMAGE_DERIVATIVE_WORKERS processes
+    (inline when 0), so the saving request doesn't wait for it.
+    """
+    manifest = instance.image_derivatives or {}
+    sources = {}
+    for field_name in field_names:
+        source = getattr(instance, field_name).name or ''
+        entry = manifest.get(field_name, {})
+        if force or source != entry.get('source', '') or (source and entry.get('version') != MANIFEST_VERSION):
+            sources[field_name] = source
+    if not sources:
+        return
+
+    model, pk = type(instance), instance.pk
+
+    def submit():
+        if _inline():
+            _build(model, pk, sources)
+            return
+        future = _get_pools()[1].submit(_build_in_thread, model, pk, sources)
+        _pending.add(future)
+        future.add_done_callback(_pending.discard)
+
+    transaction.on_commit(submit)
+
+
+def wait_for_derivatives():
+    """Block until every scheduled build has been stored"""
+    while _pending:
+        for future in list(_pending):
+            future.result()
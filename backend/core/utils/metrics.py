@@ -0,0 +1,76 @@
+# core/utils/metrics.py
+
+import atexit
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+METRIC_KEY = 'core:metric:{}'
+
+# Counters kept in the shared cache, so every worker adds to the same totals.
+# Read with `python manage.py show_metrics`.
+METRICS = {
+    'compression': (
+        'compression.gzip.bytes_in', 'compression.gzip.bytes_out',
+        'compression.br.bytes_in', 'compression.br.bytes_out',
+        'compression.cache_hits', 'compression.cache_misses', 'compression.skipped',
+    ),
+    'transforms': (
+        'transforms.hits', 'transforms.misses', 'transforms.coalesced',
+        'transforms.evicted', 'transforms.rejected',
+    ),
+}
+
+# This process's counts not yet added to the cache: {name: amount}
+_pending = {}
+_lock = threading.Lock()
+_last_flush = time.monotonic()
+
+
+def incr(name, amount=1):
+    """
+    Add `amount` to a counter. Counts collect in process memory and reach
+    the cache at most every METRICS_FLUSH_INTERVAL seconds, one write per
+    counter, so a request doesn't pay for cache writes (on FileBasedCache
+    each incr is a read, a write and a directory scan).
+    """
+    with _lock:
+        _pending[name] = _pending.get(name, 0) + amount
+        due = time.monotonic() - _last_flush >= settings.METRICS_FLUSH_INTERVAL
+    if due:
+        flush()
+
+
+def flush():
+    """Add this process's pending counts to the shared totals"""
+    global _last_flush
+    with _lock:
+        pending = dict(_pending)
+        _pending.clear()
+        _last_flush = time.monotonic()
+    for name, amount in pending.items():
+        key = METRIC_KEY.format(name)
+        try:
+            cache.incr(key, amount)
+        except ValueError:
+            if not cache.add(key, amount, timeout=None):
+                cache.incr(key, amount)
+
+
+atexit.register(flush)
+
+
+def read(names):
+    """{name: value} for `names`, 0 for counters never incremented"""
+    flush()
+    values = cache.get_many([METRIC_KEY.format(name) for name in names])
+    return {name: values.get(METRIC_KEY.format(name), 0) for name in names}
+
+
+def reset(names):
+    with _lock:
+        for name in names:
+            _pending.pop(name, None)
+    cache.delete_many([METRIC_KEY.format(name) for name in names])
@@ -0,0 +1,216 @@
+# core/utils/newsletter.py
+
+import logging
+import queue
+import smtplib
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.template import Context, Template
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+# The sender renews its lease after every batch; one this old means it died
+CAMPAIGN_LOCK_TIMEOUT = 10 * 60
+
+
+class CampaignLocked(Exception):
+    """Another process is already sending this campaign"""
+
+
+class RateLimiter:
+    """Spaces calls to wait() at most `rate` per second, across threads"""
+
+    def __init__(self, rate):
+        self.interval = 1 / rate if rate else 0
+        self.lock = threading.Lock()
+        self.next_at = time.monotonic()
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self.lock:
+            now = time.monotonic()
+            at = max(self.next_at, now)
+            self.next_at = at + self.interval
+        time.sleep(at - now)
+
+
+class ConnectionPool:
+    """
+    Up to `size` connections of the configured EMAIL_BACKEND, opened on
+    first use and kept open across batches until close()
+    """
+
+    def __init__(self, size):
+        self.idle = queue.LifoQueue()
+        for _ in range(size):
+            self.idle.put(None)
+        self.opened = []
+
+    @contextmanager
+    def connection(self):
+        connection = self.idle.get()
+        if connection is None:
+            connection = get_connection(fail_silently=False)
+            connection.open()
+            self.opened.append(connection)
+        try:
+            yield connection
+        finally:
+            self.idle.put(connection)
+
+    def close(self):
+        for connection in self.opened:
+            try:
+                connection.close()
+            except Exception:
+                logger.warning('Could not close SMTP connection', exc_info=True)
+
+
+def render_campaign(campaign):
+    """(subject, text, html) rendered once for every recipient"""
+    from core.models import PersonalInfo, SiteSettings
+
+    context = {'campaign': campaign}
+    for name, model in (('site', SiteSettings), ('personal_info', PersonalInfo)):
+        try:
+            context[name] = model.get_active()
+        except model.DoesNotExist:
+            context[name] = None
+
+    plain = Context(context, autoescape=False)
+    subject = ' '.join(Template(campaign.subject).render(plain).split())
+    text = Template(campaign.body_text).render(plain)
+    html = Template(campaign.body_html).render(Context(context)) if campaign.body_html else ''
+    return subject, text, html
+
+
+def _send_batch(pool, limiter, rendered, emails):
+    subject, text, html = rendered
+    sent = failed = 0
+    with pool.connection() as connection:
+        for email in emails:
+            message = EmailMultiAlternatives(subject, text, to=[email])
+            if html:
+                message.attach_alternative(html, 'text/html')
+            limiter.wait()
+            try:
+                try:
+                    connection.send_messages([message])
+                except smtplib.SMTPServerDisconnected:
+                    # Idle connections get dropped by the server; retry once
+                    connection.close()
+                    connection.open()
+                    connection.send_messages([message])
+            except smtplib.SMTPRecipientsRefused:
+                logger.warning('Newsletter recipient refused: %s', email)
+                failed += 1
+            else:
+                sent += 1
+    return sent, failed
+
+
+def _batches(rows, size):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def claim_campaign(campaign):
+    """
+    Mark `campaign` as sending and reload it, unless another process holds a
+    live lease on it. The claim is a single conditional UPDATE, so of two
+    senders racing for the same campaign only one gets the row.
+    """
+    from core.models import NewsletterCampaign
+
+    now = timezone.now()
+    claimed = NewsletterCampaign.objects.filter(pk=campaign.pk).exclude(
+        status='sending', heartbeat_at__gte=now - timedelta(seconds=CAMPAIGN_LOCK_TIMEOUT),
+    ).update(status='sending', heartbeat_at=now, last_error='')
+    if not claimed:
+        raise CampaignLocked(f'Campaign {campaign.pk} is already being sent')
+    # Resume from the checkpoint in the database, not a stale copy
+    campaign.refresh_from_db()
+
+
+def send_campaign(campaign, batch_size=None, rate=None, pool_size=None):
+    """
+    Mail `campaign` to every active subscriber it hasn't reached yet.
+
+    Subscribers are streamed in primary key order with iterator(); batches
+    of `batch_size` go out over a pool of `pool_size` SMTP connections at no
+    more than `rate` messages per second (0: unlimited). After each batch
+    the campaign records the last subscriber id, so an interrupted send
+    resumes from there; at most the batches in flight are sent twice.
+    """
+    from core.models import NewsletterCampaign, NewsletterSubscriber
+
+    if not settings.DEFAULT_FROM_EMAIL:
+        raise ImproperlyConfigured('Set DEFAULT_FROM_EMAIL before sending newsletters')
+    batch_size = batch_size or settings.NEWSLETTER_BATCH_SIZE
+    rate = settings.NEWSLETTER_RATE_LIMIT if rate is None else rate
+    pool_size = pool_size or settings.NEWSLETTER_SMTP_POOL_SIZE
+
+    claim_campaign(campaign)
+
+    def checkpoint(last_subscriber_id, future):
+        sent, failed = future.result()
+        campaign.last_subscriber_id = last_subscriber_id
+        campaign.sent_count += sent
+        campaign.failed_count += failed
+        campaign.heartbeat_at = timezone.now()
+        campaign.save(update_fields=['last_subscriber_id', 'sent_count', 'failed_count', 'heartbeat_at'])
+
+    pool = ConnectionPool(pool_size)
+    try:
+        if not campaign.started_at:
+            campaign.started_at = campaign.heartbeat_at
+            campaign.save(update_fields=['started_at'])
+
+        rendered = render_campaign(campaign)
+        limiter = RateLimiter(rate)
+        subscribers = NewsletterSubscriber.objects.filter(
+            is_active=True, pk__gt=campaign.last_subscriber_id,
+        ).order_by('pk').values_list('pk', 'email').iterator(chunk_size=batch_size)
+
+        executor = ThreadPoolExecutor(max_workers=pool_size)
+        in_flight = deque()
+        try:
+            for batch in _batches(subscribers, batch_size):
+                emails = [email for _, email in batch]
+                in_flight.append((batch[-1][0], executor.submit(_send_batch, pool, limiter, rendered, emails)))
+                if len(in_flight) >= pool_size:
+                    checkpoint(*in_flight.popleft())
+            while in_flight:
+                checkpoint(*in_flight.popleft())
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+        campaign.status = 'sent'
+        campaign.finished_at = timezone.now()
+        campaign.save(update_fields=['status', 'finished_at'])
+    except Exception as exc:
+        NewsletterCampaign.objects.filter(pk=campaign.pk).update(status='failed', last_error=str(exc))
+        raise
+    except BaseException:
+        # Ctrl-C or shutdown: leave it queued for the next run to resume
+        NewsletterCampaign.objects.filter(pk=campaign.pk).update(status='queued')
+        raise
+    finally:
+        pool.close()
+    return campaign
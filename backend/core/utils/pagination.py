@@ -0,0 +1,256 @@
+# core/utils/pagination.py
+
+import base64
+import datetime
+import json
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.contrib.admin.views.main import ChangeList
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured, ValidationError
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset (seek) pagination over the queryset's ordering, which defaults to
+    the model's Meta.ordering, with the primary key as the final tie-breaker.
+    Pages are fetched with a WHERE on the ordering columns, never an OFFSET.
+
+    Opt-in: a request without ?cursor= or ?page_size= gets the full list in
+    the original (unpaginated) shape.
+    """
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        params = request.query_params
+        if self.cursor_query_param not in params and self.page_size_query_param not in params:
+            return None
+
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.keys = self.get_keys(queryset)
+        values, reverse = self.decode_cursor(params.get(self.cursor_query_param))
+        return self.seek_page(queryset, values, reverse)
+
+    def seek_page(self, queryset, values, reverse):
+        """
+        The page_size rows after `values` (before, when `reverse`), in the
+        keys' order; sets next_values / previous_values for the links
+        """
+        ordering = [f'-{name}' if descending != reverse else name for name, descending in self.keys]
+        queryset = queryset.order_by(*ordering)
+        if values is not None:
+            queryset = queryset.filter(self.seek(values, reverse))
+
+        rows = list(queryset[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if reverse:
+            rows.reverse()
+
+        self.next_values = self.row_values(rows[-1]) if rows and (has_more or reverse) else None
+        self.previous_values = self.row_values(rows[0]) if rows and (has_more if reverse else values is not None) else None
+        return rows
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_link(self.next_values, reverse=False),
+            'previous': self.get_link(self.previous_values, reverse=True),
+            'results': data,
+        })
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return api_settings.PAGE_SIZE
+        return max(1, min(size, self.max_page_size))
+
+    def get_keys(self, queryset):
+        """[(name, descending)] for the ordering, ending with the primary key"""
+        opts = queryset.model._meta
+        keys = []
+        for term in queryset.query.order_by or opts.ordering:
+            if not isinstance(term, str) or term == '?':
+                raise ImproperlyConfigured(f'Keyset pagination cannot order by {term!r}')
+            name = term.lstrip('-')
+            if name == 'pk':
+                name = opts.pk.name
+            keys.append((name, term.startswith('-')))
+        if opts.pk.name not in (name for name, _ in keys):
+            keys.append((opts.pk.name, False))
+
+        self.converters = [self.get_converter(queryset, name) for name, _ in keys]
+        return keys
+
+    def get_converter(self, queryset, name):
+        if name in queryset.query.annotations:
+            return queryset.query.annotations[name].output_field.to_python
+        try:
+            field = queryset.model._meta.get_field(name)
+        except FieldDoesNotExist:
+            field = None
+        if field is None or field.is_relation or field.null:
+            raise ImproperlyConfigured(
+                f'Keyset pagination needs non-null columns or annotations to order by, not {name!r}'
+            )
+        return field.to_python
+
+    def seek(self, values, reverse):
+        """Rows strictly after `values` in the (possibly reversed) ordering"""
+        clauses = []
+        for index, (name, descending) in enumerate(self.keys):
+            equal = {key: value for (key, _), value in zip(self.keys[:index], values)}
+            lookup = 'lt' if descending != reverse else 'gt'
+            clauses.append(Q(**equal, **{f'{name}__{lookup}': values[index]}))
+        return reduce(or_, clauses)
+
+    def row_values(self, row):
+        return [getattr(row, name) for name, _ in self.keys]
+
+    def encode_cursor(self, values, reverse):
+        # Full isoformat: DjangoJSONEncoder drops microseconds, which would
+        # make the seek skip or repeat rows created in the same millisecond.
+        values = [
+            value.isoformat() if isinstance(value, (datetime.date, datetime.time)) else value
+            for value in values
+        ]
+        payload = json.dumps({'v': values, 'r': reverse}, default=str, separators=(',', ':'))
+        return base64.urlsafe_b64encode(payload.encode()).decode()
+
+    def decode_cursor(self, cursor):
+        if not cursor:
+            return None, False
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            values = [convert(value) for convert, value in zip(self.converters, payload['v'], strict=True)]
+            return values, bool(payload.get('r'))
+        except (TypeError, ValueError, KeyError, AttributeError, ValidationError) as exc:
+            raise NotFound(self.invalid_cursor_message) from exc
+
+    def get_link(self, values, reverse):
+        if values is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(values, reverse))
+
+
+def estimate_count(queryset):
+    """
+    The PostgreSQL planner's row count for `queryset`: pg_class.reltuples
+    (kept by VACUUM / ANALYZE) when it is unfiltered, otherwise the top
+    node's estimate from EXPLAIN. None on other databases and for tables
+    that have never been analyzed.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+    with connection.cursor() as cursor:
+        if not queryset.query.where:
+            cursor.execute(
+                'SELECT reltuples FROM pg_class WHERE oid = %s::regclass',
+                [connection.ops.quote_name(queryset.model._meta.db_table)],
+            )
+            row = cursor.fetchone()
+            rows = row[0] if row else -1
+        else:
+            sql, params = queryset.order_by().query.sql_with_params()
+            cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+            plan = cursor.fetchone()[0]
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            rows = plan[0]['Plan']['Plan Rows']
+    # reltuples is -1 before the first VACUUM / ANALYZE (PostgreSQL 14+)
+    return int(rows) if rows >= 0 else None
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator counting with estimate_count() once the estimate reaches
+    ADMIN_ESTIMATED_COUNT_THRESHOLD, instead of a COUNT(*) that reads every
+    row. Smaller results, and databases without a planner estimate, are
+    counted exactly. `estimated` tells which one `count` is.
+    """
+    estimated = False
+
+    @cached_property
+    def count(self):
+        if hasattr(self.object_list, 'query'):
+            estimate = estimate_count(self.object_list)
+            if estimate is not None and estimate >= settings.ADMIN_ESTIMATED_COUNT_THRESHOLD:
+                self.estimated = True
+                return estimate
+        return Paginator.count.func(self)
+
+
+class KeysetChangeList(ChangeList):
+    """
+    Admin changelist paged by keyset on its ordering (?cursor=, with
+    first / previous / next links) rather than ?p= page numbers, whose
+    OFFSET reads every row it skips. Orderings KeysetPagination can't seek
+    on (annotations, nullable columns), ?all= and list_editable fall back
+    to numbered pages.
+    """
+    cursor_var = 'cursor'
+    keyset = False
+    next_url = previous_url = first_url = None
+
+    def get_filters_params(self, params=None):
+        lookup_params = super().get_filters_params(params)
+        lookup_params.pop(self.cursor_var, None)
+        return lookup_params
+
+    def get_query_string(self, new_params=None, remove=None):
+        # Sorting, filtering and searching start again from the first page
+        return super().get_query_string(new_params, [*(remove or []), self.cursor_var])
+
+    def get_results(self, request):
+        pager = KeysetPagination()
+        try:
+            pager.keys = pager.get_keys(self.queryset)
+        except ImproperlyConfigured:
+            pager.keys = None
+        if pager.keys is None or self.show_all or self.list_editable:
+            super().get_results(request)
+            self.result_count_estimated = getattr(self.paginator, 'estimated', False)
+            return
+
+        cursor = self.params.get(self.cursor_var)
+        try:
+            values, reverse = pager.decode_cursor(cursor)
+        except NotFound:
+            raise IncorrectLookupParameters
+        pager.page_size = self.list_per_page
+        self.result_list = pager.seek_page(self.queryset, values, reverse)
+
+        self.paginator = self.model_admin.get_paginator(request, self.queryset, self.list_per_page)
+        self.result_count = self.paginator.count
+        self.result_count_estimated = getattr(self.paginator, 'estimated', False)
+        self.show_full_result_count = self.model_admin.show_full_result_count
+        self.full_result_count = self.root_queryset.count() if self.show_full_result_count else None
+        self.show_admin_actions = not self.show_full_result_count or bool(self.full_result_count)
+        self.can_show_all = False
+        self.multi_page = bool(pager.next_values or pager.previous_values)
+        self.keyset = True
+        if pager.next_values:
+            self.next_url = self.get_query_string({self.cursor_var: pager.encode_cursor(pager.next_values, False)})
+        if pager.previous_values:
+            self.previous_url = self.get_query_string(
+                {self.cursor_var: pager.encode_cursor(pager.previous_values, True)}
+            )
+        if cursor:
+            self.first_url = self.get_query_string()
@@ -0,0 +1,48 @@
+# core/utils/query_budget.py
+
+import time
+from collections import namedtuple
+
+from django.db import connection
+
+# Maximum number of SQL queries and total database time (milliseconds)
+# a route may spend on a cold cache.
+QueryBudget = namedtuple('QueryBudget', ['queries', 'db_time_ms'])
+
+
+class QueryCounter:
+    """Context manager recording every query run on the default connection"""
+
+    def __init__(self):
+        self.queries = []
+
+    def __enter__(self):
+        self._wrapper = connection.execute_wrapper(self)
+        self._wrapper.__enter__()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._wrapper.__exit__(*exc_info)
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append((sql, (time.perf_counter() - start) * 1000))
+
+    @property
+    def count(self):
+        return len(self.queries)
+
+    @property
+    def db_time_ms(self):
+        return sum(duration for _, duration in self.queries)
+
+    def exceeds(self, budget):
+        return self.count > budget.queries or self.db_time_ms > budget.db_time_ms
+
+
+def get_query_budget(url_name):
+    from core.urls import QUERY_BUDGETS
+    return QUERY_BUDGETS.get(url_name)
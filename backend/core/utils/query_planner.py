@@ -0,0 +1,159 @@
+# core/utils/query_planner.py
+
+from functools import lru_cache
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+from rest_framework.serializers import BaseSerializer, ListSerializer
+
+from core.serializers import sparse_field_names
+
+# Plans kept per process. ?fields= can name any subset of a serializer's
+# fields, so the number of distinct keys is only bounded by this.
+PLAN_CACHE_SIZE = 256
+
+
+class QueryPlan:
+    """
+    Loading strategy for one model: the columns to load (all of them unless
+    `complete`), the forward relations to join and the relations to prefetch.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.only = {model._meta.pk.name}
+        self.complete = True
+        self.select_related = set()
+        self.prefetch = {}
+
+    def child(self, lookup, model):
+        if lookup not in self.prefetch:
+            self.prefetch[lookup] = QueryPlan(model)
+        return self.prefetch[lookup]
+
+    def add_path(self, attrs, serializer=None, prefix=''):
+        """
+        Record what is needed to read `attrs` (a source split on dots or
+        double underscores). Returns False when the path is not made of
+        model fields, in which case the planner can't narrow the columns.
+        """
+        model = self.model if not prefix else _model_at(self.model, prefix)
+        try:
+            field = model._meta.get_field(attrs[0])
+        except FieldDoesNotExist:
+            return False
+
+        path = prefix + attrs[0]
+        rest = attrs[1:]
+
+        if not field.is_relation:
+            self.only.add(path)
+            return True
+
+        if field.concrete and (field.many_to_one or field.one_to_one):
+            self.only.add(path)
+            if not rest and serializer is None:
+                return True
+            self.select_related.add(path)
+            if rest:
+                return self.add_path(rest, serializer, prefix=path + '__')
+            return self.add_serializer(serializer, prefix=path + '__')
+
+        if field.one_to_many or field.many_to_many:
+            child = self.child(path, field.related_model)
+            if field.one_to_many:
+                # The prefetch joins back on the child's foreign key
+                child.only.add(field.field.name)
+            if rest:
+                child.complete &= child.add_path(rest)
+            elif isinstance(serializer, ListSerializer):
+                child.add_serializer(serializer.child)
+            elif serializer is not None:
+                child.add_serializer(serializer)
+            return True
+
+        return False
+
+    def add_serializer(self, serializer, field_names=None, prefix=''):
+        meta = getattr(serializer, 'Meta', None)
+        dependencies = getattr(meta, 'field_dependencies', {})
+        complete = True
+
+        for name, field in serializer.fields.items():
+            if field.write_only or (field_names is not None and name not in field_names):
+                continue
+            if name in dependencies:
+                for dependency in dependencies[name]:
+                    complete &= self.add_path(dependency.split('__'), prefix=prefix)
+            elif field.source == '*':
+                complete = False
+            else:
+                nested = field if isinstance(field, BaseSerializer) else None
+                complete &= self.add_path(field.source.split('.'), nested, prefix=prefix)
+
+        if not prefix:
+            self.complete &= complete
+        return complete
+
+    def apply(self, queryset):
+        if self.select_related:
+            queryset = queryset.select_related(*sorted(self.select_related))
+        for lookup, child in sorted(self.prefetch.items()):
+            related = child.apply(child.model._default_manager.all())
+            queryset = queryset.prefetch_related(Prefetch(lookup, queryset=related))
+        if self.complete:
+            queryset = queryset.only(*sorted(self.only | _ordering_columns(queryset)))
+        return queryset
+
+
+def _ordering_columns(queryset):
+    # Keyset pagination reads the ordering values of the last row
+    opts = queryset.model._meta
+    columns = set()
+    for term in queryset.query.order_by or opts.ordering:
+        if isinstance(term, str):
+            name = term.lstrip('-')
+            try:
+                field = opts.get_field(name)
+            except FieldDoesNotExist:
+                continue
+            if field.concrete and not field.is_relation:
+                columns.add(name)
+    return columns
+
+
+def _model_at(model, prefix):
+    for name in prefix.rstrip('_').split('__'):
+        model = model._meta.get_field(name).related_model
+    return model
+
+
+@lru_cache(maxsize=PLAN_CACHE_SIZE)
+def _plan_for(serializer_class, field_names):
+    plan = QueryPlan(serializer_class.Meta.model)
+    plan.add_serializer(serializer_class(), field_names)
+    return plan
+
+
+def plan_queryset(queryset, serializer_class, field_names=None):
+    """
+    Apply select_related, prefetch_related and only() to `queryset` based on
+    the fields `serializer_class` declares. Computed fields that read other
+    columns list them in `Meta.field_dependencies`; a field the planner can't
+    trace keeps all columns loaded rather than risk a query per row.
+    """
+    if field_names is not None:
+        field_names = frozenset(field_names)
+    return _plan_for(serializer_class, field_names).apply(queryset)
+
+
+class QueryPlannerMixin:
+    """
+    Viewset mixin planning get_queryset() for the active serializer,
+    narrowed to the fields picked with ?fields= / ?exclude=.
+    """
+
+    def get_queryset(self):
+        serializer_class = self.get_serializer_class()
+        field_names = sparse_field_names(serializer_class, self.request.query_params)
+        return plan_queryset(super().get_queryset(), serializer_class, field_names)
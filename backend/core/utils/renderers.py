@@ -0,0 +1,32 @@
+# core/utils/renderers.py
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer backed by orjson when it is installed. Falls back to the
+    stock renderer without orjson, and for indented output (browsable API,
+    `Accept: application/json; indent=4`) which orjson can't match exactly.
+    """
+    _encoder = JSONEncoder()
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b''
+        # default= covers the types DRF's encoder knows and orjson doesn't
+        # (Decimal, lazy strings, querysets, ...).
+        return orjson.dumps(data, default=self._encoder.default)
+
+
+def render_json(data):
+    """Encode `data` the way the default renderer would"""
+    return FastJSONRenderer().render(data)
@@ -0,0 +1,143 @@
+# core/utils/search.py
+
+import re
+from functools import reduce
+from operator import or_
+
+from django.db import connections
+from django.db.models import BooleanField, FloatField, Q
+from django.db.models.expressions import RawSQL
+
+# Project columns indexed for search, with their relevance weight
+# (A/B/C on Postgres, bm25 column weights on SQLite)
+SEARCH_COLUMNS = (
+    ('title', 'A', 10.0),
+    ('short_description', 'B', 5.0),
+    ('technologies', 'B', 5.0),
+    ('full_description', 'C', 1.0),
+)
+
+_columns = ', '.join(column for column, _, _ in SEARCH_COLUMNS)
+_new_values = ', '.join(f'new.{column}' for column, _, _ in SEARCH_COLUMNS)
+_old_values = ', '.join(f'old.{column}' for column, _, _ in SEARCH_COLUMNS)
+
+POSTGRES_INSTALL = [
+    # A stored generated column is recomputed by Postgres on every write
+    """
+    ALTER TABLE core_project ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS ({}) STORED
+    """.format(' || '.join(
+        f"setweight(to_tsvector('english', coalesce({column}, '')), '{weight}')"
+        for column, weight, _ in SEARCH_COLUMNS
+    )),
+    'CREATE INDEX IF NOT EXISTS core_project_search_vector_gin ON core_project USING GIN (search_vector)',
+]
+
+POSTGRES_UNINSTALL = [
+    'DROP INDEX IF EXISTS core_project_search_vector_gin',
+    'ALTER TABLE core_project DROP COLUMN IF EXISTS search_vector',
+]
+
+SQLITE_TRIGGERS = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS core_project_fts_insert AFTER INSERT ON core_project BEGIN
+        INSERT INTO core_project_fts (rowid, {_columns}) VALUES (new.id, {_new_values});
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS core_project_fts_delete AFTER DELETE ON core_project BEGIN
+        INSERT INTO core_project_fts (core_project_fts, rowid, {_columns}) VALUES ('delete', old.id, {_old_values});
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS core_project_fts_update AFTER UPDATE ON core_project BEGIN
+        INSERT INTO core_project_fts (core_project_fts, rowid, {_columns}) VALUES ('delete', old.id, {_old_values});
+        INSERT INTO core_project_fts (rowid, {_columns}) VALUES (new.id, {_new_values});
+    END
+    """,
+]
+
+SQLITE_UNINSTALL = [
+    'DROP TRIGGER IF EXISTS core_project_fts_insert',
+    'DROP TRIGGER IF EXISTS core_project_fts_delete',
+    'DROP TRIGGER IF EXISTS core_project_fts_update',
+    'DROP TABLE IF EXISTS core_project_fts',
+]
+
+
+def install_search_index(connection):
+    """
+    Create (or repair) the project search index. Idempotent: it also runs
+    after every migrate, because SQLite drops the triggers whenever a
+    migration rebuilds the core_project table.
+    """
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            for statement in POSTGRES_INSTALL:
+                cursor.execute(statement)
+        elif connection.vendor == 'sqlite':
+            cursor.execute(
+                "SELECT count(*) FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'core_project_fts_%'"
+            )
+            triggers_missing = cursor.fetchone()[0] < len(SQLITE_TRIGGERS)
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS core_project_fts USING fts5("
+                f"{_columns}, content='core_project', content_rowid='id', tokenize='porter unicode61')"
+            )
+            for statement in SQLITE_TRIGGERS:
+                cursor.execute(statement)
+            if triggers_missing:
+                # Rows written while the triggers were missing are not indexed
+                cursor.execute("INSERT INTO core_project_fts (core_project_fts) VALUES ('rebuild')")
+
+
+def uninstall_search_index(connection):
+    statements = {'postgresql': POSTGRES_UNINSTALL, 'sqlite': SQLITE_UNINSTALL}.get(connection.vendor, [])
+    with connection.cursor() as cursor:
+        for statement in statements:
+            cursor.execute(statement)
+
+
+def _fts5_query(terms):
+    # Quote every word so user input can't inject FTS5 syntax; the trailing
+    # * keeps prefix matching ("reac" finds "React").
+    return ' '.join(f'"{word}"*' for word in re.findall(r'\w+', terms))
+
+
+def search_projects(queryset, terms):
+    """
+    Filter `queryset` to projects matching `terms`, most relevant first.
+    Uses the indexed search column on Postgres and the FTS5 table on SQLite;
+    other databases fall back to unindexed icontains matching.
+    """
+    vendor = connections[queryset.db].vendor
+    ordering = queryset.query.order_by or queryset.model._meta.ordering
+
+    if vendor == 'postgresql':
+        query = "websearch_to_tsquery('english', %s)"
+        return queryset.filter(
+            RawSQL(f'core_project.search_vector @@ {query}', [terms], output_field=BooleanField())
+        ).annotate(
+            search_rank=RawSQL(f'ts_rank(core_project.search_vector, {query})', [terms], output_field=FloatField())
+        ).order_by('-search_rank', *ordering)
+
+    if vendor == 'sqlite':
+        match = _fts5_query(terms)
+        if not match:
+            return queryset.none()
+        weights = ', '.join(str(weight) for _, _, weight in SEARCH_COLUMNS)
+        # bm25() is only defined inside a MATCH query, so the rank comes from
+        # a correlated one; FTS5 answers it with a rowid lookup in the match.
+        return queryset.filter(
+            pk__in=RawSQL('SELECT rowid FROM core_project_fts WHERE core_project_fts MATCH %s', [match])
+        ).annotate(
+            search_rank=RawSQL(
+                f'SELECT -bm25(core_project_fts, {weights}) FROM core_project_fts '
+                f'WHERE core_project_fts MATCH %s AND core_project_fts.rowid = core_project.id',
+                [match], output_field=FloatField(),
+            )
+        ).order_by('-search_rank', *ordering)
+
+    return queryset.filter(
+        reduce(or_, (Q(**{f'{column}__icontains': terms}) for column, _, _ in SEARCH_COLUMNS))
+    )
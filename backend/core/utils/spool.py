@@ -0,0 +1,137 @@
+# core/utils/spool.py
+
+import fcntl
+import json
+import logging
+import os
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+logger = logging.getLogger(__name__)
+
+SPOOL_FILE = 'spool.jsonl'
+CLAIMED_GLOB = 'claimed-*.jsonl'
+FLUSH_LOCK_FILE = 'flush.lock'
+
+
+def _spool_dir():
+    directory = Path(settings.CONTACT_SPOOL_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+    return directory
+
+
+def spool_contact_message(data):
+    """
+    Append a validated contact message to the spool and return its spool id.
+    Each record is one JSON line written under an exclusive lock (and
+    fsynced with CONTACT_SPOOL_FSYNC), so it is on disk before the 201.
+    """
+    record = {'spool_id': uuid.uuid4().hex, 'created_at': timezone.now().isoformat(), **data}
+    line = (json.dumps(record, separators=(',', ':')) + '\n').encode()
+    path = _spool_dir() / SPOOL_FILE
+
+    while True:
+        fd = os.open(path, os.O_RDWR | os.O_CREAT | os.O_APPEND, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            # The flusher may have claimed (renamed) the file while we
+            # waited for the lock; appending to it now would lose the line.
+            try:
+                current = os.stat(path).st_ino == os.fstat(fd).st_ino
+            except FileNotFoundError:
+                current = False
+            if current:
+                size = os.fstat(fd).st_size
+                if size and os.pread(fd, 1, size - 1) != b'\n':
+                    # A writer died mid-line: don't glue this record onto it
+                    line = b'\n' + line
+                os.write(fd, line)
+                if settings.CONTACT_SPOOL_FSYNC:
+                    os.fsync(fd)
+                return record['spool_id']
+        finally:
+            os.close(fd)
+
+
+@contextmanager
+def _flush_lock(directory):
+    # flock is released by the kernel if the flusher dies, so a crashed
+    # flusher never blocks the next one.
+    fd = os.open(directory / FLUSH_LOCK_FILE, os.O_WRONLY | os.O_CREAT, 0o600)
+    try:
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            yield False
+        else:
+            yield True
+    finally:
+        os.close(fd)
+
+
+def _claim(directory):
+    path = directory / SPOOL_FILE
+    try:
+        fd = os.open(path, os.O_WRONLY)
+    except FileNotFoundError:
+        return
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        os.rename(path, directory / f'claimed-{time.time_ns()}.jsonl')
+    finally:
+        os.close(fd)
+
+
+def _read_records(path):
+    with open(path, 'rb') as spool:
+        for number, line in enumerate(spool, 1):
+            try:
+                yield json.loads(line)
+            except ValueError:
+                # Only a worker killed mid-write leaves a partial line behind
+                logger.warning('Skipping unreadable record %s:%d', path, number)
+
+
+def flush_contact_spool(batch_size=None):
+    """
+    Move spooled contact messages into the database with bulk_create and
+    return how many records were read. Claims the live spool by renaming it,
+    then drains every claimed file, including files left by a flusher that
+    crashed. Rows are keyed on spool_id, so draining a file twice is harmless.
+    Returns 0 straight away if another flusher is running.
+    """
+    from core.models import ContactMessage
+
+    batch_size = batch_size or settings.CONTACT_SPOOL_BATCH_SIZE
+    directory = _spool_dir()
+    flushed = 0
+    with _flush_lock(directory) as locked:
+        if not locked:
+            return 0
+        _claim(directory)
+        for path in sorted(directory.glob(CLAIMED_GLOB)):
+            batch = []
+            for record in _read_records(path):
+                batch.append(ContactMessage(
+                    spool_id=record['spool_id'],
+                    name=record['name'],
+                    email=record['email'],
+                    subject=record['subject'],
+                    message=record['message'],
+                    created_at=parse_datetime(record['created_at']),
+                ))
+                if len(batch) == batch_size:
+                    ContactMessage.objects.bulk_create(batch, ignore_conflicts=True)
+                    flushed += len(batch)
+                    batch = []
+            if batch:
+                ContactMessage.objects.bulk_create(batch, ignore_conflicts=True)
+                flushed += len(batch)
+            path.unlink()
+    return flushed
@@ -0,0 +1,126 @@
+# core/utils/storage.py
+
+import hashlib
+import os
+import tempfile
+import time
+from functools import lru_cache
+from pathlib import PurePosixPath
+
+from django.apps import apps
+from django.core.files.storage import FileSystemStorage
+from django.db import models
+from django.utils.deconstruct import deconstructible
+
+CAS_DIR = 'cas'
+DIGEST_LENGTH = 32   # hex characters of the SHA-256
+STEM_LENGTH = 40     # keeps names inside FileField's default max_length of 100
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    FileSystemStorage that files uploads under their content hash:
+    cas/<hh>/<digest>/<original name>. Identical bytes are stored once (a
+    second upload gets the first one's name), and a name's bytes never
+    change, so its URL can be cached as immutable. Nothing is deleted when
+    a row lets go of a file; `manage.py gc_media` removes unreferenced blobs.
+    """
+
+    def get_available_name(self, name, max_length=None):
+        # The name is chosen in _save() from the content; it never collides
+        return name
+
+    def _save(self, name, content):
+        digest = content_digest(content)
+        directory = PurePosixPath(CAS_DIR, digest[:2], digest)
+        full_directory = self.path(str(directory))
+        try:
+            existing = sorted(entry for entry in os.listdir(full_directory) if not entry.startswith('.'))
+        except FileNotFoundError:
+            existing = []
+        if existing:
+            name = str(directory / existing[0])
+            # Fresh again, so gc_media leaves it alone until the new row is saved
+            os.utime(self.path(name))
+            return name
+
+        original = PurePosixPath(name)
+        name = str(directory / f'{original.stem[:STEM_LENGTH]}{original.suffix.lower()}')
+        os.makedirs(full_directory, exist_ok=True)
+        fd, partial = tempfile.mkstemp(dir=full_directory, prefix='.upload-')
+        try:
+            with os.fdopen(fd, 'wb') as out:
+                for chunk in content.chunks():
+                    out.write(chunk)
+            os.chmod(partial, self.file_permissions_mode or 0o644)
+            os.replace(partial, self.path(name))
+        except BaseException:
+            os.unlink(partial)
+            raise
+        return name
+
+
+def content_digest(content):
+    content.seek(0)
+    sha = hashlib.sha256()
+    for chunk in content.chunks():
+        sha.update(chunk)
+    content.seek(0)
+    return sha.hexdigest()[:DIGEST_LENGTH]
+
+
+def is_content_addressed(name):
+    return PurePosixPath(name).parts[:1] == (CAS_DIR,)
+
+
+@lru_cache(maxsize=None)
+def upload_storage():
+    """Storage for the FileFields in core.models (a callable, so migrations don't pin the class)"""
+    return ContentAddressedStorage()
+
+
+def referenced_names():
+    """Every file name held by a FileField or an image_derivatives manifest"""
+    names = set()
+    for model in apps.get_models():
+        file_fields = [field.name for field in model._meta.concrete_fields if isinstance(field, models.FileField)]
+        if not file_fields:
+            continue
+        has_manifest = any(field.name == 'image_derivatives' for field in model._meta.concrete_fields)
+        columns = file_fields + ['image_derivatives'] * has_manifest
+        for row in model._default_manager.values_list(*columns).iterator():
+            names.update(name for name in row[:len(file_fields)] if name)
+            manifest = row[-1] if has_manifest else {}
+            for entry in manifest.values():
+                for files in entry.get('formats', {}).values():
+                    names.update(name for _, name in files)
+    return names
+
+
+def collect_garbage(storage=None, min_age=3600, dry_run=False):
+    """
+    Delete the content-addressed blobs nothing references. Blobs younger
+    than `min_age` seconds are kept: their row may not be committed yet.
+    Returns (files, bytes) removed, or that would be with `dry_run`.
+    """
+    storage = storage or upload_storage()
+    root = storage.path(CAS_DIR)
+    # Read the references after noting the time, so anything saved since is too young to go
+    cutoff = time.time() - min_age
+    referenced = referenced_names()
+    removed = freed = 0
+    for directory, _, filenames in os.walk(root, topdown=False):
+        for filename in filenames:
+            path = os.path.join(directory, filename)
+            name = os.path.relpath(path, storage.location).replace(os.sep, '/')
+            stat = os.stat(path)
+            if name in referenced or stat.st_mtime > cutoff:
+                continue
+            if not dry_run:
+                os.unlink(path)
+            removed += 1
+            freed += stat.st_size
+        if not dry_run and directory != root and not os.listdir(directory):
+            os.rmdir(directory)
+    return removed, freed
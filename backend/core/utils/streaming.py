@@ -0,0 +1,52 @@
+# core/utils/streaming.py
+
+from django.http import StreamingHttpResponse
+
+from core.utils.renderers import render_json
+
+
+def stream_json_list(serializer_class, queryset, chunk_size=500, context=None):
+    """
+    Yield a JSON array of the serialized `queryset` chunk by chunk, so only
+    `chunk_size` rows (and their encoded bytes) are held in memory at once.
+    Prefetches still run, once per chunk.
+    """
+    yield b'['
+    first = True
+    chunk = []
+    for row in queryset.iterator(chunk_size=chunk_size):
+        chunk.append(row)
+        if len(chunk) == chunk_size:
+            yield (b'' if first else b',') + _encode_rows(serializer_class, chunk, context)
+            first = False
+            chunk = []
+    if chunk:
+        yield (b'' if first else b',') + _encode_rows(serializer_class, chunk, context)
+    yield b']'
+
+
+def _encode_rows(serializer_class, rows, context):
+    data = serializer_class(rows, many=True, context=context).data
+    return render_json(data)[1:-1]
+
+
+class StreamingListMixin:
+    """
+    Viewset mixin: list(?stream=1) streams the unpaginated list straight
+    from a queryset iterator instead of building the whole body in memory.
+    """
+    stream_query_param = 'stream'
+    stream_chunk_size = 500
+
+    def list(self, request, *args, **kwargs):
+        if request.query_params.get(self.stream_query_param) not in ('1', 'true'):
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        return StreamingHttpResponse(
+            stream_json_list(
+                self.get_serializer_class(), queryset,
+                chunk_size=self.stream_chunk_size, context=self.get_serializer_context(),
+            ),
+            content_type='application/json',
+        )
@@ -0,0 +1,131 @@
+# core/utils/throttling.py
+
+import fcntl
+import hashlib
+import mmap
+import os
+import struct
+import threading
+import time
+
+from django.conf import settings
+from rest_framework.settings import api_settings
+from rest_framework.throttling import SimpleRateThrottle
+
+
+class BucketTable:
+    """
+    Fixed-size table of token-bucket states in a memory-mapped file shared
+    by every worker on the host. A slot is 16 bytes: the client key's hash
+    and its theoretical arrival time (GCRA), so state is O(1) per client
+    and the file never grows. Two clients hashing to the same slot evict
+    each other, which can only make a limit more lenient.
+    """
+    SLOT = struct.Struct('<Qd')
+
+    def __init__(self, path, slots):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        size = slots * self.SLOT.size
+        if os.fstat(self.fd).st_size < size:
+            os.ftruncate(self.fd, size)
+        self.map = mmap.mmap(self.fd, size)
+        self.slots = slots
+        # lockf locks are per process; threads of one worker share this
+        self.thread_lock = threading.Lock()
+
+    def take(self, key, now, interval, period):
+        """
+        Take a token for `key` from a bucket refilled one token per
+        `interval` seconds and holding up to period / interval tokens.
+        Returns 0 when allowed, otherwise the seconds until the next token.
+        """
+        digest = int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), 'little') or 1
+        offset = digest % self.slots * self.SLOT.size
+        with self.thread_lock:
+            fcntl.lockf(self.fd, fcntl.LOCK_EX, self.SLOT.size, offset)
+            try:
+                owner, arrival = self.SLOT.unpack_from(self.map, offset)
+                arrival = max(arrival if owner == digest else 0.0, now) + interval
+                if arrival - now > period:
+                    return arrival - period - now
+                self.SLOT.pack_into(self.map, offset, digest, arrival)
+                return 0.0
+            finally:
+                fcntl.lockf(self.fd, fcntl.LOCK_UN, self.SLOT.size, offset)
+
+
+_tables = {}
+
+
+def get_bucket_table():
+    path = str(settings.THROTTLE_STATE_FILE)
+    if path not in _tables:
+        _tables[path] = BucketTable(path, settings.THROTTLE_STATE_SLOTS)
+    return _tables[path]
+
+
+class TokenBucketThrottle(SimpleRateThrottle):
+    """
+    SimpleRateThrottle with its per-client request history replaced by a
+    token bucket in the shared BucketTable: a rate of 'N/period' allows a
+    burst of N requests, refilled at one every period / N seconds, and
+    holds across all gunicorn workers.
+    """
+
+    def get_rate(self):
+        # Read the rates on use rather than at import, like the other settings
+        self.THROTTLE_RATES = api_settings.DEFAULT_THROTTLE_RATES
+        return super().get_rate()
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+        self.wait_seconds = get_bucket_table().take(
+            self.key, self.timer(), self.duration / self.num_requests, self.duration,
+        )
+        return self.wait_seconds == 0
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class UserTokenBucketThrottle(TokenBucketThrottle):
+    """Drop-in for UserRateThrottle: per user, or per IP when anonymous"""
+    scope = 'user'
+
+    def get_cache_key(self, request, view):
+        if request.user and request.user.is_authenticated:
+            ident = request.user.pk
+        else:
+            ident = self.get_ident(request)
+        return self.cache_format % {'scope': self.scope, 'ident': ident}
+
+
+class ScopedAnonThrottle(TokenBucketThrottle):
+    """
+    Per-IP limit for anonymous requests to views with a `throttle_scope`,
+    at the DEFAULT_THROTTLE_RATES entry for that scope
+    """
+    scope_attr = 'throttle_scope'
+
+    def __init__(self):
+        # The scope, and so the rate, is only known once the view calls us
+        self.rate = None
+        self.num_requests = self.duration = None
+
+    def allow_request(self, request, view):
+        self.scope = getattr(view, self.scope_attr, None)
+        if not self.scope:
+            return True
+        self.rate = self.get_rate()
+        self.num_requests, self.duration = self.parse_rate(self.rate)
+        return super().allow_request(request, view)
+
+    def get_cache_key(self, request, view):
+        if request.user and request.user.is_authenticated:
+            return None
+        return self.cache_format % {'scope': self.scope, 'ident': self.get_ident(request)}
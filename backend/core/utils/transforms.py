@@ -0,0 +1,203 @@
+# core/utils/transforms.py
+
+import fcntl
+import hashlib
+import os
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.conf import settings
+from django.utils._os import safe_join
+
+from core.utils import metrics
+from core.utils.images import encode, open_stripped
+
+CONTENT_TYPES = {'webp': 'image/webp', 'jpeg': 'image/jpeg', 'png': 'image/png'}
+LOCK_STRIPES = 64
+# Hits refresh a file's mtime (its LRU position) at most this often
+TOUCH_INTERVAL = 60
+# Eviction trims the cache to this share of IMAGE_TRANSFORM_CACHE_MAX_BYTES
+EVICT_TO = 0.9
+# Running total of the renderings' bytes, so a miss needn't walk the cache
+SIZE_FILE = 'size'
+
+
+class TransformNotAllowed(ValueError):
+    """The requested size or format is not in the allow-lists"""
+
+
+def _cache_dir():
+    directory = Path(settings.IMAGE_TRANSFORM_CACHE_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+    return directory
+
+
+@contextmanager
+def _flock(path, blocking=True):
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+    try:
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+        except BlockingIOError:
+            locked = False
+        else:
+            locked = True
+        yield locked
+    finally:
+        os.close(fd)
+
+
+def _size_lock(directory):
+    locks = directory / 'locks'
+    locks.mkdir(exist_ok=True)
+    return _flock(locks / 'size.lock')
+
+
+def _add_size(directory, size):
+    """
+    Add `size` bytes to the running total and return it; None if there is
+    no total yet (a new or upgraded cache) and evict() has to count
+    """
+    path = directory / SIZE_FILE
+    with _size_lock(directory):
+        try:
+            total = int(path.read_text()) + size
+        except (FileNotFoundError, ValueError):
+            return None
+        path.write_text(str(total))
+    return total
+
+
+def check_transform(width, height, fmt):
+    if width not in settings.IMAGE_TRANSFORM_WIDTHS:
+        raise TransformNotAllowed(f'Width {width} is not allowed')
+    if height and height not in settings.IMAGE_TRANSFORM_HEIGHTS:
+        raise TransformNotAllowed(f'Height {height} is not allowed')
+    if fmt not in settings.IMAGE_TRANSFORM_FORMATS:
+        raise TransformNotAllowed(f'Format {fmt} is not allowed')
+
+
+def render_transform(data, width, height, fmt):
+    """
+    `data` scaled down to `width`, or with a `height`, cropped around the
+    centre to fill `width`x`height`, and encoded as `fmt`. Images are never
+    scaled up: a box larger than the image shrinks, keeping its shape.
+    """
+    from PIL import Image, ImageOps
+
+    image = open_stripped(data)
+    if height:
+        scale = min(1, image.width / width, image.height / height)
+        image = ImageOps.fit(
+            image, (max(1, round(width * scale)), max(1, round(height * scale))), Image.Resampling.LANCZOS,
+        )
+    elif width < image.width:
+        image = image.resize((width, max(1, round(image.height * width / image.width))), Image.Resampling.LANCZOS)
+    return encode(image, fmt, settings.IMAGE_DERIVATIVE_QUALITY)
+
+
+def get_transform(path, width, height, fmt):
+    """
+    Path of the cached `width`x`height` `fmt` rendering of MEDIA_ROOT/`path`,
+    rendering it on a miss. Raises TransformNotAllowed for sizes or formats
+    off the allow-lists and FileNotFoundError for missing sources.
+
+    The cache key includes the source's normalized name, size and mtime, so
+    replacing a file invalidates its renderings and spelling its path
+    differently doesn't add any. Concurrent misses for the same key, across
+    threads and processes, wait on one flock and only the first renders.
+    """
+    check_transform(width, height, fmt)
+    source = Path(safe_join(settings.MEDIA_ROOT, path))
+    stat = source.stat()
+    if not source.is_file():
+        raise FileNotFoundError(path)
+
+    # Keyed on the resolved name: projects/./x.png or a/../projects/x.png must not make new entries
+    name = source.relative_to(os.path.abspath(settings.MEDIA_ROOT)).as_posix()
+    key = hashlib.sha256(f'{name}\0{stat.st_size}\0{stat.st_mtime_ns}\0{width}x{height}\0{fmt}'.encode()).hexdigest()
+    directory = _cache_dir()
+    target = directory / key[:2] / f'{key}.{fmt}'
+
+    if _touch(target):
+        metrics.incr('transforms.hits')
+        return target
+
+    locks = directory / 'locks'
+    locks.mkdir(exist_ok=True)
+    with _flock(locks / f'{int(key[:8], 16) % LOCK_STRIPES}.lock'):
+        if _touch(target):
+            # Rendered by whoever held the lock before us
+            metrics.incr('transforms.coalesced')
+            return target
+        data = render_transform(source.read_bytes(), width, height, fmt)
+        target.parent.mkdir(exist_ok=True)
+        partial = target.with_suffix(f'.{os.getpid()}.tmp')
+        partial.write_bytes(data)
+        os.replace(partial, target)
+    metrics.incr('transforms.misses')
+    total = _add_size(directory, len(data))
+    if total is None or total > settings.IMAGE_TRANSFORM_CACHE_MAX_BYTES:
+        evict()
+    return target
+
+
+def _touch(target):
+    """Mark `target` as recently used; False if it isn't cached"""
+    try:
+        mtime = target.stat().st_mtime
+    except FileNotFoundError:
+        return False
+    if time.time() - mtime > TOUCH_INTERVAL:
+        try:
+            os.utime(target)
+        except FileNotFoundError:
+            return False  # evicted in between
+    return True
+
+
+def evict():
+    """
+    Delete the least recently used renderings (oldest mtime first) once the
+    cache is over IMAGE_TRANSFORM_CACHE_MAX_BYTES, and reset the running
+    total to what is left. Skipped while another process is already evicting.
+
+    Misses only call this when the running total goes over the limit, so the
+    walk is rare; they wait on the size lock meanwhile, keeping the total exact.
+    """
+    directory = _cache_dir()
+    with _flock(directory / 'evict.lock', blocking=False) as locked:
+        if not locked:
+            return 0
+        with _size_lock(directory):
+            entries = []
+            for shard in os.scandir(directory):
+                if not shard.is_dir() or shard.name == 'locks':
+                    continue
+                for entry in os.scandir(shard.path):
+                    if entry.name.endswith('.tmp'):
+                        continue
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+            total = sum(size for _, size, _ in entries)
+            limit = settings.IMAGE_TRANSFORM_CACHE_MAX_BYTES
+            evicted = 0
+            if total > limit:
+                for _, size, path in sorted(entries):
+                    if total <= limit * EVICT_TO:
+                        break
+                    try:
+                        os.unlink(path)
+                    except FileNotFoundError:
+                        pass
+                    total -= size
+                    evicted += 1
+            (directory / SIZE_FILE).write_text(str(total))
+    if evicted:
+        metrics.incr('transforms.evicted', evicted)
+    return evicted
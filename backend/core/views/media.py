@@ -0,0 +1,62 @@
+# core/views/media.py
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import Http404, HttpResponseBadRequest
+from django.utils._os import safe_join
+from django.views.decorators.http import require_safe
+from PIL import UnidentifiedImageError
+
+from core.utils import metrics
+from core.utils.fileserve import serve_file
+from core.utils.storage import is_content_addressed
+from core.utils.transforms import CONTENT_TYPES, TransformNotAllowed, get_transform
+
+# These URLs stay the same when the file behind them is replaced, so not immutable
+TRANSFORM_MAX_AGE = 24 * 60 * 60
+LEGACY_MEDIA_MAX_AGE = 24 * 60 * 60
+
+
+@require_safe
+def media_file(request, path):
+    """
+    Uploaded files (resume, images, derivatives) with ranges and validators.
+    Content-addressed names never change bytes and are cached as immutable;
+    files from before that are revalidated daily. Handed to the proxy when
+    MEDIA_ACCEL is set.
+    GET /media/<path>
+    """
+    immutable = is_content_addressed(path)
+    try:
+        return serve_file(
+            request, safe_join(settings.MEDIA_ROOT, path),
+            max_age=settings.MEDIA_CACHE_MAX_AGE if immutable else LEGACY_MEDIA_MAX_AGE,
+            immutable=immutable, accel_name=path,
+        )
+    except (FileNotFoundError, IsADirectoryError, SuspiciousFileOperation):
+        raise Http404('No such file')
+
+
+@require_safe
+def media_transform(request, width, height, fmt, path):
+    """
+    Resized copy of a file under MEDIA_ROOT, rendered on first request
+    GET /media/t/<width>x<height>/<format>/<path>   (height 0: keep the aspect ratio)
+    """
+    def serve(target):
+        # The entry's mtime is its LRU position, not its age: validate on the cache key
+        return serve_file(
+            request, target, content_type=CONTENT_TYPES[fmt], max_age=TRANSFORM_MAX_AGE, etag=f'"{target.stem}"',
+        )
+
+    try:
+        try:
+            return serve(get_transform(path, width, height, fmt))
+        except FileNotFoundError:
+            # Evicted since the lookup: render it again
+            return serve(get_transform(path, width, height, fmt))
+    except TransformNotAllowed as exc:
+        metrics.incr('transforms.rejected')
+        return HttpResponseBadRequest(str(exc))
+    except (FileNotFoundError, IsADirectoryError, SuspiciousFileOperation, UnidentifiedImageError):
+        raise Http404('No such image')
@@ -1,14 +1,16 @@
 # portfolio/views.py
 
 from rest_framework import viewsets, status, generics
-from rest_framework.decorators import action, api_view
+from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny
-from django.db.models import Q
+from django.conf import settings
+from django.db.models import Count, Q
 from core.models import (
     PersonalInfo, CoreExpertise, Skill, Tool, ProjectCategory,
-    Project, Experience, Education, Timeline, Testimonial,
-    ContactMessage, NewsletterSubscriber, SiteSettings
+    Project, Experience, Achievement, Education, Timeline, Testimonial,
+    ContactMessage, NewsletterSubscriber, SiteSettings, Technology, ProjectTechnology,
+    ExperienceTechnology
 )
 from core.serializers import (
     PersonalInfoSerializer, CoreExpertiseSerializer, SkillSerializer,
@@ -17,9 +19,21 @@ from core.serializers import (
     TimelineSerializer, TestimonialSerializer, ContactMessageSerializer,
     NewsletterSubscriberSerializer, SiteSettingsSerializer, HomePageDataSerializer
 )
+from core.utils.batch import run_batch
+from core.utils.cache import cache_page_data
+from core.utils.conditional import ConditionalGetMixin, conditional_on
+from core.utils.filters import filter_by_technologies
+from core.utils.grouping import group_by_choices
+from core.utils.query_planner import QueryPlannerMixin, plan_queryset
+from core.utils.search import search_projects
+from core.utils.spool import spool_contact_message
+from core.utils.streaming import StreamingListMixin
+from core.utils.throttling import ScopedAnonThrottle
 
+BATCH_MAX_REQUESTS = 20
 
-class PersonalInfoViewSet(viewsets.ReadOnlyModelViewSet):
+
+class PersonalInfoViewSet(ConditionalGetMixin, QueryPlannerMixin, viewsets.ReadOnlyModelViewSet):
     """
     Retrieve personal information
     GET /api/personal-info/
@@ -30,14 +44,14 @@ class PersonalInfoViewSet(viewsets.ReadOnlyModelViewSet):
     
     def list(self, request, *args, **kwargs):
         try:
-            instance = PersonalInfo.objects.get(is_active=True)
+            instance = PersonalInfo.get_active()
             serializer = self.get_serializer(instance)
             return Response(serializer.data)
         except PersonalInfo.DoesNotExist:
             return Response({'detail': 'Personal information not found'}, status=status.HTTP_404_NOT_FOUND)
 
 
-class CoreExpertiseViewSet(viewsets.ReadOnlyModelViewSet):
+class CoreExpertiseViewSet(ConditionalGetMixin, StreamingListMixin, QueryPlannerMixin, viewsets.ReadOnlyModelViewSet):
     """
     List all core expertise items
     GET /api/core-expertise/
@@ -47,7 +61,7 @@ class CoreExpertiseViewSet(viewsets.ReadOnlyModelViewSet):
     permission_classes = [AllowAny]
 
 
-class SkillViewSet(viewsets.ReadOnlyModelViewSet):
+class SkillViewSet(ConditionalGetMixin, StreamingListMixin, QueryPlannerMixin, viewsets.ReadOnlyModelViewSet):
     """
     List all skills, optionally filter by category
     GET /api/skills/
@@ -68,23 +82,19 @@ class SkillViewSet(viewsets.ReadOnlyModelViewSet):
     @action(detail=False, methods=['get'])
     def by_category(self, request):
         """Group skills by category"""
-        categories = dict(Skill.CATEGORY_CHOICES)
-        result = {}
-        
-        for category_key, category_name in categories.items():
-            skills = Skill.objects.filter(
-                is_active=True,
-                category=category_key
-            ).order_by('order')
-            result[category_key] = {
-                'name': category_name,
-                'skills': SkillSerializer(skills, many=True).data
+        skills = plan_queryset(Skill.objects.filter(is_active=True).order_by('order'), SkillSerializer)
+        result = {
+            category_key: {
+                'name': group['name'],
+                'skills': SkillSerializer(group['items'], many=True).data
             }
+            for category_key, group in group_by_choices(skills, 'category').items()
+        }
         
         return Response(result)
 
 
-class ToolViewSet(viewsets.ReadOnlyModelViewSet):
+class ToolViewSet(ConditionalGetMixin, StreamingListMixin, QueryPlannerMixin, viewsets.ReadOnlyModelViewSet):
     """
     List all tools
     GET /api/tools/
@@ -94,28 +104,34 @@ class ToolViewSet(viewsets.ReadOnlyModelViewSet):
     permission_classes = [AllowAny]
 
 
-class ProjectCategoryViewSet(viewsets.ReadOnlyModelViewSet):
+class ProjectCategoryViewSet(ConditionalGetMixin, StreamingListMixin, QueryPlannerMixin, viewsets.ReadOnlyModelViewSet):
     """
     List all project categories
     GET /api/project-categories/
     """
-    queryset = ProjectCategory.objects.filter(is_active=True).order_by('order')
+    queryset = ProjectCategory.objects.filter(is_active=True).annotate(
+        active_project_count=Count('projects', filter=Q(projects__is_active=True))
+    ).order_by('order')
     serializer_class = ProjectCategorySerializer
     permission_classes = [AllowAny]
+    conditional_models = (Project,)
 
 
-class ProjectViewSet(viewsets.ReadOnlyModelViewSet):
+class ProjectViewSet(ConditionalGetMixin, StreamingListMixin, QueryPlannerMixin, viewsets.ReadOnlyModelViewSet):
     """
     List and retrieve projects
     GET /api/projects/ - List all projects
     GET /api/projects/?category=web-design - Filter by category slug
     GET /api/projects/?featured=true - Get featured projects only
+    GET /api/projects/?tech=django,react - Filter by technologies
     GET /api/projects/?search=react - Search projects
+    GET /api/projects/?stream=1 - Stream the full list
     GET /api/projects/{slug}/ - Get project detail
     GET /api/projects/featured/ - Get featured projects
     """
     queryset = Project.objects.filter(is_active=True).order_by('order', '-created_at')
     permission_classes = [AllowAny]
+    conditional_models = (ProjectCategory, Technology, ProjectTechnology)
     lookup_field = 'slug'
     
     def get_serializer_class(self):
@@ -136,14 +152,13 @@ class ProjectViewSet(viewsets.ReadOnlyModelViewSet):
         if featured and featured.lower() == 'true':
             queryset = queryset.filter(is_featured=True)
         
-        # Search
+        # Filter by technology (exact, every listed technology must match)
+        queryset = filter_by_technologies(queryset, self.request.query_params.get('tech', None))
+        
+        # Search (full-text, most relevant first)
         search = self.request.query_params.get('search', None)
         if search:
-            queryset = queryset.filter(
-                Q(title__icontains=search) |
-                Q(short_description__icontains=search) |
-                Q(technologies__icontains=search)
-            )
+            queryset = search_projects(queryset, search)
         
         return queryset
     
@@ -151,21 +166,27 @@ class ProjectViewSet(viewsets.ReadOnlyModelViewSet):
     def featured(self, request):
         """Get featured projects only"""
         projects = self.get_queryset().filter(is_featured=True)
-        serializer = ProjectListSerializer(projects, many=True, context={'request': request})
+        serializer = self.get_serializer(projects, many=True)
         return Response(serializer.data)
 
 
-class ExperienceViewSet(viewsets.ReadOnlyModelViewSet):
+class ExperienceViewSet(ConditionalGetMixin, StreamingListMixin, QueryPlannerMixin, viewsets.ReadOnlyModelViewSet):
     """
     List all experience entries
     GET /api/experience/
+    GET /api/experience/?tech=django,react - Filter by technologies
     """
     queryset = Experience.objects.filter(is_active=True).order_by('-start_date')
     serializer_class = ExperienceSerializer
     permission_classes = [AllowAny]
+    conditional_models = (Achievement, Technology, ExperienceTechnology)
+    
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        return filter_by_technologies(queryset, self.request.query_params.get('tech', None))
 
 
-class EducationViewSet(viewsets.ReadOnlyModelViewSet):
+class EducationViewSet(ConditionalGetMixin, StreamingListMixin, QueryPlannerMixin, viewsets.ReadOnlyModelViewSet):
     """
     List all education entries
     GET /api/education/
@@ -175,7 +196,7 @@ class EducationViewSet(viewsets.ReadOnlyModelViewSet):
     permission_classes = [AllowAny]
 
 
-class TimelineViewSet(viewsets.ReadOnlyModelViewSet):
+class TimelineViewSet(ConditionalGetMixin, StreamingListMixin, QueryPlannerMixin, viewsets.ReadOnlyModelViewSet):
     """
     List all timeline entries
     GET /api/timeline/
@@ -185,7 +206,7 @@ class TimelineViewSet(viewsets.ReadOnlyModelViewSet):
     permission_classes = [AllowAny]
 
 
-class TestimonialViewSet(viewsets.ReadOnlyModelViewSet):
+class TestimonialViewSet(ConditionalGetMixin, StreamingListMixin, QueryPlannerMixin, viewsets.ReadOnlyModelViewSet):
     """
     List all testimonials
     GET /api/testimonials/
@@ -208,6 +229,8 @@ class ContactMessageView(generics.CreateAPIView):
     """
     serializer_class = ContactMessageSerializer
     permission_classes = [AllowAny]
+    throttle_classes = [ScopedAnonThrottle]
+    throttle_scope = 'contact'
     
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
@@ -219,6 +242,13 @@ class ContactMessageView(generics.CreateAPIView):
             'message': 'Thank you for your message! I will get back to you soon.'
         }, status=status.HTTP_201_CREATED)
 
+    def perform_create(self, serializer):
+        # 'spool' mode: no DB write in the request, flush_contact_spool inserts it
+        if settings.CONTACT_INGESTION == 'spool':
+            spool_contact_message(serializer.validated_data)
+        else:
+            serializer.save()
+
 
 class NewsletterSubscribeView(generics.CreateAPIView):
     """
@@ -230,6 +260,8 @@ class NewsletterSubscribeView(generics.CreateAPIView):
     """
     serializer_class = NewsletterSubscriberSerializer
     permission_classes = [AllowAny]
+    throttle_classes = [ScopedAnonThrottle]
+    throttle_scope = 'newsletter'
     
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
@@ -237,23 +269,14 @@ class NewsletterSubscribeView(generics.CreateAPIView):
         if serializer.is_valid():
             email = serializer.validated_data['email']
             
-            # Check if already subscribed
-            if NewsletterSubscriber.objects.filter(email=email, is_active=True).exists():
+            # One upsert: subscribes, reactivates or reports an active subscription
+            outcome = NewsletterSubscriber.subscribe(email)
+            if outcome == NewsletterSubscriber.ALREADY_ACTIVE:
                 return Response({
                     'success': False,
                     'message': 'You are already subscribed to our newsletter.'
                 }, status=status.HTTP_400_BAD_REQUEST)
             
-            # Reactivate if previously unsubscribed
-            subscriber, created = NewsletterSubscriber.objects.get_or_create(
-                email=email,
-                defaults={'is_active': True}
-            )
-            
-            if not created:
-                subscriber.is_active = True
-                subscriber.save()
-            
             return Response({
                 'success': True,
                 'message': 'Successfully subscribed to the newsletter!'
@@ -266,17 +289,18 @@ class NewsletterSubscribeView(generics.CreateAPIView):
         }, status=status.HTTP_400_BAD_REQUEST)
 
 
-class SiteSettingsView(generics.RetrieveAPIView):
+class SiteSettingsView(ConditionalGetMixin, QueryPlannerMixin, generics.RetrieveAPIView):
     """
     Get site settings
     GET /api/site-settings/
     """
+    queryset = SiteSettings.objects.filter(is_active=True)
     serializer_class = SiteSettingsSerializer
     permission_classes = [AllowAny]
     
     def get_object(self):
         try:
-            return SiteSettings.objects.get(is_active=True)
+            return SiteSettings.get_active()
         except SiteSettings.DoesNotExist:
             return None
     
@@ -288,17 +312,25 @@ class SiteSettingsView(generics.RetrieveAPIView):
         return Response(serializer.data)
 
 
+@conditional_on(PersonalInfo, CoreExpertise, Project, ProjectCategory, Timeline, Technology, ProjectTechnology)
 @api_view(['GET'])
+@cache_page_data
 def homepage_data(request):
     """
     Get all data needed for homepage in a single request
     GET /api/homepage/
     """
     try:
-        personal_info = PersonalInfo.objects.get(is_active=True)
-        core_expertise = CoreExpertise.objects.filter(is_active=True).order_by('order')
-        featured_projects = Project.objects.filter(is_active=True, is_featured=True).order_by('order')[:6]
-        timeline = Timeline.objects.filter(is_active=True).order_by('-year', 'order')[:5]
+        personal_info = PersonalInfo.get_active()
+        core_expertise = plan_queryset(
+            CoreExpertise.objects.filter(is_active=True).order_by('order'), CoreExpertiseSerializer
+        )
+        featured_projects = plan_queryset(
+            Project.objects.filter(is_active=True, is_featured=True).order_by('order'), ProjectListSerializer
+        )[:6]
+        timeline = plan_queryset(
+            Timeline.objects.filter(is_active=True).order_by('-year', 'order'), TimelineSerializer
+        )[:5]
         
         data = {
             'personal_info': PersonalInfoSerializer(personal_info).data,
@@ -318,16 +350,20 @@ def homepage_data(request):
         return Response({'detail': 'Homepage data not found'}, status=status.HTTP_404_NOT_FOUND)
 
 
+@conditional_on(PersonalInfo, CoreExpertise, Timeline)
 @api_view(['GET'])
+@cache_page_data
 def about_page_data(request):
     """
     Get all data needed for about page
     GET /api/about/
     """
     try:
-        personal_info = PersonalInfo.objects.get(is_active=True)
-        core_expertise = CoreExpertise.objects.filter(is_active=True).order_by('order')
-        timeline = Timeline.objects.filter(is_active=True).order_by('-year', 'order')
+        personal_info = PersonalInfo.get_active()
+        core_expertise = plan_queryset(
+            CoreExpertise.objects.filter(is_active=True).order_by('order'), CoreExpertiseSerializer
+        )
+        timeline = plan_queryset(Timeline.objects.filter(is_active=True).order_by('-year', 'order'), TimelineSerializer)
         
         data = {
             'personal_info': PersonalInfoSerializer(personal_info).data,
@@ -346,28 +382,24 @@ def about_page_data(request):
         return Response({'detail': 'About page data not found'}, status=status.HTTP_404_NOT_FOUND)
 
 
+@conditional_on(Skill, Tool)
 @api_view(['GET'])
+@cache_page_data
 def skills_page_data(request):
     """
     Get all data needed for skills page
     GET /api/skills-page/
     """
-    categories = dict(Skill.CATEGORY_CHOICES)
-    skills_by_category = {}
-    
-    for category_key, category_name in categories.items():
-        skills = Skill.objects.filter(
-            is_active=True,
-            category=category_key
-        ).order_by('order')
-        
-        if skills.exists():
-            skills_by_category[category_key] = {
-                'name': category_name,
-                'skills': SkillSerializer(skills, many=True).data
-            }
+    skills = plan_queryset(Skill.objects.filter(is_active=True).order_by('order'), SkillSerializer)
+    skills_by_category = {
+        category_key: {
+            'name': group['name'],
+            'skills': SkillSerializer(group['items'], many=True).data
+        }
+        for category_key, group in group_by_choices(skills, 'category', include_empty=False).items()
+    }
     
-    tools = Tool.objects.filter(is_active=True).order_by('order')
+    tools = plan_queryset(Tool.objects.filter(is_active=True).order_by('order'), ToolSerializer)
     
     data = {
         'skills_by_category': skills_by_category,
@@ -377,15 +409,19 @@ def skills_page_data(request):
     return Response(data)
 
 
+@conditional_on(Experience, Achievement, Education, Timeline, Technology, ExperienceTechnology)
 @api_view(['GET'])
+@cache_page_data
 def experience_page_data(request):
     """
     Get all data needed for experience page
     GET /api/experience-page/
     """
-    experience = Experience.objects.filter(is_active=True).order_by('-start_date', 'order')
-    education = Education.objects.filter(is_active=True).order_by('-year', 'order')
-    timeline = Timeline.objects.filter(is_active=True).order_by('-year', 'order')
+    experience = plan_queryset(
+        Experience.objects.filter(is_active=True).order_by('-start_date', 'order'), ExperienceSerializer
+    )
+    education = plan_queryset(Education.objects.filter(is_active=True).order_by('-year', 'order'), EducationSerializer)
+    timeline = plan_queryset(Timeline.objects.filter(is_active=True).order_by('-year', 'order'), TimelineSerializer)
     
     data = {
         'experience': ExperienceSerializer(experience, many=True).data,
@@ -393,4 +429,32 @@ def experience_page_data(request):
         'timeline': TimelineSerializer(timeline, many=True).data
     }
     
-    return Response(data)
\ No newline at end of file
+    return Response(data)
+
+
+class BatchView(generics.GenericAPIView):
+    """
+    Run several GET requests against this API in one round trip, inside one
+    database transaction
+    POST /api/batch/
+    Body: {
+        "requests": ["/projects/", "/core-expertise/", "/project-categories/"]
+    }
+    """
+    permission_classes = [AllowAny]
+    # Up to BATCH_MAX_REQUESTS renders per request: limited like the other anonymous POSTs
+    throttle_classes = [ScopedAnonThrottle]
+    throttle_scope = 'batch'
+
+    def post(self, request, *args, **kwargs):
+        paths = request.data.get('requests') if isinstance(request.data, dict) else None
+        if (
+            not isinstance(paths, list) or not paths or len(paths) > BATCH_MAX_REQUESTS
+            or not all(isinstance(path, str) for path in paths)
+        ):
+            return Response(
+                {'detail': f'"requests" must be a list of 1 to {BATCH_MAX_REQUESTS} paths.'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        return Response({'responses': run_batch(request._request, paths)})
@@ -20,10 +20,13 @@ export function AboutSection() {
 
   const loadData = async () => {
       try {
-        const info = await fetchPersonalInfo();
-        const projs = await fetchProjects();
-        const expert = await fetchCoreExpertise();
-        const time = await fetchTimeline();
+        // Separate GETs keep their HTTP caching and 304s; sent together, not one after another
+        const [info, projs, expert, time] = await Promise.all([
+          fetchPersonalInfo(),
+          fetchProjects(),
+          fetchCoreExpertise(),
+          fetchTimeline(),
+        ]);
         setPersonalInfo(info);
         setProjects(projs);
         setExpertise(expert);
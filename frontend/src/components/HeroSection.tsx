@@ -11,9 +11,8 @@ export function HeroSection() {
 
   const loadData = async () => {
     try {
-      const info = await fetchPersonalInfo();
+      const [info, projs] = await Promise.all([fetchPersonalInfo(), fetchProjects()]);
       console.log('info ==<<<>>', info)
-      const projs = await fetchProjects();
       setPersonalInfo(info);
       setProjects(projs);
     } catch (error) {
@@ -4,7 +4,7 @@ import { motion } from "motion/react";
 import { useInView } from "motion/react";
 import { useTheme } from "../contexts/ThemeContext";
 import { Server, Code, Plug, Database, Settings } from "lucide-react";
-import { fetchPersonalInfo, fetchProjects, fetchCoreExpertise, fetchTimeline, fetchSkills, fetchProjectCategories } from "./ui/utils";
+import { fetchProjects, fetchCoreExpertise, fetchProjectCategories } from "./ui/utils";
 
 export function WorkSection() {
   const ref = useRef(null);
@@ -19,9 +19,11 @@ export function WorkSection() {
   // function for load data
   const loadData = async () => {
     try {
-      const projs = await fetchProjects();
-      const expert = await fetchCoreExpertise();
-      const categoriesData = await fetchProjectCategories();
+      const [projs, expert, categoriesData] = await Promise.all([
+        fetchProjects(),
+        fetchCoreExpertise(),
+        fetchProjectCategories(),
+      ]);
       setProjects(projs);
       setExpertise(expert);
       setCategories(categoriesData);